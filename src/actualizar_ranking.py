@@ -9,16 +9,75 @@ Ejecuta:
 
 Uso:
     python src/actualizar_ranking.py
+    python src/actualizar_ranking.py --offline   # Reutiliza la cache de OpenAlex
+    python src/actualizar_ranking.py --paises AR,PE,CO   # Ranking y HTML de cada país
 """
 
+import argparse
 import subprocess
 import sys
 from pathlib import Path
 from datetime import datetime
 
 
+def actualizar_paises(paises: list, src_dir: Path, opciones_extraccion: list):
+    """Descarga los países en paralelo y procesa el ranking y el HTML de cada uno."""
+    print("\n[1/2] Extrayendo datos de OpenAlex API...")
+    print("-" * 40)
+    result = subprocess.run(
+        [sys.executable, str(src_dir / "extraer_openalex.py"), "--paises", ",".join(paises),
+         *opciones_extraccion],
+        capture_output=False,
+        text=True
+    )
+    if result.returncode != 0:
+        print("Advertencia: La extracción terminó con errores")
+
+    print("\n[2/2] Procesando ranking por país...")
+    print("-" * 40)
+    raw_dir = src_dir.parent / "data" / "raw" / "paises"
+    procesados = []
+    for pais in paises:
+        if not any((raw_dir / pais).glob("investigadores_openalex_*.csv")):
+            print(f"  {pais}: sin datos descargados, se omite")
+            continue
+        for script in ("procesar_ranking.py", "generar_html.py"):
+            result = subprocess.run(
+                [sys.executable, str(src_dir / script), "--pais", pais],
+                capture_output=False,
+                text=True
+            )
+            if result.returncode != 0:
+                print(f"Advertencia: {script} --pais {pais} terminó con errores")
+                break
+        else:
+            procesados.append(pais)
+
+    print("\n" + "=" * 60)
+    print("ACTUALIZACION COMPLETADA")
+    print("=" * 60)
+    print(f"\nPaíses procesados: {', '.join(procesados) or 'ninguno'}")
+    for pais in procesados:
+        print(f"  - data/output/paises/{pais}/ y docs/paises/{pais}/index.html")
+
+
 def main():
     """Ejecuta el pipeline completo de actualización."""
+    parser = argparse.ArgumentParser(description="Actualiza el ranking de ciencias sociales")
+    parser.add_argument("--offline", action="store_true",
+                        help="Extraer solo desde la cache de respuestas de OpenAlex")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="Ignorar la cache de respuestas de OpenAlex")
+    parser.add_argument("--paises", default=None,
+                        help="Codigos ISO separados por coma; genera el ranking y el HTML de cada pais")
+    args = parser.parse_args()
+
+    opciones_extraccion = []
+    if args.offline:
+        opciones_extraccion.append("--offline")
+    if args.sin_cache:
+        opciones_extraccion.append("--sin-cache")
+
     print("=" * 60)
     print("ACTUALIZACION DEL RANKING - CIENCIAS SOCIALES CHILE")
     print("=" * 60)
@@ -26,11 +85,16 @@ def main():
 
     src_dir = Path(__file__).parent
 
+    if args.paises:
+        paises = [p.strip().upper() for p in args.paises.split(",") if p.strip()]
+        actualizar_paises(paises, src_dir, opciones_extraccion)
+        return
+
     # Paso 1: Extraer datos de OpenAlex
     print("\n[1/2] Extrayendo datos de OpenAlex API...")
     print("-" * 40)
     result = subprocess.run(
-        [sys.executable, str(src_dir / "extraer_openalex.py")],
+        [sys.executable, str(src_dir / "extraer_openalex.py"), *opciones_extraccion],
         capture_output=False,
         text=True
     )
@@ -0,0 +1,219 @@
+"""
+Estadísticas agregadas de investigadores chilenos en ciencias sociales vía group_by.
+
+En vez de descargar todos los autores, pide a OpenAlex los conteos ya
+agregados (group_by) sobre el filtro de Chile y ciencias sociales:
+- Autores por institución y por campo
+- Histograma de h-index
+
+Todo en unas pocas requests, solapadas. Con --comparar se contrastan los
+totales con el último CSV completo de extraer_openalex.
+
+Con --citas se agregan la suma de citas total y la de las --top
+instituciones principales. group_by no suma, así que cada una se obtiene
+recorriendo un group_by cited_by_count (un grupo por cada valor distinto de
+citas, 200 por página): decenas de páginas para el total y otras tantas por
+institución.
+
+El filtro de ciencias sociales es el de la API (topics.domain.id, ver
+extraer_openalex.filtros_servidor), un superconjunto de es_ciencias_sociales,
+por lo que los totales son cotas superiores de los del ranking.
+
+Uso:
+    python src/agregados_openalex.py
+    python src/agregados_openalex.py --comparar
+    python src/agregados_openalex.py --citas --top 20
+
+Genera:
+    data/output/agregados_openalex_YYYYMMDD.json
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from extraer_openalex import FILTRO_PAIS, H_INDEX_MIN_DOWNLOAD, DOMINIO_CS_ID, OUTPUT_DIR as RAW_DIR
+from openalex_client import get_client, ejecutar, configurar_cliente, agregar_argumentos_cliente
+
+# Configuración
+OUTPUT_DIR = Path(__file__).parent.parent / "data" / "output"
+
+# Filtro común: Chile, h-index mínimo de la descarga y dominio Social Sciences
+FILTRO_AGREGADOS = (f"{FILTRO_PAIS},summary_stats.h_index:>{H_INDEX_MIN_DOWNLOAD},"
+                    f"topics.domain.id:{DOMINIO_CS_ID}")
+
+# Instituciones con suma de citas propia con --citas (un group_by paginado cada una)
+TOP_INSTITUCIONES = 10
+
+
+async def agrupar(filtro: str, campo: str) -> list:
+    """
+    Recorre todos los grupos de un group_by (con cursor, 200 por página).
+
+    Returns:
+        Lista de {"key", "key_display_name", "count"}
+    """
+    client = get_client()
+    grupos = []
+    cursor = "*"
+    while cursor:
+        data = await client.aget("authors", {
+            "filter": filtro,
+            "group_by": campo,
+            "per_page": 200,
+            "cursor": cursor,
+        })
+        pagina = data.get("group_by", [])
+        if not pagina:
+            break
+        grupos.extend(pagina)
+        cursor = data.get("meta", {}).get("next_cursor")
+    return grupos
+
+
+def histograma(grupos: list) -> dict:
+    """{valor entero: autores} a partir de un group_by numérico."""
+    return {int(g["key"]): g["count"] for g in grupos if str(g["key"]).lstrip("-").isdigit()}
+
+
+def suma_ponderada(grupos: list) -> int:
+    """Suma de valor * autores de un group_by numérico (ej: total de citas)."""
+    return sum(valor * n for valor, n in histograma(grupos).items())
+
+
+async def calcular_agregados(filtro: str = FILTRO_AGREGADOS, top: int = TOP_INSTITUCIONES,
+                             citas: bool = False) -> dict:
+    """
+    Lanza los group_by en paralelo y arma el resumen.
+
+    Con citas=True suma además las citas del total y de las `top`
+    instituciones principales; cada suma es un group_by cited_by_count
+    paginado (ver agrupar), así que cuesta muchas más requests que el resto.
+    Sin citas, esos valores quedan en None.
+    """
+    client = get_client()
+    total, instituciones, campos, h_index = await asyncio.gather(
+        client.acontar("authors", filtro),
+        agrupar(filtro, "last_known_institutions.id"),
+        agrupar(filtro, "topics.field.id"),
+        agrupar(filtro, "summary_stats.h_index"),
+    )
+
+    # Un autor con varias last_known_institutions (incluso extranjeras) cuenta en cada una
+    instituciones = sorted(instituciones, key=lambda g: g["count"], reverse=True)
+
+    # Suma de citas del total y de las instituciones principales, en paralelo
+    citas_total = None
+    citas_por_inst = {}
+    if citas:
+        principales = instituciones[:top]
+        citas_total, *citas_inst = await asyncio.gather(
+            agrupar(filtro, "cited_by_count"),
+            *(agrupar(f"{filtro},last_known_institutions.id:{g['key'].replace('https://openalex.org/', '')}",
+                      "cited_by_count")
+              for g in principales),
+        )
+        citas_total = suma_ponderada(citas_total)
+        citas_por_inst = {g["key"]: suma_ponderada(c) for g, c in zip(principales, citas_inst)}
+
+    return {
+        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "filtro": filtro,
+        "autores": total,
+        "citas": citas_total,
+        "h_index": histograma(h_index),
+        "instituciones": [
+            {
+                "id": g["key"].replace("https://openalex.org/", ""),
+                "nombre": g["key_display_name"],
+                "autores": g["count"],
+                "citas": citas_por_inst.get(g["key"]),
+            }
+            for g in instituciones
+        ],
+        "campos": [
+            {"id": g["key"].rsplit("/", 1)[-1], "nombre": g["key_display_name"], "autores": g["count"]}
+            for g in sorted(campos, key=lambda g: g["count"], reverse=True)
+        ],
+    }
+
+
+def comparar_con_csv(agregados: dict, csv_path: Path):
+    """Contrasta los agregados con el CSV completo de extraer_openalex."""
+    df = pd.read_csv(csv_path)
+    print(f"\nComparacion con {csv_path.name} (descarga completa):")
+    print(f"  {'':28} {'group_by':>12} {'CSV':>12}")
+    print(f"  {'Autores':28} {agregados['autores']:12,} {len(df):12,}")
+    if agregados["citas"] is not None:
+        print(f"  {'Citas':28} {agregados['citas']:12,} {int(df['cited_by_count'].sum()):12,}")
+
+    for minimo in (5, 10, 20):
+        n_api = sum(n for h, n in agregados["h_index"].items() if h >= minimo)
+        print(f"  {f'h-index >= {minimo}':28} {n_api:12,} {int((df['h_index'] >= minimo).sum()):12,}")
+
+    por_inst = df["institucion"].value_counts()
+    print(f"\n  {'Institucion':40} {'group_by':>9} {'CSV':>7}")
+    for inst in agregados["instituciones"][:10]:
+        print(f"  {inst['nombre'][:40]:40} {inst['autores']:9,} {por_inst.get(inst['nombre'], 0):7,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estadisticas agregadas de OpenAlex via group_by")
+    parser.add_argument("--citas", action="store_true",
+                        help="Sumar citas del total y de las instituciones principales "
+                             "(un group_by paginado por cada suma)")
+    parser.add_argument("--top", type=int, default=TOP_INSTITUCIONES,
+                        help="Instituciones con suma de citas propia (con --citas)")
+    parser.add_argument("--comparar", action="store_true",
+                        help="Comparar con el ultimo investigadores_openalex_*.csv")
+    agregar_argumentos_cliente(parser)
+    args = parser.parse_args()
+
+    client = configurar_cliente(cache=not args.sin_cache, offline=args.offline)
+
+    print("=" * 60)
+    print("AGREGADOS OPENALEX - CIENCIAS SOCIALES CHILE")
+    print("=" * 60)
+
+    llamadas = client.stats["llamadas"]
+    agregados = ejecutar(calcular_agregados(top=args.top, citas=args.citas))
+
+    print(f"Autores: {agregados['autores']:,}")
+    if agregados["citas"] is not None:
+        print(f"Citas: {agregados['citas']:,}")
+    print(f"h-index >= 5: {sum(n for h, n in agregados['h_index'].items() if h >= 5):,}")
+
+    print(f"\nPor institucion (top 10):")
+    for inst in agregados["instituciones"][:10]:
+        citas = f"{inst['citas']:,}" if inst["citas"] is not None else "-"
+        print(f"  {inst['nombre'][:40]:40} {inst['autores']:6,} autores {citas:>10} citas")
+
+    print(f"\nPor campo (top 10):")
+    for campo in agregados["campos"][:10]:
+        print(f"  {campo['nombre'][:40]:40} {campo['autores']:6,}")
+
+    print(f"\n{client.stats['llamadas'] - llamadas} requests")
+    print(client.reporte())
+
+    output_file = OUTPUT_DIR / f"agregados_openalex_{datetime.now().strftime('%Y%m%d')}.json"
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(agregados, f, ensure_ascii=False, indent=2)
+    print(f"Archivo: {output_file}")
+
+    if args.comparar:
+        archivos = list(RAW_DIR.glob("investigadores_openalex_*.csv"))
+        if archivos:
+            comparar_con_csv(agregados, max(archivos, key=lambda x: x.stat().st_mtime))
+        else:
+            print(f"No hay investigadores_openalex_*.csv en {RAW_DIR} para comparar")
+
+    return agregados
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Almacén local de autores de OpenAlex, indexado por openalex_id.
+
+Guarda las filas ya procesadas por extraer_openalex (mismo formato que el CSV
+investigadores_openalex_YYYYMMDD.csv) en una base SQLite, junto con la fecha
+de la última ejecución exitosa. Permite actualizar solo los autores que
+cambiaron desde entonces (modo incremental) y regenerar el CSV completo.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+# Configuración
+STORE_PATH = Path(__file__).parent.parent / "data" / "store" / "autores_openalex.sqlite"
+
+
+class AlmacenAutores:
+    """Almacén de filas de autores con upsert por openalex_id."""
+
+    def __init__(self, path: Path = STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS autores (
+                openalex_id TEXT PRIMARY KEY,
+                fila TEXT,
+                actualizado TEXT
+            )"""
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)"
+        )
+        self._conn.commit()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM autores").fetchone()[0]
+
+    def upsert(self, filas: list):
+        """Inserta o reemplaza filas (dicts con 'openalex_id')."""
+        ahora = datetime.now().isoformat(timespec="seconds")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO autores VALUES (?, ?, ?)",
+            [(f["openalex_id"], json.dumps(f, ensure_ascii=False), ahora) for f in filas],
+        )
+        self._conn.commit()
+
+    def eliminar(self, ids: list) -> int:
+        """Elimina autores que dejaron de cumplir los filtros. Devuelve cuántos había."""
+        cur = self._conn.executemany(
+            "DELETE FROM autores WHERE openalex_id = ?", [(i,) for i in ids]
+        )
+        self._conn.commit()
+        return cur.rowcount
+
+    def reemplazar(self, filas: list):
+        """Reemplaza todo el contenido (tras una descarga completa)."""
+        self._conn.execute("DELETE FROM autores")
+        self.upsert(filas)
+
+    def filas(self) -> list:
+        """Devuelve todas las filas guardadas."""
+        return [json.loads(f) for (f,) in self._conn.execute("SELECT fila FROM autores")]
+
+    def get_meta(self, clave: str, default: str = None) -> str:
+        fila = self._conn.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else default
+
+    def set_meta(self, clave: str, valor: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (clave, valor))
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,317 @@
+"""
+Almacén local de works (publicaciones) de los autores del ranking, en Parquet.
+
+Las métricas a nivel de publicación necesitan los works, que el pipeline no
+guardaba. Este script cosecha los works de los autores del ranking (filtro OR
+de author.id por lotes, un cursor por lote, en paralelo) y los guarda en
+data/store/obras/ como Parquet particionado por año de publicación:
+
+    data/store/obras/anio=2023/obras.parquet
+        work_id           int64           W123 -> 123
+        publication_year  int16
+        cited_by_count    int32
+        updated_date      string
+        autores           list<int64>     IDs numéricos de las autorías, en orden
+        autores_chile     list<bool>      Autoría con alguna institución chilena
+        referenced_works  list<int64>
+        topics            list<int32>     Códigos de topic (T10108 -> 10108)
+
+En cada refresco solo se reescriben los años con works nuevos o modificados
+(updated_date distinto), incluido el año anterior de un work que cambió de
+año de publicación. Con OPENALEX_API_KEY, los autores ya cosechados
+solo piden los works modificados desde la última ejecución
+(from_updated_date); los autores nuevos en el ranking se cosechan completos.
+
+cargar_obras() devuelve una tabla de Arrow leída con memory map, y
+columna_numpy() da vistas numpy sin copia de sus columnas numéricas.
+
+Uso:
+    python src/almacen_obras.py                 # refresca con el ranking_final más reciente
+    python src/almacen_obras.py --completo      # vuelve a cosechar todos los autores
+    python src/almacen_obras.py --resumen       # solo muestra el contenido del almacén
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from extraer_openalex import RANKING_DIR, ranking_mas_reciente
+from modelos_openalex import PaginaObras
+from openalex_client import API_KEY, get_client, ejecutar, configurar_cliente, agregar_argumentos_cliente
+from sumidero_autores import id_numerico
+from taxonomia_openalex import codigo_openalex
+
+# Configuración
+OBRAS_DIR = Path(__file__).parent.parent / "data" / "store" / "obras"
+LOTE_AUTORES = 50  # Autores por cursor (filtro OR de author.id)
+
+# Campos de work que se leen (select= de la API)
+CAMPOS_OBRA = ["id", "publication_year", "cited_by_count", "updated_date",
+               "authorships", "referenced_works", "topics"]
+
+ESQUEMA = pa.schema([
+    ("work_id", pa.int64()),
+    ("publication_year", pa.int16()),
+    ("cited_by_count", pa.int32()),
+    ("updated_date", pa.string()),
+    ("autores", pa.list_(pa.int64())),
+    ("autores_chile", pa.list_(pa.bool_())),
+    ("referenced_works", pa.list_(pa.int64())),
+    ("topics", pa.list_(pa.int32())),
+])
+
+
+def codificar_obra(obra) -> dict:
+    """Fila del almacén para un work (modelos_openalex.Obra), con IDs como enteros."""
+    autorias = [a for a in obra.authorships if a.author is not None and a.author.id]
+    return {
+        "work_id": id_numerico(obra.id),
+        "publication_year": obra.publication_year or 0,
+        "cited_by_count": obra.cited_by_count or 0,
+        "updated_date": obra.updated_date or "",
+        "autores": [id_numerico(a.author.id) for a in autorias],
+        "autores_chile": [any(i.country_code == "CL" for i in a.institutions) for a in autorias],
+        "referenced_works": [id_numerico(w) for w in obra.referenced_works],
+        "topics": [codigo_openalex(t.id) for t in obra.topics],
+    }
+
+
+async def cosechar_lote(ids: list, desde: str = None) -> list:
+    """Recorre el cursor de works de un lote de autores (opcionalmente, modificados desde una fecha)."""
+    filtro = f"author.id:{'|'.join(ids)}"
+    if desde:
+        filtro += f",from_updated_date:{desde}"
+    params = {"filter": filtro, "select": ",".join(CAMPOS_OBRA)}
+
+    filas = []
+    async for data in get_client().apaginar("works", params, PaginaObras):
+        filas.extend(codificar_obra(o) for o in data.results if o.id)
+    return filas
+
+
+async def cosechar(ids: list, desde: str = None) -> dict:
+    """
+    Cosecha los works de los autores con un cursor por lote, en paralelo.
+
+    Returns:
+        {work_id: fila}; un work de varios autores del ranking queda una vez
+    """
+    lotes = [ids[i:i + LOTE_AUTORES] for i in range(0, len(ids), LOTE_AUTORES)]
+    resultados = await asyncio.gather(*(cosechar_lote(lote, desde) for lote in lotes))
+    obras = {}
+    for filas in resultados:
+        for fila in filas:
+            previa = obras.get(fila["work_id"])
+            if previa is None or fila["updated_date"] > previa["updated_date"]:
+                obras[fila["work_id"]] = fila
+    return obras
+
+
+def archivo_anio(anio: int, directorio: Path = OBRAS_DIR) -> Path:
+    return directorio / f"anio={anio}" / "obras.parquet"
+
+
+def guardar_obras(obras: dict, directorio: Path = OBRAS_DIR) -> dict:
+    """
+    Agrega works nuevos o modificados, reescribiendo solo los años afectados.
+
+    Un work modificado se quita de todas las particiones donde estaba, de
+    modo que si cambió su año de publicación no queda repetido en el año
+    anterior.
+
+    Returns:
+        {"nuevas", "modificadas", "sin_cambios", "anios_reescritos"}
+    """
+    # (año, updated_date) actual de los works recibidos que ya están en el almacén
+    recibidos = pa.array(sorted(obras), type=pa.int64())
+    previas = {}
+    for path in sorted(Path(directorio).glob("anio=*/obras.parquet")):
+        anio = int(path.parent.name.split("=", 1)[1])
+        existente = pq.read_table(path, columns=["work_id", "updated_date"])
+        existente = existente.filter(pc.is_in(existente.column("work_id"), value_set=recibidos))
+        for work_id, fecha in zip(existente.column("work_id").to_pylist(),
+                                  existente.column("updated_date").to_pylist()):
+            previas[work_id] = (anio, fecha)
+
+    conteo = {"nuevas": 0, "modificadas": 0, "sin_cambios": 0, "anios_reescritos": 0}
+    por_anio = defaultdict(list)
+    anios_afectados = set()
+    for fila in obras.values():
+        previa = previas.get(fila["work_id"])
+        if previa == (fila["publication_year"], fila["updated_date"]):
+            conteo["sin_cambios"] += 1
+            continue
+        conteo["nuevas" if previa is None else "modificadas"] += 1
+        por_anio[fila["publication_year"]].append(fila)
+        anios_afectados.add(fila["publication_year"])
+        if previa is not None:
+            anios_afectados.add(previa[0])
+
+    if not anios_afectados:
+        return conteo
+
+    reemplazados = pa.array([f["work_id"] for filas in por_anio.values() for f in filas], type=pa.int64())
+    for anio in sorted(anios_afectados):
+        path = archivo_anio(anio, directorio)
+        existente = pq.read_table(path) if path.exists() else ESQUEMA.empty_table()
+        conservadas = existente.filter(pc.invert(pc.is_in(existente.column("work_id"), value_set=reemplazados)))
+        tabla = pa.concat_tables([conservadas, pa.Table.from_pylist(por_anio.get(anio, []), schema=ESQUEMA)])
+        tabla = tabla.sort_by("work_id")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        if tabla.num_rows:
+            pq.write_table(tabla, tmp, compression="zstd")
+            os.replace(tmp, path)
+        else:
+            path.unlink(missing_ok=True)
+        conteo["anios_reescritos"] += 1
+    return conteo
+
+
+def cargar_obras(anios: list = None, columnas: list = None, directorio: Path = OBRAS_DIR) -> pa.Table:
+    """
+    Lee el almacén como una tabla de Arrow (memory map, sin convertir a pandas).
+
+    Args:
+        anios: Años a leer (por defecto todos)
+        columnas: Columnas a leer (por defecto todas)
+    """
+    directorio = Path(directorio)
+    if anios is None:
+        archivos = sorted(directorio.glob("anio=*/obras.parquet"))
+    else:
+        archivos = [archivo_anio(a, directorio) for a in anios if archivo_anio(a, directorio).exists()]
+    if not archivos:
+        return ESQUEMA.empty_table().select(columnas) if columnas else ESQUEMA.empty_table()
+    return pa.concat_tables([pq.read_table(a, columns=columnas, memory_map=True) for a in archivos])
+
+
+def columna_numpy(tabla: pa.Table, nombre: str) -> np.ndarray:
+    """Vista numpy sin copia de una columna numérica (una copia solo si tiene varios chunks)."""
+    columna = tabla.column(nombre)
+    arreglo = columna.chunk(0) if columna.num_chunks == 1 else columna.combine_chunks()
+    return arreglo.to_numpy(zero_copy_only=True)
+
+
+def leer_meta(directorio: Path = OBRAS_DIR) -> dict:
+    path = Path(directorio) / "meta.json"
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def escribir_meta(meta: dict, directorio: Path = OBRAS_DIR):
+    path = Path(directorio) / "meta.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)
+
+
+def refrescar(ids: list, completo: bool = False, directorio: Path = OBRAS_DIR) -> dict:
+    """
+    Actualiza el almacén con los works de los autores `ids` (IDs cortos, "A123").
+
+    Los autores que no estaban en la ejecución anterior se cosechan completos;
+    los demás, con API key, solo desde la última ejecución.
+    """
+    inicio = datetime.now()
+    meta = leer_meta(directorio)
+    conocidos = set(meta.get("autores", [])) if not completo else set()
+    ultima = meta.get("ultima_ejecucion")
+
+    nuevos = [i for i in ids if id_numerico(i) not in conocidos]
+    previos = [i for i in ids if id_numerico(i) in conocidos]
+    if previos and not API_KEY:
+        print("  Sin OPENALEX_API_KEY no se puede usar from_updated_date: se cosechan todos los autores")
+        nuevos, previos = ids, []
+
+    async def todos():
+        return await asyncio.gather(cosechar(nuevos), cosechar(previos, ultima[:10] if ultima else None))
+
+    print(f"Cosechando works: {len(nuevos)} autores completos, {len(previos)} autores desde {ultima and ultima[:10]}")
+    completos, delta = ejecutar(todos())
+    obras = {**completos, **delta}
+
+    conteo = guardar_obras(obras, directorio)
+
+    # Solo se marca la ejecución si terminó sin errores
+    escribir_meta({
+        "ultima_ejecucion": inicio.isoformat(timespec="seconds"),
+        "autores": sorted(conocidos | {id_numerico(i) for i in ids}),
+    }, directorio)
+    return {"descargadas": len(obras), **conteo}
+
+
+def imprimir_resumen(directorio: Path = OBRAS_DIR):
+    tabla = cargar_obras(columnas=["publication_year", "cited_by_count", "autores"], directorio=directorio)
+    if not tabla.num_rows:
+        print(f"El almacen de works esta vacio ({directorio})")
+        return
+    anios = columna_numpy(tabla, "publication_year")
+    citas = columna_numpy(tabla, "cited_by_count")
+    autorias = pc.list_value_length(tabla.column("autores"))
+    con_anio = anios[anios > 0]
+    rango = f"{con_anio.min()}-{con_anio.max()}" if len(con_anio) else "sin anio"
+    print(f"Works: {tabla.num_rows:,} ({rango}), "
+          f"citas: {int(citas.sum()):,}, autorias: {pc.sum(autorias).as_py():,}")
+    por_anio = pd.Series(anios).value_counts().sort_index()
+    for anio, n in por_anio.tail(10).items():
+        print(f"  {anio}: {n:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Almacen de works de los autores del ranking en Parquet")
+    parser.add_argument("--ranking", type=Path, default=None,
+                        help="ranking_final_*.csv de origen (por defecto el mas reciente)")
+    parser.add_argument("--completo", action="store_true",
+                        help="Volver a cosechar los works de todos los autores")
+    parser.add_argument("--resumen", action="store_true", help="Solo mostrar el contenido del almacen")
+    agregar_argumentos_cliente(parser)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ALMACEN DE WORKS - CIENCIAS SOCIALES CHILE")
+    print("=" * 60)
+
+    if args.resumen:
+        imprimir_resumen()
+        return None
+
+    client = configurar_cliente(cache=not args.sin_cache, offline=args.offline)
+
+    ranking = args.ranking or ranking_mas_reciente()
+    if ranking is None:
+        print(f"No hay ranking_final_*.csv en {RANKING_DIR}")
+        return None
+    ids = pd.read_csv(ranking, usecols=["openalex_id"], dtype=str)["openalex_id"].dropna()
+    ids = list(dict.fromkeys(i.replace("https://openalex.org/", "") for i in ids))
+    print(f"Autores: {len(ids)} de {ranking.name}\n")
+
+    resultado = refrescar(ids, completo=args.completo)
+
+    print(f"\nWorks descargados: {resultado['descargadas']:,}")
+    print(f"Nuevos: {resultado['nuevas']:,}, modificados: {resultado['modificadas']:,}, "
+          f"sin cambios: {resultado['sin_cambios']:,}; {resultado['anios_reescritos']} anios reescritos")
+    print(client.reporte())
+    print()
+    imprimir_resumen()
+
+    return resultado
+
+
+if __name__ == "__main__":
+    main()
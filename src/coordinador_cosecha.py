@@ -0,0 +1,507 @@
+"""
+Cosecha distribuida de autores: cola de shards con leases y presupuesto de tasa global.
+
+Un solo proceso con get_authors_chile queda corto cuando se refrescan varios
+países. Este script reparte la misma descarga entre varios procesos, en una
+o más máquinas, coordinados por una base SQLite compartida:
+
+1. planificar: divide cada país en shards (las particiones disjuntas de
+   planificar_particiones, o un cursor por filtro base con --workers 1) y
+   los deja en la cola como pendientes.
+2. trabajar: cada proceso toma un shard con un lease (vencimiento renovado
+   mientras descarga), recorre su cursor con descargar_particion y guarda
+   las filas en shards/<id>.jsonl junto a la cola. Si el proceso falla, el
+   shard vuelve a pendiente; si muere, su lease vence y otro lo retoma.
+   Todas las requests de la flota piden tokens a un presupuesto común en la
+   misma base (token bucket con tasa adaptativa, pausa por 429 y cuota
+   diaria), así la suma de procesos respeta los límites de OpenAlex.
+3. fusionar: con todos los shards terminados, mezcla las filas en el orden
+   del plan, deduplica por openalex_id y escribe el mismo CSV que
+   extraer_openalex.py (mismo orden determinista).
+
+Para varias máquinas, la cola debe estar en un directorio compartido
+(--cola) y los relojes sincronizados (los leases usan la hora del sistema).
+
+Uso:
+    python src/coordinador_cosecha.py planificar --workers 8
+    python src/coordinador_cosecha.py planificar --paises CL,AR,MX --workers 8
+    python src/coordinador_cosecha.py trabajar --procesos 4      # en cada máquina
+    python src/coordinador_cosecha.py estado
+    python src/coordinador_cosecha.py fusionar
+
+Genera:
+    data/raw/investigadores_openalex_YYYYMMDD.csv         (solo Chile)
+    data/raw/paises/XX/investigadores_openalex_YYYYMMDD.csv (con --paises)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from extraer_openalex import (OUTPUT_DIR, PAIS_DEFAULT, H_INDEX_MIN_DOWNLOAD, dir_pais, filtro_pais,
+                              filtros_servidor, filtro_particion, planificar_particiones,
+                              descargar_particion, topics_cs)
+from limitador import (LimitadorAdaptativo, CuotaAgotadaError, TASA_INICIAL, TASA_MAX, TASA_MIN,
+                       INCREMENTO, REDUCCION, CUOTA_DIARIA)
+from openalex_client import ejecutar, configurar_cliente, agregar_argumentos_cliente
+
+# Configuración
+COLA_PATH = Path(__file__).parent.parent / "data" / "coordinador" / "cola_cosecha.sqlite"
+DURACION_LEASE = 300  # Segundos de un lease de shard sin renovar
+RENOVAR_CADA = 60  # Segundos entre renovaciones del lease
+MAX_INTENTOS = 3  # Leases de un shard antes de marcarlo fallido
+ESPERA_SIN_TRABAJO = 15  # Segundos de espera cuando los shards restantes están tomados
+LOTE_TOKENS = 5  # Requests que un proceso toma del presupuesto global de una vez
+
+PENDIENTE, TOMADO, HECHO, FALLIDO = "pendiente", "tomado", "hecho", "fallido"
+
+
+class ColaCosecha:
+    """Cola de shards y presupuesto global de requests en una base SQLite."""
+
+    def __init__(self, path: Path = COLA_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.dir_shards = self.path.parent / "shards"
+        self.dir_shards.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS shards (
+                    id INTEGER PRIMARY KEY,
+                    pais TEXT,
+                    orden INTEGER,
+                    filtro TEXT,
+                    estimados INTEGER,
+                    estado TEXT,
+                    worker TEXT,
+                    vence REAL,
+                    intentos INTEGER DEFAULT 0,
+                    procesados INTEGER,
+                    filas INTEGER,
+                    error TEXT
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS presupuesto (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    tasa REAL, tokens REAL, actualizado REAL, pausa_hasta REAL,
+                    fecha TEXT, usadas INTEGER
+                )"""
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)")
+
+    @contextmanager
+    def _conectar(self):
+        """Una conexión por operación: la cola se usa desde varios hilos, procesos y máquinas."""
+        conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # Plan
+
+    def cargar_plan(self, shards: list, meta: dict):
+        """Reemplaza la cola con un plan nuevo: lista de (país, filtro, autores estimados)."""
+        for archivo in self.dir_shards.glob("*.jsonl"):
+            archivo.unlink()
+        with self._conectar() as conn:
+            conn.execute("DELETE FROM shards")
+            conn.execute("DELETE FROM meta")
+            conn.executemany(
+                "INSERT INTO shards (pais, orden, filtro, estimados, estado) VALUES (?, ?, ?, ?, ?)",
+                [(pais, orden, filtro, n, PENDIENTE) for orden, (pais, filtro, n) in enumerate(shards)],
+            )
+            conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                             [(k, json.dumps(v)) for k, v in meta.items()])
+
+    def meta(self) -> dict:
+        with self._conectar() as conn:
+            return {k: json.loads(v) for k, v in conn.execute("SELECT clave, valor FROM meta")}
+
+    # Leases
+
+    def tomar(self, worker: str):
+        """
+        Toma el shard pendiente más grande (o uno con el lease vencido).
+
+        Returns:
+            (id, país, filtro) o None si no hay shards disponibles
+        """
+        ahora = time.time()
+        with self._conectar() as conn:
+            conn.execute(
+                "UPDATE shards SET estado = ?, error = 'lease vencido' "
+                "WHERE estado = ? AND vence < ? AND intentos >= ?",
+                (FALLIDO, TOMADO, ahora, MAX_INTENTOS),
+            )
+            fila = conn.execute(
+                "SELECT id, pais, filtro FROM shards "
+                "WHERE estado = ? OR (estado = ? AND vence < ?) "
+                "ORDER BY estimados DESC, orden LIMIT 1",
+                (PENDIENTE, TOMADO, ahora),
+            ).fetchone()
+            if fila is None:
+                return None
+            conn.execute(
+                "UPDATE shards SET estado = ?, worker = ?, vence = ?, intentos = intentos + 1 WHERE id = ?",
+                (TOMADO, worker, ahora + DURACION_LEASE, fila[0]),
+            )
+            return fila
+
+    def renovar(self, shard_id: int, worker: str) -> bool:
+        """Extiende el lease; False si el shard ya no es de este worker."""
+        with self._conectar() as conn:
+            cur = conn.execute(
+                "UPDATE shards SET vence = ? WHERE id = ? AND worker = ? AND estado = ?",
+                (time.time() + DURACION_LEASE, shard_id, worker, TOMADO),
+            )
+            return cur.rowcount == 1
+
+    def completar(self, shard_id: int, worker: str, filas: list, procesados: int) -> bool:
+        """Guarda las filas del shard y lo marca hecho (si el lease sigue siendo de este worker)."""
+        destino = self.archivo_shard(shard_id)
+        tmp = destino.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for fila in filas:
+                f.write(json.dumps(fila, ensure_ascii=False) + "\n")
+        with self._conectar() as conn:
+            cur = conn.execute(
+                "UPDATE shards SET estado = ?, procesados = ?, filas = ?, error = NULL "
+                "WHERE id = ? AND worker = ? AND estado = ?",
+                (HECHO, procesados, len(filas), shard_id, worker, TOMADO),
+            )
+            if cur.rowcount == 1:
+                os.replace(tmp, destino)
+                return True
+        tmp.unlink()
+        return False
+
+    def fallar(self, shard_id: int, worker: str, error: str):
+        """Devuelve el shard a la cola, o lo marca fallido si agotó sus intentos."""
+        with self._conectar() as conn:
+            conn.execute(
+                "UPDATE shards SET estado = CASE WHEN intentos >= ? THEN ? ELSE ? END, "
+                "worker = NULL, vence = NULL, error = ? WHERE id = ? AND worker = ?",
+                (MAX_INTENTOS, FALLIDO, PENDIENTE, error[:500], shard_id, worker),
+            )
+
+    def reintentar_fallidos(self) -> int:
+        with self._conectar() as conn:
+            return conn.execute(
+                "UPDATE shards SET estado = ?, intentos = 0 WHERE estado = ?", (PENDIENTE, FALLIDO)
+            ).rowcount
+
+    def archivo_shard(self, shard_id: int) -> Path:
+        return self.dir_shards / f"{shard_id}.jsonl"
+
+    def resumen(self) -> dict:
+        """{estado: shards} y filas por país de los shards terminados."""
+        with self._conectar() as conn:
+            estados = dict(conn.execute("SELECT estado, COUNT(*) FROM shards GROUP BY estado"))
+            paises = conn.execute(
+                "SELECT pais, COUNT(*), SUM(estado = ?), SUM(COALESCE(filas, 0)) "
+                "FROM shards GROUP BY pais ORDER BY MIN(orden)", (HECHO,)
+            ).fetchall()
+            errores = conn.execute(
+                "SELECT id, pais, error FROM shards WHERE error IS NOT NULL AND estado != ?", (HECHO,)
+            ).fetchall()
+        return {"estados": estados, "paises": paises, "errores": errores}
+
+    def shards_hechos(self) -> list:
+        """(id, país) de todos los shards en el orden del plan; falla si alguno no terminó."""
+        with self._conectar() as conn:
+            filas = conn.execute("SELECT id, pais, estado FROM shards ORDER BY orden").fetchall()
+        faltan = [i for i, _, estado in filas if estado != HECHO]
+        if faltan:
+            raise RuntimeError(f"{len(faltan)} shards sin terminar (ej: {faltan[:5]})")
+        return [(i, pais) for i, pais, _ in filas]
+
+    # Presupuesto global de requests
+
+    def tomar_tokens(self, n: int):
+        """
+        Toma hasta n requests del presupuesto de la flota.
+
+        Returns:
+            (requests concedidas, segundos a esperar si no se concedió ninguna)
+        """
+        ahora = time.time()
+        hoy = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        with self._conectar() as conn:
+            fila = conn.execute(
+                "SELECT tasa, tokens, actualizado, pausa_hasta, fecha, usadas FROM presupuesto"
+            ).fetchone()
+            if fila is None:
+                fila = (TASA_INICIAL, 1.0, ahora, 0.0, hoy, 0)
+                conn.execute("INSERT INTO presupuesto VALUES (1, ?, ?, ?, ?, ?, ?)", fila)
+            tasa, tokens, actualizado, pausa_hasta, fecha, usadas = fila
+            if fecha != hoy:
+                fecha, usadas = hoy, 0
+            if usadas >= CUOTA_DIARIA:
+                raise CuotaAgotadaError(f"Cuota diaria de la flota agotada ({usadas}/{CUOTA_DIARIA} requests)")
+            if ahora < pausa_hasta:
+                return 0, pausa_hasta - ahora
+
+            tokens = min(max(float(n), tasa), tokens + (ahora - actualizado) * tasa)
+            concedidas = min(n, int(tokens), CUOTA_DIARIA - usadas)
+            if concedidas:
+                tokens -= concedidas
+                usadas += concedidas
+                # Aumento aditivo, igual que LimitadorAdaptativo.exito pero por lote
+                tasa = min(TASA_MAX, tasa + concedidas * INCREMENTO / tasa)
+            conn.execute(
+                "UPDATE presupuesto SET tasa = ?, tokens = ?, actualizado = ?, fecha = ?, usadas = ?",
+                (tasa, tokens, ahora, fecha, usadas),
+            )
+            return concedidas, 0.0 if concedidas else (1.0 - tokens) / tasa
+
+    def throttle(self, retry_after: float):
+        """Un 429 en cualquier proceso reduce la tasa de la flota y la pausa."""
+        with self._conectar() as conn:
+            conn.execute(
+                "UPDATE presupuesto SET tasa = MAX(?, tasa * ?), tokens = 0, pausa_hasta = MAX(pausa_hasta, ?)",
+                (TASA_MIN, REDUCCION, time.time() + retry_after),
+            )
+
+    def estado_presupuesto(self):
+        with self._conectar() as conn:
+            return conn.execute("SELECT tasa, fecha, usadas FROM presupuesto").fetchone()
+
+
+class LimitadorCompartido(LimitadorAdaptativo):
+    """
+    Limitador de un worker: antes del token bucket local, cada request toma un
+    token del presupuesto de la flota (en lotes de LOTE_TOKENS), y los 429
+    reducen y pausan también la tasa común.
+    """
+
+    def __init__(self, cola: ColaCosecha, **kwargs):
+        super().__init__(tasa=TASA_MAX, **kwargs)
+        self.cola = cola
+        self._concedidas = 0
+        self._lock_lote = threading.Lock()
+
+    def adquirir(self):
+        with self._lock_lote:
+            while self._concedidas == 0:
+                self._concedidas, espera = self.cola.tomar_tokens(LOTE_TOKENS)
+                if espera:
+                    time.sleep(espera)
+            self._concedidas -= 1
+        super().adquirir()
+
+    def throttle(self, retry_after: float = 5.0):
+        super().throttle(retry_after)
+        with self._lock_lote:
+            self._concedidas = 0
+        self.cola.throttle(retry_after)
+
+    def reporte(self) -> str:
+        tasa, fecha, usadas = self.cola.estado_presupuesto() or (0.0, "", 0)
+        return f"{super().reporte()}; flota: {tasa:.1f} req/s, {usadas}/{CUOTA_DIARIA} requests el {fecha}"
+
+
+async def planificar_paises(paises: list, workers: int, filtro_servidor: bool) -> list:
+    """
+    Shards de todos los países, en el orden en que los mezcla descargar_pais.
+
+    Returns:
+        Lista de (país, filtro, autores estimados)
+    """
+    async def plan_base(pais, base):
+        if workers <= 1:
+            return [(pais, f"{base},summary_stats.h_index:>{H_INDEX_MIN_DOWNLOAD}", 0)]
+        return [(pais, filtro_particion(p, base), n) for p, n in await planificar_particiones(workers, base)]
+
+    trabajos = [(pais, base) for pais in paises
+                for base in (filtros_servidor(pais) if filtro_servidor else [filtro_pais(pais)])]
+    planes = await asyncio.gather(*(plan_base(pais, base) for pais, base in trabajos))
+    return [shard for plan in planes for shard in plan]
+
+
+async def descargar_shard(cola: ColaCosecha, shard_id: int, pais: str, filtro: str, worker: str):
+    """Descarga un shard renovando su lease en segundo plano."""
+    async def mantener_lease():
+        while True:
+            await asyncio.sleep(RENOVAR_CADA)
+            if not await asyncio.to_thread(cola.renovar, shard_id, worker):
+                print(f"  [{worker}] Aviso: lease del shard {shard_id} perdido")
+
+    renovacion = asyncio.create_task(mantener_lease())
+    try:
+        return await descargar_particion(filtro, f"[{worker} shard {shard_id}] ", pais=pais)
+    finally:
+        renovacion.cancel()
+
+
+def trabajar(cola_path: Path, worker: str, cache: bool = True, offline: bool = False) -> int:
+    """
+    Bucle de un worker: toma shards hasta que no quede ninguno pendiente ni tomado.
+
+    Returns:
+        Shards completados por este worker
+    """
+    cola = ColaCosecha(cola_path)
+    configurar_cliente(cache=cache, offline=offline, limitador=LimitadorCompartido(cola))
+    topics_cs()
+
+    completados = 0
+    while True:
+        shard = cola.tomar(worker)
+        if shard is None:
+            estados = cola.resumen()["estados"]
+            if not estados.get(PENDIENTE) and not estados.get(TOMADO):
+                return completados
+            # Quedan shards tomados por otros: esperar por si su lease vence
+            time.sleep(ESPERA_SIN_TRABAJO)
+            continue
+
+        shard_id, pais, filtro = shard
+        try:
+            filas, procesados = ejecutar(descargar_shard(cola, shard_id, pais, filtro, worker))
+        except CuotaAgotadaError as e:
+            cola.fallar(shard_id, worker, str(e))
+            print(f"  [{worker}] {e}; el worker se detiene")
+            return completados
+        except Exception as e:
+            cola.fallar(shard_id, worker, f"{type(e).__name__}: {e}")
+            print(f"  [{worker}] Error en shard {shard_id}, vuelve a la cola: {e}")
+            continue
+
+        if cola.completar(shard_id, worker, filas, procesados):
+            completados += 1
+            print(f"  [{worker}] Shard {shard_id} ({pais}): {len(filas)} CS / {procesados} procesados")
+
+
+def fusionar(cola: ColaCosecha, fecha: str = None) -> dict:
+    """
+    Mezcla los shards terminados en el orden del plan y escribe un CSV por país.
+
+    El resultado es el mismo que el de extraer_openalex.py: primera aparición
+    de cada openalex_id y orden por h-index descendente y openalex_id.
+
+    Returns:
+        Diccionario {país: archivo CSV}
+    """
+    fecha = fecha or datetime.now().strftime("%Y%m%d")
+    multipais = cola.meta().get("multipais", False)
+
+    filas_por_pais = {}
+    vistos = {}
+    for shard_id, pais in cola.shards_hechos():
+        filas = filas_por_pais.setdefault(pais, [])
+        ids = vistos.setdefault(pais, set())
+        with open(cola.archivo_shard(shard_id), encoding="utf-8") as f:
+            for linea in f:
+                fila = json.loads(linea)
+                if fila["openalex_id"] not in ids:
+                    ids.add(fila["openalex_id"])
+                    filas.append(fila)
+
+    archivos = {}
+    for pais, filas in filas_por_pais.items():
+        if not filas:
+            print(f"  {pais}: sin autores")
+            continue
+        df = pd.DataFrame(filas).drop_duplicates(subset=["openalex_id"])
+        # Orden determinista: el resultado no depende del orden de descarga
+        df = df.sort_values(["h_index", "openalex_id"], ascending=[False, True], kind="mergesort")
+        directorio = dir_pais(pais) if multipais else OUTPUT_DIR
+        directorio.mkdir(parents=True, exist_ok=True)
+        archivo = directorio / f"investigadores_openalex_{fecha}.csv"
+        df.to_csv(archivo, index=False, encoding="utf-8-sig")
+        print(f"  {pais}: {len(df):6} investigadores  {archivo}")
+        archivos[pais] = archivo
+    return archivos
+
+
+def imprimir_estado(cola: ColaCosecha):
+    resumen = cola.resumen()
+    meta = cola.meta()
+    print(f"Plan del {meta.get('fecha', '-')}: paises {', '.join(meta.get('paises', []))}")
+    print("Shards: " + ", ".join(f"{resumen['estados'].get(e, 0)} {e}" for e in (PENDIENTE, TOMADO, HECHO, FALLIDO)))
+    for pais, total, hechos, filas in resumen["paises"]:
+        print(f"  {pais}: {hechos}/{total} shards, {filas} autores CS")
+    for shard_id, pais, error in resumen["errores"][:10]:
+        print(f"  Shard {shard_id} ({pais}): {error}")
+    presupuesto = cola.estado_presupuesto()
+    if presupuesto:
+        print(f"Presupuesto de la flota: {presupuesto[0]:.1f} req/s, "
+              f"{presupuesto[2]}/{CUOTA_DIARIA} requests el {presupuesto[1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cosecha de OpenAlex repartida entre procesos y maquinas")
+    parser.add_argument("accion", choices=["planificar", "trabajar", "estado", "fusionar"])
+    parser.add_argument("--cola", type=Path, default=COLA_PATH,
+                        help="Base SQLite de la cola (en un directorio compartido para varias maquinas)")
+    parser.add_argument("--paises", default=None,
+                        help="planificar: codigos ISO separados por coma (por defecto solo Chile)")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="planificar: procesos previstos en toda la flota (define el numero de shards)")
+    parser.add_argument("--filtro-servidor", action="store_true",
+                        help="planificar: filtrar ciencias sociales en la API (ver extraer_openalex)")
+    parser.add_argument("--procesos", type=int, default=1, help="trabajar: procesos en esta maquina")
+    parser.add_argument("--reintentar", action="store_true",
+                        help="trabajar: devolver a la cola los shards fallidos antes de empezar")
+    agregar_argumentos_cliente(parser)
+    args = parser.parse_args()
+
+    cola = ColaCosecha(args.cola)
+
+    if args.accion == "planificar":
+        paises = [p.strip().upper() for p in args.paises.split(",") if p.strip()] if args.paises else [PAIS_DEFAULT]
+        configurar_cliente(cache=not args.sin_cache, offline=args.offline)
+        print(f"Planificando {', '.join(paises)} para {args.workers} workers...")
+        shards = ejecutar(planificar_paises(paises, args.workers, args.filtro_servidor))
+        cola.cargar_plan(shards, {
+            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "paises": paises,
+            "multipais": bool(args.paises),
+            "filtro_servidor": args.filtro_servidor,
+        })
+        print(f"{len(shards)} shards en {cola.path}")
+
+    elif args.accion == "trabajar":
+        if args.reintentar:
+            print(f"{cola.reintentar_fallidos()} shards fallidos de vuelta a la cola")
+        base = f"{socket.gethostname()}:{os.getpid()}"
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+            futuros = [pool.submit(trabajar, args.cola, f"{base}/{i}", not args.sin_cache, args.offline)
+                       for i in range(args.procesos)]
+            completados = sum(f.result() for f in as_completed(futuros))
+        print(f"\n{completados} shards completados en {time.perf_counter() - inicio:.0f} s")
+        imprimir_estado(cola)
+
+    elif args.accion == "estado":
+        imprimir_estado(cola)
+
+    else:
+        try:
+            fusionar(cola)
+        except RuntimeError as e:
+            print(f"No se puede fusionar: {e}")
+            imprimir_estado(cola)
+            return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Cosecha de candidatos a partir de publicaciones (works) en vez de perfiles de autor.
+
+El campo last_known_institutions de los autores origina muchos errores
+(EXCLUIR_NOMBRES, EXCLUIR_AFILIACIONES en procesar_ranking). Este script
+recorre los works con alguna institución chilena y tema principal en el
+dominio Social Sciences, un cursor por año en paralelo, y acumula por
+autor cuántos de sus works en la cosecha lo muestran afiliado a Chile.
+El resultado es una señal de residencia obtenida en una sola pasada.
+
+Uso:
+    python src/cosecha_obras.py                      # últimos 10 años
+    python src/cosecha_obras.py --desde 2015 --hasta 2024
+    python src/cosecha_obras.py --min-obras-chile 3
+
+Genera:
+    data/raw/candidatos_obras_YYYYMMDD.csv
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+
+from extraer_openalex import OUTPUT_DIR, DOMINIO_CS_ID
+from modelos_openalex import PaginaObras
+from openalex_client import get_client, ejecutar, configurar_cliente, agregar_argumentos_cliente
+from sumidero_autores import id_numerico
+
+# Configuración
+ANIOS_DEFAULT = 10
+
+# Works con institución chilena y tema principal de ciencias sociales
+FILTRO_OBRAS = (f"authorships.institutions.country_code:cl,"
+                f"primary_topic.domain.id:{DOMINIO_CS_ID}")
+
+# Campos de work que se leen (select= de la API)
+CAMPOS_OBRA = ["id", "publication_year", "authorships"]
+
+# Works con afiliación chilena mínimos para ser candidato
+MIN_OBRAS_CHILE = 2
+
+# Posiciones en la lista de contadores de cada autor
+OBRAS, OBRAS_CHILE, PRIMER_ANIO, ULTIMO_ANIO = range(4)
+
+
+class AcumuladorAutorias:
+    """
+    Conteos por autor, actualizados obra a obra.
+
+    Cada autor (por su ID numérico) tiene una lista de cuatro enteros
+    [obras, obras con afiliación chilena, primer año, último año]; los
+    nombres y las instituciones chilenas se guardan aparte.
+    """
+
+    def __init__(self):
+        self.conteos = {}
+        self.nombres = {}
+        self.orcids = {}
+        self.instituciones = Counter()  # (autor, institución chilena) -> obras
+        self.obras = 0
+
+    def agregar(self, obra):
+        anio = obra.publication_year or 0
+        self.obras += 1
+        for autoria in obra.authorships:
+            if autoria.author is None or not autoria.author.id:
+                continue
+            autor = id_numerico(autoria.author.id)
+
+            c = self.conteos.get(autor)
+            if c is None:
+                c = self.conteos[autor] = [0, 0, anio, anio]
+                self.nombres[autor] = autoria.author.display_name or ""
+                if autoria.author.orcid:
+                    self.orcids[autor] = autoria.author.orcid.replace("https://orcid.org/", "")
+
+            c[OBRAS] += 1
+            c[PRIMER_ANIO] = min(c[PRIMER_ANIO], anio)
+            c[ULTIMO_ANIO] = max(c[ULTIMO_ANIO], anio)
+
+            chilenas = [i.display_name for i in autoria.institutions if i.country_code == "CL"]
+            if chilenas:
+                c[OBRAS_CHILE] += 1
+                for nombre in set(chilenas):
+                    self.instituciones[(autor, nombre)] += 1
+
+    def candidatos(self, min_obras_chile: int = MIN_OBRAS_CHILE) -> list:
+        """Filas de autores con al menos min_obras_chile works afiliados a Chile."""
+        institucion = {}
+        for (autor, nombre), n in self.instituciones.most_common():
+            institucion.setdefault(autor, nombre)
+
+        filas = []
+        for autor, c in self.conteos.items():
+            if c[OBRAS_CHILE] < min_obras_chile:
+                continue
+            filas.append({
+                "openalex_id": f"https://openalex.org/A{autor}",
+                "nombre": self.nombres[autor],
+                "orcid": self.orcids.get(autor, ""),
+                "obras_cosecha": c[OBRAS],
+                "obras_chile": c[OBRAS_CHILE],
+                "fraccion_chile": round(c[OBRAS_CHILE] / c[OBRAS], 2),
+                "primer_anio": c[PRIMER_ANIO],
+                "ultimo_anio": c[ULTIMO_ANIO],
+                "institucion": institucion.get(autor, ""),
+            })
+        return filas
+
+
+async def cosechar_anio(anio: int, acumulador: AcumuladorAutorias) -> int:
+    """Recorre el cursor de works de un año y los agrega al acumulador."""
+    params = {
+        "filter": f"{FILTRO_OBRAS},publication_year:{anio}",
+        "select": ",".join(CAMPOS_OBRA),
+    }
+    n = 0
+    async for data in get_client().apaginar("works", params, PaginaObras):
+        for obra in data.results:
+            acumulador.agregar(obra)
+        n += len(data.results)
+    print(f"  {anio}: {n} works")
+    return n
+
+
+def cosechar(desde: int, hasta: int) -> AcumuladorAutorias:
+    """Cosecha los años [desde, hasta] con un cursor por año, en paralelo."""
+    acumulador = AcumuladorAutorias()
+
+    async def todos():
+        # Las corrutinas comparten el hilo del loop: el acumulador no necesita locks
+        return await asyncio.gather(*(cosechar_anio(a, acumulador) for a in range(desde, hasta + 1)))
+
+    ejecutar(todos())
+    return acumulador
+
+
+def main():
+    anio_actual = datetime.now().year
+    parser = argparse.ArgumentParser(description="Candidatos a partir de works con afiliacion chilena")
+    parser.add_argument("--desde", type=int, default=anio_actual - ANIOS_DEFAULT + 1,
+                        help="Primer anio de publicacion")
+    parser.add_argument("--hasta", type=int, default=anio_actual, help="Ultimo anio de publicacion")
+    parser.add_argument("--min-obras-chile", type=int, default=MIN_OBRAS_CHILE,
+                        help="Works con afiliacion chilena minimos por candidato")
+    agregar_argumentos_cliente(parser)
+    args = parser.parse_args()
+
+    client = configurar_cliente(cache=not args.sin_cache, offline=args.offline)
+
+    print("=" * 60)
+    print("COSECHA POR WORKS - CIENCIAS SOCIALES CHILE")
+    print("=" * 60)
+    print(f"Anios: {args.desde}-{args.hasta}\n")
+
+    acumulador = cosechar(args.desde, args.hasta)
+    filas = acumulador.candidatos(args.min_obras_chile)
+
+    print(f"\nWorks: {acumulador.obras:,}")
+    print(f"Autores en la cosecha: {len(acumulador.conteos):,}")
+    print(f"Candidatos (>= {args.min_obras_chile} works con afiliacion chilena): {len(filas):,}")
+    print(client.reporte())
+
+    if not filas:
+        return None
+
+    df = pd.DataFrame(filas)
+    df = df.sort_values(["obras_chile", "openalex_id"], ascending=[False, True], kind="mergesort")
+
+    output_file = OUTPUT_DIR / f"candidatos_obras_{datetime.now().strftime('%Y%m%d')}.csv"
+    df.to_csv(output_file, index=False, encoding="utf-8-sig")
+    print(f"Archivo: {output_file}")
+
+    print(f"\nTop 10 por works con afiliacion chilena:")
+    for _, r in df.head(10).iterrows():
+        print(f"  {r['nombre'][:40]:40} {r['obras_chile']:4}/{r['obras_cosecha']:<4} {r['institucion'][:30]}")
+
+    return df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Descubrimiento de investigadores faltantes por coautoría ("bola de nieve").
+
+Parte de los autores del ranking actual y se expande por sus coautores en
+works recientes:
+1. Expansión: se piden los works recientes de las fuentes (filtro OR de
+   author.id, por lotes, recorriendo el cursor de cada lote) y cada coautor afiliado a Chile en ese work suma
+   un punto de prioridad.
+2. Verificación: los candidatos con más coautorías chilenas salen primero
+   de la frontera (heap) y se descargan sus perfiles por lotes de IDs;
+   los que pasan procesar_autor (Chile y ciencias sociales) y el h-index
+   mínimo se aceptan y pasan a ser fuentes de la ronda siguiente.
+
+Un conjunto de visitados evita repetir autores, un semáforo acota las
+requests simultáneas y el presupuesto de requests detiene la búsqueda.
+
+Uso:
+    python src/descubrir_coautores.py
+    python src/descubrir_coautores.py --presupuesto 500 --rondas 3
+
+Genera (mismo formato que investigadores_openalex_*.csv, ver
+procesar_ranking.cargar_datos):
+    data/raw/candidatos_coautoria_YYYYMMDD.csv
+"""
+
+import argparse
+import asyncio
+import heapq
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+
+from extraer_openalex import (OUTPUT_DIR, H_INDEX_MIN_DOWNLOAD, LOTE_IDS, procesar_autor,
+                              ranking_mas_reciente, refrescar_lote)
+from modelos_openalex import PaginaObras
+from openalex_client import get_client, ejecutar, configurar_cliente, agregar_argumentos_cliente
+from sumidero_autores import id_numerico
+
+# Configuración
+PRESUPUESTO = 300  # Requests máximas de una ejecución
+CONCURRENCIA = 4  # Requests simultáneas de esta etapa
+RONDAS = 2
+ANIOS_RECIENTES = 5  # Ventana de works para la expansión
+LOTE_FUENTES = 50  # Autores por request de works (filtro OR de author.id)
+PAGINAS_POR_LOTE = 10  # Páginas de 200 works como máximo por lote de fuentes
+VERIFICAR_POR_RONDA = 1000  # Candidatos verificados por ronda (los de mayor prioridad)
+MIN_COAUTORIAS = 2  # Coautorías chilenas mínimas para verificar a un candidato
+
+
+class Presupuesto:
+    """Cuenta las requests de la búsqueda y las acota a un máximo."""
+
+    def __init__(self, maximo: int, concurrencia: int):
+        self.maximo = maximo
+        self.usadas = 0
+        self._semaforo = asyncio.Semaphore(concurrencia)
+
+    @property
+    def agotado(self) -> bool:
+        return self.usadas >= self.maximo
+
+    async def llamar(self, corrutina_fn, *args):
+        """Ejecuta una request si queda presupuesto; si no, devuelve None."""
+        async with self._semaforo:
+            if self.agotado:
+                return None
+            self.usadas += 1
+            return await corrutina_fn(*args)
+
+
+async def works_recientes(fuentes: list, desde: int, presupuesto: Presupuesto) -> list:
+    """
+    Works recientes de un lote de autores, recorriendo el cursor mientras
+    quede presupuesto (cada página es una request, hasta PAGINAS_POR_LOTE).
+    """
+    params = {
+        "filter": f"author.id:{'|'.join(fuentes)},publication_year:>{desde - 1}",
+        "select": "id,publication_year,authorships",
+        "per_page": 200,
+        "cursor": "*",
+    }
+    paginas = []
+    while params["cursor"] and len(paginas) < PAGINAS_POR_LOTE:
+        pagina = await presupuesto.llamar(get_client().aget_modelo, "works", dict(params), PaginaObras)
+        if pagina is None or not pagina.results:
+            break
+        paginas.append(pagina)
+        params["cursor"] = pagina.meta.next_cursor if pagina.meta else None
+    return paginas
+
+
+async def expandir(fuentes: list, visitados: set, prioridad: Counter, presupuesto: Presupuesto,
+                   desde: int) -> int:
+    """Suma prioridad a los coautores chilenos no visitados de las fuentes."""
+    lotes = [fuentes[i:i + LOTE_FUENTES] for i in range(0, len(fuentes), LOTE_FUENTES)]
+    por_lote = await asyncio.gather(*(works_recientes(l, desde, presupuesto) for l in lotes))
+
+    nuevos = 0
+    for pagina in (p for paginas in por_lote for p in paginas):
+        for obra in pagina.results:
+            for autoria in obra.authorships:
+                if autoria.author is None or not autoria.author.id:
+                    continue
+                autor = id_numerico(autoria.author.id)
+                if autor in visitados:
+                    continue
+                if any(i.country_code == "CL" for i in autoria.institutions):
+                    if autor not in prioridad:
+                        nuevos += 1
+                    prioridad[autor] += 1
+    return nuevos
+
+
+async def verificar(candidatos: list, presupuesto: Presupuesto) -> list:
+    """Descarga los perfiles de los candidatos y devuelve las filas aceptadas."""
+    ids = [f"A{c}" for c in candidatos]
+    lotes = [ids[i:i + LOTE_IDS] for i in range(0, len(ids), LOTE_IDS)]
+    resultados = await asyncio.gather(*(presupuesto.llamar(refrescar_lote, l) for l in lotes))
+
+    aceptados = []
+    for results in resultados:
+        for author in results or []:
+            fila = procesar_autor(author)
+            if fila and fila["h_index"] > H_INDEX_MIN_DOWNLOAD:
+                aceptados.append(fila)
+    return aceptados
+
+
+async def descubrir(semillas: list, presupuesto_max: int = PRESUPUESTO, rondas: int = RONDAS,
+                    concurrencia: int = CONCURRENCIA, min_coautorias: int = MIN_COAUTORIAS) -> list:
+    """
+    Búsqueda por coautoría desde las semillas (IDs de OpenAlex).
+
+    Returns:
+        Filas de los autores nuevos aceptados (formato procesar_autor)
+    """
+    presupuesto = Presupuesto(presupuesto_max, concurrencia)
+    desde = datetime.now().year - ANIOS_RECIENTES + 1
+
+    visitados = {id_numerico(s) for s in semillas}
+    prioridad = Counter()  # Coautorías chilenas de cada candidato pendiente (se acumulan entre rondas)
+    fuentes = [f"A{s}" for s in sorted(visitados)]
+    encontrados = []
+
+    for ronda in range(1, rondas + 1):
+        if not fuentes or presupuesto.agotado:
+            break
+
+        nuevos = await expandir(fuentes, visitados, prioridad, presupuesto, desde)
+
+        # Frontera: los candidatos pendientes de mayor prioridad salen primero
+        frontera = [(-n, autor) for autor, n in prioridad.items() if n >= min_coautorias]
+        heapq.heapify(frontera)
+        candidatos = []
+        while frontera and len(candidatos) < VERIFICAR_POR_RONDA:
+            _, autor = heapq.heappop(frontera)
+            visitados.add(autor)
+            del prioridad[autor]
+            candidatos.append(autor)
+
+        aceptados = await verificar(candidatos, presupuesto)
+        encontrados.extend(aceptados)
+        fuentes = [a["openalex_id"].replace("https://openalex.org/", "") for a in aceptados]
+
+        print(f"  Ronda {ronda}: {nuevos} coautores chilenos nuevos, {len(candidatos)} verificados, "
+              f"{len(aceptados)} aceptados ({presupuesto.usadas}/{presupuesto.maximo} requests)")
+
+    if presupuesto.agotado:
+        print(f"  Presupuesto de {presupuesto.maximo} requests agotado")
+    return encontrados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Descubre investigadores chilenos por coautoria")
+    parser.add_argument("--presupuesto", type=int, default=PRESUPUESTO, help="Requests maximas")
+    parser.add_argument("--rondas", type=int, default=RONDAS, help="Rondas de expansion")
+    parser.add_argument("--concurrencia", type=int, default=CONCURRENCIA,
+                        help="Requests simultaneas")
+    parser.add_argument("--min-coautorias", type=int, default=MIN_COAUTORIAS,
+                        help="Coautorias chilenas minimas para verificar un candidato")
+    agregar_argumentos_cliente(parser)
+    args = parser.parse_args()
+
+    client = configurar_cliente(cache=not args.sin_cache, offline=args.offline)
+
+    print("=" * 60)
+    print("DESCUBRIMIENTO POR COAUTORIA - CIENCIAS SOCIALES CHILE")
+    print("=" * 60)
+
+    ranking = ranking_mas_reciente()
+    if ranking is None:
+        print("No hay ranking_final_*.csv para usar como semillas")
+        return None
+    semillas = pd.read_csv(ranking, usecols=["openalex_id"], dtype=str)["openalex_id"].dropna().tolist()
+    print(f"Semillas: {len(semillas)} autores de {ranking.name}\n")
+
+    encontrados = ejecutar(descubrir(semillas, args.presupuesto, args.rondas,
+                                     args.concurrencia, args.min_coautorias))
+
+    print(f"\nNuevos investigadores: {len(encontrados)}")
+    print(client.reporte())
+
+    if not encontrados:
+        return None
+
+    df = pd.DataFrame(encontrados)
+    df = df.sort_values(["h_index", "openalex_id"], ascending=[False, True], kind="mergesort")
+
+    # Nombre distinto de investigadores_openalex_* para no reemplazar la entrada de procesar_ranking
+    output_file = OUTPUT_DIR / f"candidatos_coautoria_{datetime.now().strftime('%Y%m%d')}.csv"
+    df.to_csv(output_file, index=False, encoding="utf-8-sig")
+    print(f"Archivo: {output_file}")
+
+    for _, r in df.head(10).iterrows():
+        print(f"  {r['nombre'][:40]:40} h={r['h_index']:2} {r['institucion'][:30]}")
+
+    return df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Checkpoints de descargas largas desde OpenAlex.
+
+Cada ejecución guarda su estado en un directorio data/checkpoints/<nombre>/,
+un archivo JSON por clave (plan de particiones, cursor de cada partición,
+archivo de salida...). Los archivos se escriben de forma atómica, así una
+ejecución interrumpida en cualquier punto puede reanudarse con --resume.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+# Configuración
+CHECKPOINT_DIR = Path(__file__).parent.parent / "data" / "checkpoints"
+
+
+def clave_filtro(filtro: str) -> str:
+    """Clave corta y estable para un filtro de OpenAlex."""
+    return hashlib.sha1(filtro.encode("utf-8")).hexdigest()[:16]
+
+
+class EstadoCosecha:
+    """Estado persistente de una ejecución (un JSON por clave)."""
+
+    def __init__(self, nombre: str, directorio: Path = CHECKPOINT_DIR):
+        self.nombre = nombre
+        self.dir = Path(directorio) / nombre
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, clave: str) -> Path:
+        return self.dir / f"{clave}.json"
+
+    def leer(self, clave: str, default=None):
+        """Devuelve el estado guardado para una clave, o default."""
+        path = self._path(clave)
+        if not path.exists():
+            return default
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def escribir(self, clave: str, estado):
+        """Guarda el estado de una clave (escritura atómica)."""
+        path = self._path(clave)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(estado, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def existe(self) -> bool:
+        return any(self.dir.glob("*.json"))
+
+    def limpiar(self):
+        """Elimina todo el estado (al terminar con éxito o al empezar de cero)."""
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.dir.mkdir(parents=True, exist_ok=True)
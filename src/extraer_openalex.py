@@ -6,30 +6,89 @@ Documentación: https://docs.openalex.org/
 
 Uso:
     python src/extraer_openalex.py
+    python src/extraer_openalex.py --workers 8   # descarga particionada en paralelo
+    python src/extraer_openalex.py --offline     # solo desde la cache de respuestas
+    python src/extraer_openalex.py --modo incremental   # solo autores modificados
+    python src/extraer_openalex.py --modo refrescar-conocidos   # solo autores del ranking actual
+    python src/extraer_openalex.py --streaming   # escribe a disco pagina a pagina
+    python src/extraer_openalex.py --resume      # continua una descarga --streaming interrumpida
+    python src/extraer_openalex.py --paises CL,AR,MX   # varios paises en paralelo
 
 Genera:
     data/raw/investigadores_openalex_YYYYMMDD.csv
 """
 
-import requests
+import argparse
+import asyncio
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from time import sleep
+
+from almacen_autores import AlmacenAutores
+from modelos_openalex import PaginaAutores, Resumen
+from estado_cosecha import EstadoCosecha, clave_filtro
+from sumidero_autores import SumideroJSONL
+from taxonomia_openalex import codigo_openalex, get_taxonomia
+from openalex_client import (API_KEY, get_client, ejecutar, configurar_cliente,
+                             agregar_argumentos_cliente, medir_proyeccion)
 
 # Configuración
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "raw"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-EMAIL = "ranking.ciencias.sociales@example.com"
-API_BASE = "https://api.openalex.org"
-
 # H-index mínimo para descargar (reduce cantidad de datos)
 H_INDEX_MIN_DOWNLOAD = 1
 
+# País por defecto y filtro de país (común a todas las particiones)
+PAIS_DEFAULT = "CL"
+
+
+def filtro_pais(pais=PAIS_DEFAULT):
+    """Filtro de OpenAlex por país de la institución actual (código ISO)."""
+    return f"last_known_institutions.country_code:{pais.lower()}"
+
+
+FILTRO_PAIS = filtro_pais(PAIS_DEFAULT)
+
+
+def dir_pais(pais, base=None):
+    """Directorio de un país en modo multi-país (data/raw/paises/XX por defecto)."""
+    return (base or OUTPUT_DIR) / "paises" / pais.upper()
+
+# Cosecha particionada: particiones por worker y tamaño mínimo de partición
+PARTICIONES_POR_WORKER = 4
+AUTORES_MIN_PARTICION = 1000
+
+# Modo incremental: días máximos entre descargas completas del almacén
+DIAS_REFRESCO_COMPLETO = 30
+
+# Modo refrescar-conocidos: ranking de origen y autores por request (filtro OR)
+RANKING_DIR = Path(__file__).parent.parent / "data" / "output"
+LOTE_IDS = 100
+
+# Campos de autor que leen es_ciencias_sociales y procesar_autor (select= de la API)
+CAMPOS_AUTOR = [
+    "id", "display_name", "orcid", "summary_stats", "cited_by_count",
+    "works_count", "last_known_institutions", "topics", "x_concepts", "affiliations",
+]
+
 # Dominios de ciencias sociales
 DOMINIOS_CS = {"Social Sciences"}
 
+# Id de OpenAlex del dominio Social Sciences (filtro en servidor)
+DOMINIO_CS_ID = 2
+
+# Conceptos nivel 0/1 cuyo display_name está en CAMPOS_CS (respaldo x_concepts)
+CONCEPTOS_CS = {
+    "C144024400": "Sociology",
+    "C162324750": "Economics",
+    "C15744967": "Psychology",
+    "C144133560": "Business",
+    "C205649164": "Geography",
+    "C199539241": "Law",
+    "C19165224": "Anthropology",
+}
+
 # Campos específicos de ciencias sociales
 CAMPOS_CS = {
     "Sociology", "Political Science", "Economics", "Psychology",
@@ -41,122 +100,667 @@ CAMPOS_CS = {
 }
 
 
+_topics_cs = None
+
+
+def topics_cs():
+    """
+    Lista booleana por código de topic: dominio en DOMINIOS_CS o campo en
+    CAMPOS_CS, según la taxonomía local (None si no está disponible).
+    """
+    global _topics_cs
+    if _topics_cs is None:
+        taxonomia = get_taxonomia()
+        mascara = taxonomia.mascara_topics(DOMINIOS_CS, CAMPOS_CS) if taxonomia else None
+        # Lista de Python: la consulta por autor es más rápida que indexar numpy
+        _topics_cs = mascara.tolist() if mascara is not None else False
+    return _topics_cs or None
+
+
 def es_ciencias_sociales(author):
-    """Determina si un autor es de ciencias sociales."""
-    topics = author.get("topics", [])
+    """Determina si un autor (modelos_openalex.Autor) es de ciencias sociales."""
+    mascara = topics_cs()
+    taxonomia = get_taxonomia() if mascara is not None else None
 
     # Revisar los primeros 5 topics
-    for topic in topics[:5]:
-        domain = topic.get("domain", {}).get("display_name", "")
-        field = topic.get("field", {}).get("display_name", "")
+    for topic in author.topics[:5]:
+        field = (topic.field.display_name if topic.field else None) or ""
 
-        if domain in DOMINIOS_CS:
-            return True, field
+        codigo = codigo_openalex(topic.id)
+        if taxonomia is not None and taxonomia.conoce_topic(codigo):
+            if mascara[codigo]:
+                return True, field
+            continue
 
-        if field in CAMPOS_CS:
+        # Topic ausente de la taxonomía local: comparar nombres
+        domain = (topic.domain.display_name if topic.domain else None) or ""
+        if domain in DOMINIOS_CS or field in CAMPOS_CS:
             return True, field
 
     # Revisar x_concepts como backup
-    x_concepts = author.get("x_concepts", [])
-    for concept in x_concepts[:10]:
-        name = concept.get("display_name", "")
-        score = concept.get("score", 0)
+    for concept in author.x_concepts[:10]:
+        name = concept.display_name or ""
+        score = concept.score or 0
         if score > 40 and name in CAMPOS_CS:
             return True, name
 
     return False, ""
 
 
-def get_authors_chile():
-    """Obtiene autores chilenos con h-index >= 1 y filtra ciencias sociales."""
-    print(f"Descargando autores de Chile con h-index > {H_INDEX_MIN_DOWNLOAD}...")
+def procesar_autor(author, pais=PAIS_DEFAULT):
+    """
+    Convierte un autor de la API (modelos_openalex.Autor) en fila del ranking, o None si no aplica.
 
-    all_authors = []
-    cursor = "*"
-    page = 0
-    cs_count = 0
+    La fila usa la primera institución actual del país `pais` (código ISO) e
+    incluye los conteos del historial de afiliaciones con los que
+    procesar_ranking.calcular_residencia estima si el autor reside en el país.
+    """
+    # Verificar si es ciencias sociales
+    es_cs, campo = es_ciencias_sociales(author)
+    if not es_cs:
+        return None
+
+    # Extraer datos
+    summary = author.summary_stats or Resumen()
+
+    inst_name = ""
+    for inst in author.last_known_institutions:
+        if inst.country_code == pais:
+            inst_name = inst.display_name or ""
+            break
+
+    if not inst_name:
+        return None
+
+    # Historial de afiliaciones: años con alguna institución y con una del país
+    anios_todos, anios_pais = set(), set()
+    for afiliacion in author.affiliations:
+        anios_todos.update(afiliacion.years)
+        if afiliacion.institution is not None and afiliacion.institution.country_code == pais:
+            anios_pais.update(afiliacion.years)
+
+    return {
+        "openalex_id": author.id or "",
+        "nombre": author.display_name or "",
+        "orcid": (author.orcid or "").replace("https://orcid.org/", ""),
+        "h_index": summary.h_index or 0,
+        "i10_index": summary.i10_index or 0,
+        "cited_by_count": author.cited_by_count or 0,
+        "works_count": author.works_count or 0,
+        "2yr_mean_citedness": round(summary.mean_citedness_2yr or 0, 2),
+        "institucion": inst_name,
+        "campo_principal": campo,
+        "pais": pais,
+        "anios_afiliacion": len(anios_todos),
+        "anios_pais": len(anios_pais),
+        "ultimo_anio_afiliacion": max(anios_todos, default=0),
+        "ultimo_anio_pais": max(anios_pais, default=0),
+    }
+
+
+def filtro_particion(particion, base=FILTRO_PAIS):
+    """
+    Construye el filtro de OpenAlex para una partición.
+
+    Una partición es un dict {campo: (desde, hasta)} con rangos semiabiertos
+    [desde, hasta); hasta=None deja el rango abierto hacia arriba.
+    """
+    partes = [base]
+    for campo, (desde, hasta) in particion.items():
+        if desde > 0:
+            partes.append(f"{campo}:>{desde - 1}")
+        if hasta is not None:
+            partes.append(f"{campo}:<{hasta}")
+    return ",".join(partes)
+
+
+def dividir_rango(desde, hasta):
+    """Parte un rango en dos; los rangos abiertos se cortan geométricamente."""
+    if hasta is None:
+        medio = max(desde + 1, desde * 2)
+    else:
+        medio = (desde + hasta) // 2
+    return (desde, medio), (medio, hasta)
+
+
+async def planificar_particiones(workers, base=FILTRO_PAIS):
+    """
+    Divide la descarga en particiones disjuntas de tamaño similar.
+
+    Parte por rangos de h-index y, cuando un rango ya es un único valor de
+    h-index, por rangos de works_count. Los tamaños se miden con meta.count,
+    de modo que cada partición quede cerca del objetivo total / particiones.
+    Los conteos de cada nivel de la bisección se piden en paralelo.
+    """
+    client = get_client()
+    inicial = {
+        "summary_stats.h_index": (H_INDEX_MIN_DOWNLOAD + 1, None),
+        "works_count": (0, None),
+    }
+    total = await client.acontar("authors", filtro_particion(inicial, base))
+    objetivo = max(AUTORES_MIN_PARTICION,
+                   -(-total // (workers * PARTICIONES_POR_WORKER)))
+    print(f"  Total a descargar: {total} autores, objetivo {objetivo} por particion")
+
+    pendientes = [(inicial, total)]
+    particiones = []
+    while pendientes:
+        cortes = []
+        for particion, n in pendientes:
+            if n == 0:
+                continue
+            if n <= objetivo:
+                particiones.append((particion, n))
+                continue
+
+            # Elegir la dimensión a cortar: primero h-index, luego works_count
+            for campo in ("summary_stats.h_index", "works_count"):
+                desde, hasta = particion[campo]
+                if hasta is None or hasta - desde > 1:
+                    break
+            else:
+                # No se puede dividir más (un único valor en ambas dimensiones)
+                particiones.append((particion, n))
+                continue
+
+            izquierda, derecha = dividir_rango(desde, hasta)
+            cortes.append(({**particion, campo: izquierda},
+                           {**particion, campo: derecha}, n))
+
+        conteos = await asyncio.gather(
+            *(client.acontar("authors", filtro_particion(p_izq, base)) for p_izq, _, _ in cortes)
+        )
+        pendientes = []
+        for (p_izq, p_der, n), n_izq in zip(cortes, conteos):
+            pendientes.append((p_izq, n_izq))
+            pendientes.append((p_der, n - n_izq))
+
+    # Orden estable: por rangos, para que la mezcla sea determinista
+    particiones.sort(key=lambda x: [x[0][c][0] for c in x[0]])
+    return particiones
+
+
+async def descargar_particion(filtro, etiqueta="", sumidero=None, estado=None, pais=PAIS_DEFAULT):
+    """
+    Recorre un cursor completo de OpenAlex y devuelve (autores CS, procesados).
+
+    Con un sumidero, cada página se escribe apenas llega y la lista devuelta
+    queda vacía (la memoria no crece con la población).
+
+    Con un estado (EstadoCosecha, requiere sumidero), tras cada página se
+    guarda el siguiente cursor, de modo que una ejecución interrumpida
+    continúa desde la última página escrita. Los errores de red se
+    reintentan en el cliente; si persisten, se propagan con el checkpoint
+    ya guardado.
+    """
+    client = get_client()
+    authors = []
+    clave = f"cursor_{clave_filtro(filtro)}"
+    previo = estado.leer(clave) if estado is not None else None
+
+    if previo:
+        cursor, page = previo["cursor"], previo["pagina"]
+        procesados, encontrados = previo["procesados"], previo["encontrados"]
+        if cursor:
+            print(f"  {etiqueta}Reanudando desde pag {page}")
+    else:
+        cursor, page, procesados, encontrados = "*", 0, 0, 0
 
     while cursor:
-        url = f"{API_BASE}/authors"
         params = {
-            "filter": f"last_known_institutions.country_code:cl,summary_stats.h_index:>{H_INDEX_MIN_DOWNLOAD}",
+            "filter": filtro,
+            "select": ",".join(CAMPOS_AUTOR),
             "per_page": 200,
             "cursor": cursor,
-            "mailto": EMAIL,
         }
 
-        try:
-            response = requests.get(url, params=params, timeout=60)
-            response.raise_for_status()
-            data = response.json()
-
-            results = data.get("results", [])
-            if not results:
-                break
-
-            for author in results:
-                # Verificar si es ciencias sociales
-                es_cs, campo = es_ciencias_sociales(author)
-                if not es_cs:
-                    continue
-
-                # Extraer datos
-                summary = author.get("summary_stats", {})
-                last_inst = author.get("last_known_institutions", [])
-
-                inst_name = ""
-                for inst in last_inst:
-                    if inst.get("country_code") == "CL":
-                        inst_name = inst.get("display_name", "")
-                        break
-
-                if not inst_name:
-                    continue
-
-                author_data = {
-                    "openalex_id": author.get("id", ""),
-                    "nombre": author.get("display_name", ""),
-                    "orcid": (author.get("orcid") or "").replace("https://orcid.org/", ""),
-                    "h_index": summary.get("h_index", 0),
-                    "i10_index": summary.get("i10_index", 0),
-                    "cited_by_count": author.get("cited_by_count", 0),
-                    "works_count": author.get("works_count", 0),
-                    "2yr_mean_citedness": round(summary.get("2yr_mean_citedness", 0), 2),
-                    "institucion": inst_name,
-                    "campo_principal": campo,
-                    "pais": "CL",
-                }
-                all_authors.append(author_data)
-                cs_count += 1
-
-            meta = data.get("meta", {})
-            cursor = meta.get("next_cursor")
-            total = meta.get("count", 0)
+        data = await client.aget_modelo("authors", params, PaginaAutores)
+
+        results = data.results
+        if not results:
+            cursor = None
+        else:
+            filas = [f for f in (procesar_autor(a, pais) for a in results) if f]
+            encontrados += len(filas)
+            if sumidero is not None:
+                sumidero.agregar(filas)
+            else:
+                authors.extend(filas)
+
+            cursor = data.meta.next_cursor if data.meta else None
+            total = (data.meta.count if data.meta else None) or 0
             page += 1
+            procesados += len(results)
 
             if page % 20 == 0:
-                print(f"  Pag {page}: {len(all_authors)} CS / {page*200} procesados de {total}")
+                print(f"  {etiqueta}Pag {page}: {encontrados} CS / {procesados} procesados de {total}")
+
+        if estado is not None:
+            estado.escribir(clave, {"cursor": cursor, "pagina": page,
+                                    "procesados": procesados, "encontrados": encontrados})
+
+    return authors, procesados
+
+
+async def descargar_particionado(workers, base=FILTRO_PAIS, sumidero=None, estado=None,
+                                 pais=PAIS_DEFAULT):
+    """
+    Planifica las particiones y recorre sus cursores de forma solapada.
+
+    Con un estado, el plan de particiones se guarda la primera vez y se
+    reutiliza al reanudar, para que los cursores guardados sigan siendo válidos.
+    """
+    clave = f"plan_{clave_filtro(base)}"
+    particiones = estado.leer(clave) if estado is not None else None
+    if particiones is None:
+        particiones = await planificar_particiones(workers, base)
+        if estado is not None:
+            estado.escribir(clave, particiones)
+    etiqueta = f"{pais} " if pais != PAIS_DEFAULT else ""
+    print(f"  {etiqueta}{len(particiones)} particiones con {workers} cursores simultaneos")
+
+    # Limitar los cursores activos a `workers` (el cliente acota además las requests)
+    limite = asyncio.Semaphore(workers)
+
+    async def descargar(i, filtro):
+        async with limite:
+            return await descargar_particion(filtro, f"{etiqueta}[{i + 1}/{len(particiones)}] ",
+                                             sumidero, estado, pais)
+
+    return await asyncio.gather(
+        *(descargar(i, filtro_particion(p, base)) for i, (p, _) in enumerate(particiones))
+    )
+
+
+def filtros_servidor(pais=PAIS_DEFAULT):
+    """
+    Filtros base que aplican la prueba de ciencias sociales en la API.
+
+    El primero trae autores con algún topic del dominio Social Sciences; el
+    segundo, sin solaparse con el primero, a los que solo califican por el
+    respaldo de x_concepts. Ambos son un superconjunto de lo que acepta
+    es_ciencias_sociales (que solo mira los 5 primeros topics), por lo que
+    el chequeo en cliente se mantiene como filtro residual exacto.
+    """
+    conceptos = "|".join(CONCEPTOS_CS)
+    return [
+        f"{filtro_pais(pais)},topics.domain.id:{DOMINIO_CS_ID}",
+        f"{filtro_pais(pais)},topics.domain.id:!{DOMINIO_CS_ID},x_concepts.id:{conceptos}",
+    ]
+
+
+async def descargar_pais(pais=PAIS_DEFAULT, workers=1, filtro_servidor=False,
+                         sumidero=None, estado=None):
+    """
+    Descarga los autores de un país (ver get_authors_chile).
+
+    Returns:
+        (filas deduplicadas por openalex_id, autores procesados)
+    """
+    bases = filtros_servidor(pais) if filtro_servidor else [filtro_pais(pais)]
 
-            sleep(0.05)
+    all_authors = []
+    vistos = set()
+    procesados = 0
+    for base in bases:
+        if workers <= 1:
+            filtro = f"{base},summary_stats.h_index:>{H_INDEX_MIN_DOWNLOAD}"
+            resultados = [await descargar_particion(filtro, sumidero=sumidero, estado=estado, pais=pais)]
+        else:
+            resultados = await descargar_particionado(workers, base, sumidero, estado, pais)
+
+        for authors, n in resultados:
+            procesados += n
+            for author_data in authors:
+                if author_data["openalex_id"] not in vistos:
+                    vistos.add(author_data["openalex_id"])
+                    all_authors.append(author_data)
+
+    return all_authors, procesados
+
+
+def get_authors_chile(workers=1, filtro_servidor=False, sumidero=None, estado=None,
+                      pais=PAIS_DEFAULT):
+    """
+    Obtiene autores chilenos (o del país `pais`) con h-index >= 1 y filtra ciencias sociales.
+
+    Con workers > 1 la descarga se divide en particiones disjuntas que se
+    recorren en paralelo, cada una con su propio cursor. El resultado se
+    mezcla en orden de partición y se deduplica por openalex_id.
+
+    Con filtro_servidor=True el filtro de dominio se aplica en la API (ver
+    filtros_servidor()) y se reporta cuántas requests se ahorraron respecto
+    de descargar todos los autores chilenos.
+
+    Con un sumidero (SumideroJSONL) las filas se escriben a disco página a
+    página, deduplicadas por el propio sumidero, y se devuelve el sumidero.
+    Con además un estado (EstadoCosecha), la descarga es reanudable.
+    """
+    if estado is not None and sumidero is None:
+        raise ValueError("Los checkpoints requieren un sumidero en disco")
+
+    print(f"Descargando autores de {pais} con h-index > {H_INDEX_MIN_DOWNLOAD}...")
+    topics_cs()  # Cargar la taxonomía antes de solapar requests
+
+    client = get_client()
+    llamadas_inicio = client.stats["llamadas"]
+
+    all_authors, procesados = ejecutar(descargar_pais(pais, workers, filtro_servidor, sumidero, estado))
+
+    print(f"\nTotal descargado: {procesados} autores")
+    print(f"Ciencias Sociales: {len(sumidero) if sumidero is not None else len(all_authors)}")
+
+    if filtro_servidor:
+        usadas = client.stats["llamadas"] - llamadas_inicio
+        filtro = f"{filtro_pais(pais)},summary_stats.h_index:>{H_INDEX_MIN_DOWNLOAD}"
+        total_pais = client.contar("authors", filtro)
+        # Páginas del recorrido sin filtro de dominio, más la página final vacía
+        estimadas = -(-total_pais // 200) + 1
+        print(f"Filtro en servidor: {usadas} requests vs ~{estimadas} filtrando en cliente "
+              f"({total_pais} autores de {pais}); ahorro de {estimadas - usadas} requests")
+
+    if sumidero is not None:
+        return sumidero
+    return all_authors
 
-        except requests.RequestException as e:
-            print(f"  Error pag {page}: {e}")
-            sleep(2)
-            continue
 
-    print(f"\nTotal descargado: {page * 200} autores")
-    print(f"Ciencias Sociales: {len(all_authors)}")
-    return all_authors
+def get_authors_paises(paises, workers=1, filtro_servidor=False):
+    """
+    Descarga varios países a la vez, en un solo loop.
+
+    Todas las requests pasan por el mismo cliente y limitador (tasa, 429 y
+    cuota diaria compartidos), así que los países se reparten el presupuesto
+    de la API en vez de multiplicarlo. Con workers > 1 cada país se divide
+    además en particiones.
+
+    Returns:
+        Diccionario {país: filas}
+    """
+    print(f"Descargando {len(paises)} paises en paralelo: {', '.join(paises)}")
+    topics_cs()
+
+    async def todos():
+        return await asyncio.gather(*(descargar_pais(p, workers, filtro_servidor) for p in paises))
+
+    resultados = {}
+    for pais, (authors, procesados) in zip(paises, ejecutar(todos())):
+        print(f"  {pais}: {len(authors)} CS de {procesados} procesados")
+        resultados[pais] = authors
+    return resultados
+
+
+async def descargar_delta(desde, conocidos=()):
+    """
+    Descarga los autores modificados en OpenAlex desde una fecha.
+
+    Las consultas no filtran por h-index, y la de los autores ya guardados
+    (`conocidos`, en lotes de LOTE_IDS) tampoco por país: así llegan también
+    los que dejaron de cumplir los filtros, y procesar_autor más el h-index
+    mínimo deciden si se actualizan o se eliminan.
+
+    Devuelve (filas a actualizar, ids que ya no cumplen los filtros, procesados).
+    """
+    conocidos = [str(i).replace("https://openalex.org/", "") for i in conocidos]
+    filtros = [f"{FILTRO_PAIS},from_updated_date:{desde}"]
+    filtros += [f"ids.openalex:{'|'.join(conocidos[i:i + LOTE_IDS])},from_updated_date:{desde}"
+                for i in range(0, len(conocidos), LOTE_IDS)]
+
+    async def recorrer(filtro):
+        params = {"filter": filtro, "select": ",".join(CAMPOS_AUTOR)}
+        autores = []
+        async for data in get_client().apaginar("authors", params, PaginaAutores):
+            autores.extend(data.results)
+        return autores
+
+    recibidos = {}
+    for autores in await asyncio.gather(*(recorrer(f) for f in filtros)):
+        for author in autores:
+            if author.id:
+                recibidos[author.id] = author
+
+    actualizados = []
+    bajas = []
+    for author_id, author in recibidos.items():
+        author_data = procesar_autor(author)
+        if author_data and author_data["h_index"] > H_INDEX_MIN_DOWNLOAD:
+            actualizados.append(author_data)
+        else:
+            bajas.append(author_id)
+
+    return actualizados, bajas, len(recibidos)
+
+
+def get_authors_incremental(workers=1, completo=False, filtro_servidor=False):
+    """
+    Actualiza el almacén local de autores y devuelve su contenido.
+
+    Solo consulta los autores modificados desde la última ejecución exitosa
+    (filtro from_updated_date). La primera vez, con completo=True, o si la
+    última descarga completa tiene más de DIAS_REFRESCO_COMPLETO días, hace
+    una descarga completa y reconstruye el almacén. Sin OPENALEX_API_KEY
+    (requerida por from_updated_date) siempre hace la descarga completa.
+    """
+    almacen = AlmacenAutores()
+    inicio = datetime.now()
+    ultima = almacen.get_meta("ultima_ejecucion")
+    ultimo_completo = almacen.get_meta("ultimo_completo")
+
+    vencido = (ultimo_completo is None or
+               (inicio - datetime.fromisoformat(ultimo_completo)).days >= DIAS_REFRESCO_COMPLETO)
+
+    if not (completo or ultima is None or vencido) and not API_KEY:
+        print("  Sin OPENALEX_API_KEY no se puede usar from_updated_date: se hace una descarga completa")
+        completo = True
+
+    if completo or ultima is None or vencido:
+        print("Modo incremental: descarga completa para reconstruir el almacen")
+        authors = get_authors_chile(workers=workers, filtro_servidor=filtro_servidor)
+        almacen.reemplazar(authors)
+        almacen.set_meta("ultimo_completo", inicio.isoformat(timespec="seconds"))
+    else:
+        desde = ultima[:10]
+        print(f"Modo incremental: autores modificados desde {desde}...")
+        conocidos = [f["openalex_id"] for f in almacen.filas()]
+        actualizados, bajas, procesados = ejecutar(descargar_delta(desde, conocidos))
+        almacen.upsert(actualizados)
+        eliminados = almacen.eliminar(bajas)
+        print(f"  Procesados: {procesados}, actualizados: {len(actualizados)}, "
+              f"eliminados: {eliminados}")
+
+    # Solo se marca la ejecución si terminó sin errores
+    almacen.set_meta("ultima_ejecucion", inicio.isoformat(timespec="seconds"))
+    authors = almacen.filas()
+    almacen.close()
+
+    print(f"Autores en almacen: {len(authors)}")
+    return authors
+
+
+def ranking_mas_reciente():
+    """Ruta del ranking_final_*.csv más reciente en data/output, o None."""
+    archivos = list(RANKING_DIR.glob("ranking_final_*.csv"))
+    return max(archivos, key=lambda x: x.stat().st_mtime) if archivos else None
+
+
+async def refrescar_lote(ids):
+    """Descarga un lote de hasta LOTE_IDS autores por ID (filtro OR de ids.openalex)."""
+    params = {
+        "filter": f"ids.openalex:{'|'.join(ids)}",
+        "select": ",".join(CAMPOS_AUTOR),
+        "per_page": LOTE_IDS,
+    }
+    data = await get_client().aget_modelo("authors", params, PaginaAutores)
+    return data.results
+
+
+def get_authors_conocidos(ranking_path=None):
+    """
+    Actualiza las métricas de los autores de un ranking existente.
+
+    Lee la columna openalex_id del ranking (por defecto el ranking_final_*.csv
+    más reciente) y descarga esos autores en lotes de LOTE_IDS IDs por
+    request, con los lotes en paralelo. Los autores que ya no cumplen los
+    filtros (procesar_autor) o que OpenAlex ya no devuelve se informan y se
+    omiten.
+    """
+    ranking_path = ranking_path or ranking_mas_reciente()
+    if ranking_path is None:
+        print(f"No hay ranking_final_*.csv en {RANKING_DIR}")
+        return []
+
+    ids = pd.read_csv(ranking_path, usecols=["openalex_id"], dtype=str)["openalex_id"].dropna()
+    ids = list(dict.fromkeys(i.replace("https://openalex.org/", "") for i in ids))
+    lotes = [ids[i:i + LOTE_IDS] for i in range(0, len(ids), LOTE_IDS)]
+    print(f"Refrescando {len(ids)} autores de {Path(ranking_path).name} en {len(lotes)} requests...")
+
+    async def todos():
+        return await asyncio.gather(*(refrescar_lote(lote) for lote in lotes))
+
+    authors = []
+    recibidos = set()
+    bajas = 0
+    for results in ejecutar(todos()):
+        for author in results:
+            recibidos.add((author.id or "").replace("https://openalex.org/", ""))
+            fila = procesar_autor(author)
+            if fila:
+                authors.append(fila)
+            else:
+                bajas += 1
+
+    no_encontrados = [i for i in ids if i not in recibidos]
+    print(f"  Actualizados: {len(authors)}, ya no cumplen los filtros: {bajas}, "
+          f"no devueltos por OpenAlex: {len(no_encontrados)}")
+    for author_id in no_encontrados[:10]:
+        print(f"    {author_id}")
+
+    return authors
+
+
+def imprimir_resumen_streaming(resumen, output_file):
+    """Resumen equivalente al de main() a partir de los conteos del sumidero."""
+    por_h = resumen["conteos"]["h_index"]
+
+    print(f"\n{'=' * 60}")
+    print("RESUMEN")
+    print("=" * 60)
+    print(f"Total investigadores CS: {resumen['filas']}")
+    if resumen.get("repetidas"):
+        print(f"Filas repetidas descartadas (reanudación): {resumen['repetidas']}")
+    print(f"h-index >= 1: {sum(n for h, n in por_h.items() if h >= 1)}")
+    print(f"h-index >= 5: {sum(n for h, n in por_h.items() if h >= 5)}")
+    print(f"Archivo: {output_file}")
+
+    print(f"\nPor campo:")
+    for campo, n in resumen["conteos"]["campo_principal"].most_common(10):
+        print(f"  {campo:40} {n}")
+
+    print(f"\nPor institucion (top 10):")
+    for inst, n in resumen["conteos"]["institucion"].most_common(10):
+        print(f"  {inst[:40]:40} {n}")
+
+    print(f"\nTop 10 h-index:")
+    for r in resumen["primeras"]:
+        print(f"  {r['nombre'][:40]:40} h={r['h_index']:2} citas={r['cited_by_count']:,}")
 
 
 def main():
     """Función principal."""
+    parser = argparse.ArgumentParser(description="Extrae investigadores CS de Chile desde OpenAlex")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Cursores en paralelo sobre particiones disjuntas (1 = serial)")
+    parser.add_argument("--modo", choices=["completo", "incremental", "refrescar-conocidos"],
+                        default="completo",
+                        help="incremental: solo autores modificados desde la ultima ejecucion; "
+                             "refrescar-conocidos: solo los autores del ranking_final mas reciente")
+    parser.add_argument("--ranking", type=Path, default=None,
+                        help="Con --modo refrescar-conocidos, ranking_final_*.csv de origen")
+    parser.add_argument("--reconstruir", action="store_true",
+                        help="En modo incremental, forzar una descarga completa del almacen")
+    parser.add_argument("--filtro-servidor", action="store_true",
+                        help="Filtrar ciencias sociales en la API (topics.domain.id) en vez de en cliente")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Escribir cada pagina a un JSONL en disco (memoria constante)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reanudar una descarga --streaming interrumpida desde su ultimo checkpoint")
+    parser.add_argument("--medir-select", action="store_true",
+                        help="Comparar tamano y decodificacion de paginas con y sin select= y salir")
+    parser.add_argument("--paises", default=None,
+                        help="Codigos ISO separados por coma (ej: CL,AR,MX): descarga los paises en "
+                             "paralelo y guarda cada uno en data/raw/paises/XX/")
+    agregar_argumentos_cliente(parser)
+    args = parser.parse_args()
+
+    if args.paises and (args.streaming or args.resume or args.modo != "completo"):
+        parser.error("--paises solo admite el modo completo sin --streaming/--resume")
+
+    client = configurar_cliente(cache=not args.sin_cache, offline=args.offline)
+
+    if args.medir_select:
+        filtro = f"{FILTRO_PAIS},summary_stats.h_index:>{H_INDEX_MIN_DOWNLOAD}"
+        medir_proyeccion(client, "authors", {"filter": filtro}, CAMPOS_AUTOR)
+        return None
+
     print("=" * 60)
     print("EXTRACCION OPENALEX - CIENCIAS SOCIALES CHILE")
     print("=" * 60)
     print(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
 
-    authors = get_authors_chile()
+    fecha = datetime.now().strftime("%Y%m%d")
+    output_file = OUTPUT_DIR / f"investigadores_openalex_{fecha}.csv"
+
+    if args.paises:
+        paises = [p.strip().upper() for p in args.paises.split(",") if p.strip()]
+        resultados = get_authors_paises(paises, workers=args.workers, filtro_servidor=args.filtro_servidor)
+
+        print(f"\n{'=' * 60}")
+        print("RESUMEN POR PAIS")
+        print("=" * 60)
+        for pais, authors in resultados.items():
+            if not authors:
+                print(f"  {pais}: sin autores")
+                continue
+            df = pd.DataFrame(authors).drop_duplicates(subset=["openalex_id"])
+            df = df.sort_values(["h_index", "openalex_id"], ascending=[False, True], kind="mergesort")
+            archivo = dir_pais(pais) / f"investigadores_openalex_{fecha}.csv"
+            archivo.parent.mkdir(parents=True, exist_ok=True)
+            df.to_csv(archivo, index=False, encoding="utf-8-sig")
+            print(f"  {pais}: {len(df):6} investigadores, h-index >= 5: {int((df['h_index'] >= 5).sum()):5}  {archivo}")
+
+        print(client.reporte())
+        return resultados
+
+    if (args.streaming or args.resume) and args.modo == "completo":
+        # El checkpoint recuerda el archivo y las opciones de la ejecución original
+        estado = EstadoCosecha("extraer_openalex")
+        ejecucion = estado.leer("ejecucion") if args.resume else None
+        if args.resume and ejecucion is None:
+            print("No hay una descarga interrumpida para reanudar; se inicia una nueva.")
+        if ejecucion is None:
+            estado.limpiar()
+            ejecucion = {"salida": str(output_file), "filtro_servidor": args.filtro_servidor}
+            estado.escribir("ejecucion", ejecucion)
+        else:
+            print(f"Reanudando descarga de {ejecucion['salida']}")
+
+        output_file = Path(ejecucion["salida"])
+        sumidero = SumideroJSONL(output_file.with_suffix(".jsonl"), reanudar=args.resume)
+        get_authors_chile(workers=args.workers, filtro_servidor=ejecucion["filtro_servidor"],
+                          sumidero=sumidero, estado=estado)
+        resumen = sumidero.finalizar(output_file, contar=("h_index", "campo_principal", "institucion"))
+        sumidero.cerrar()
+        estado.limpiar()
+        imprimir_resumen_streaming(resumen, output_file)
+        print(client.reporte())
+        return resumen
+
+    if args.modo == "refrescar-conocidos":
+        authors = get_authors_conocidos(args.ranking)
+    elif args.modo == "incremental":
+        authors = get_authors_incremental(workers=args.workers, completo=args.reconstruir,
+                                          filtro_servidor=args.filtro_servidor)
+    else:
+        authors = get_authors_chile(workers=args.workers, filtro_servidor=args.filtro_servidor)
 
     if not authors:
         print("No se encontraron autores.")
@@ -164,11 +768,10 @@ def main():
 
     df = pd.DataFrame(authors)
     df = df.drop_duplicates(subset=["openalex_id"])
-    df = df.sort_values("h_index", ascending=False)
+    # Orden determinista: el resultado no depende del orden de descarga
+    df = df.sort_values(["h_index", "openalex_id"], ascending=[False, True], kind="mergesort")
 
     # Guardar
-    fecha = datetime.now().strftime("%Y%m%d")
-    output_file = OUTPUT_DIR / f"investigadores_openalex_{fecha}.csv"
     df.to_csv(output_file, index=False, encoding="utf-8-sig")
 
     print(f"\n{'=' * 60}")
@@ -179,6 +782,8 @@ def main():
     print(f"h-index >= 5: {len(df[df['h_index'] >= 5])}")
     print(f"Archivo: {output_file}")
 
+    print(client.reporte())
+
     print(f"\nPor campo:")
     print(df["campo_principal"].value_counts().head(10))
 
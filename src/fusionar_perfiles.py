@@ -0,0 +1,253 @@
+"""
+Fusión de perfiles de OpenAlex divididos (una persona con varios author IDs).
+
+OpenAlex suele repartir a un mismo investigador entre varios IDs
+("Juan-Carlos Ferrer" con guiones distintos, "Rodrigo A. Asún" y "Rodrigo
+Asún", ver SCHOLAR_IDS_CONOCIDOS en procesar_ranking). En vez de comparar
+todos los pares de autores, se generan candidatos por claves de bloqueo:
+
+1. ORCID: los perfiles con el mismo ORCID se unen directamente.
+2. Nombre e institución: inicial del nombre + cada apellido (sin tildes ni
+   guiones) + institución normalizada. Solo se comparan los autores de un
+   mismo bloque, y se unen si sus nombres son compatibles (ver
+   nombres_compatibles) con todos los del grupo del otro.
+
+Las uniones se hacen con union-find; dos grupos con ORCID distintos nunca
+se unen. Cada grupo queda en una fila: el perfil de mayor h-index como
+representante, citas, works e i10-index sumados (los works de perfiles
+divididos son disjuntos) y h-index máximo (cota inferior del h-index real).
+
+Uso:
+    python src/fusionar_perfiles.py                    # último investigadores_openalex_*.csv
+    python src/fusionar_perfiles.py --entrada data/raw/paises/AR/investigadores_openalex_20260114.csv
+
+Genera, junto a la entrada (procesar_ranking toma el CSV más reciente):
+    investigadores_openalex_YYYYMMDD_fusionado.csv
+"""
+
+import argparse
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+
+from extraer_openalex import OUTPUT_DIR
+
+# Configuración
+MAX_BLOQUE = 50  # Bloques más grandes (nombres muy comunes) no se comparan par a par
+PARTICULAS = {"de", "del", "la", "las", "los", "y", "da", "dos", "van", "von"}
+
+# Cómo se combina cada columna al fusionar un grupo (las demás, del representante)
+SUMAR = ["cited_by_count", "works_count", "i10_index"]
+MAXIMO = ["h_index", "anios_afiliacion", "anios_pais", "ultimo_anio_afiliacion", "ultimo_anio_pais"]
+
+
+def plegar(texto) -> str:
+    """Minúsculas sin tildes, con guiones (incluidos U+2010 a U+2015) y puntos como espacios."""
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return re.sub(r"[\s\-‐-―.,]+", " ", texto).strip()
+
+
+def tokens_nombre(nombre: str) -> list:
+    """Tokens de un nombre plegado, sin partículas ("de", "del", ...)."""
+    return [t for t in plegar(nombre).split() if t not in PARTICULAS]
+
+
+def nombres_compatibles(a: list, b: list) -> bool:
+    """
+    Tokens de dos nombres plegados que pueden ser de la misma persona.
+
+    El primer nombre debe coincidir (o ser la inicial del otro), los tokens
+    completos del nombre más corto deben estar en el otro y cada inicial
+    debe corresponder a algún token del otro nombre, salvo que este la
+    omita. Así "Rodrigo A. Asún" y "Rodrigo Asún" son compatibles, pero no
+    "María José González" y "María Teresa González" ni "María J. González"
+    y "María T. González".
+    """
+    if not a or not b:
+        return False
+    if len(a[0]) == 1 or len(b[0]) == 1:
+        if a[0][0] != b[0][0]:
+            return False
+    elif a[0] != b[0]:
+        return False
+
+    corto, largo = sorted((a, b), key=len)
+    if not {t for t in corto[1:] if len(t) > 1} <= set(largo):
+        return False
+    # Una inicial sin correspondencia solo se acepta si el otro nombre la omite
+    for x, y in ((a, b), (b, a)):
+        iniciales = {t for t in x[1:] if len(t) == 1}
+        if not iniciales <= {t[0] for t in y} and not set(y) <= set(x):
+            return False
+    return True
+
+
+class UnionFind:
+    """Union-find con compresión de caminos, y el ORCID y los miembros de cada grupo."""
+
+    def __init__(self, orcids: list):
+        self.padre = list(range(len(orcids)))
+        self.orcid = list(orcids)
+        self.miembros = [[i] for i in range(len(orcids))]
+
+    def raiz(self, i: int) -> int:
+        while self.padre[i] != i:
+            self.padre[i] = self.padre[self.padre[i]]
+            i = self.padre[i]
+        return i
+
+    def unir(self, i: int, j: int) -> bool:
+        """Une los grupos de i y j; False si ya estaban unidos o sus ORCID chocan."""
+        ri, rj = self.raiz(i), self.raiz(j)
+        if ri == rj:
+            return False
+        if self.orcid[ri] and self.orcid[rj] and self.orcid[ri] != self.orcid[rj]:
+            return False
+        if ri > rj:
+            ri, rj = rj, ri
+        self.padre[rj] = ri
+        self.orcid[ri] = self.orcid[ri] or self.orcid[rj]
+        self.miembros[ri].extend(self.miembros[rj])
+        self.miembros[rj] = []
+        return True
+
+
+def agrupar_perfiles(df: pd.DataFrame) -> tuple:
+    """
+    Agrupa los perfiles del DataFrame por ORCID y por bloques de nombre e institución.
+
+    Returns:
+        (raíz de grupo por fila, estadísticas de la resolución)
+    """
+    orcids = df["orcid"].fillna("").astype(str).str.strip().tolist() if "orcid" in df.columns else [""] * len(df)
+    uf = UnionFind(orcids)
+    stats = {"uniones_orcid": 0, "uniones_nombre": 0, "comparaciones": 0, "bloques_omitidos": 0}
+
+    # 1. ORCID
+    por_orcid = {}
+    for i, orcid in enumerate(orcids):
+        if orcid:
+            if orcid in por_orcid:
+                stats["uniones_orcid"] += uf.unir(por_orcid[orcid], i)
+            else:
+                por_orcid[orcid] = i
+
+    # 2. Inicial + apellido + institución
+    tokens = []
+    bloques = defaultdict(list)
+    for i, (nombre, institucion) in enumerate(zip(df["nombre"], df["institucion"])):
+        t = tokens_nombre(nombre)
+        tokens.append(t)
+        if not t:
+            continue
+        inst = plegar(institucion)
+        for apellido in {x for x in t[1:] if len(x) > 1}:
+            bloques[(t[0][0], apellido, inst)].append(i)
+
+    for miembros in bloques.values():
+        if len(miembros) < 2:
+            continue
+        if len(miembros) > MAX_BLOQUE:
+            stats["bloques_omitidos"] += 1
+            continue
+        for a in range(len(miembros)):
+            for b in range(a + 1, len(miembros)):
+                i, j = miembros[a], miembros[b]
+                stats["comparaciones"] += 1
+                ri, rj = uf.raiz(i), uf.raiz(j)
+                if ri == rj or not nombres_compatibles(tokens[i], tokens[j]):
+                    continue
+                # Todos los miembros de ambos grupos deben ser compatibles entre sí:
+                # "Juan Pérez" no debe unir a "Juan Pablo Pérez" con "Juan Carlos Pérez"
+                if all(nombres_compatibles(tokens[x], tokens[y])
+                       for x in uf.miembros[ri] for y in uf.miembros[rj]):
+                    stats["uniones_nombre"] += uf.unir(i, j)
+
+    raices = [uf.raiz(i) for i in range(len(df))]
+    return raices, stats
+
+
+def fusionar(df: pd.DataFrame) -> tuple:
+    """
+    Colapsa cada grupo de perfiles en una fila.
+
+    Returns:
+        (DataFrame fusionado, estadísticas)
+    """
+    df = df.reset_index(drop=True)
+    raices, stats = agrupar_perfiles(df)
+    df = df.assign(_grupo=raices)
+
+    # Representante: mayor h-index, luego más citas, luego openalex_id
+    orden = df.sort_values(["_grupo", "h_index", "cited_by_count", "openalex_id"],
+                           ascending=[True, False, False, True], kind="mergesort")
+    grupos = orden.groupby("_grupo", sort=False)
+    fusionado = grupos.head(1).set_index("_grupo")
+
+    for columna in SUMAR:
+        if columna in df.columns:
+            fusionado[columna] = grupos[columna].sum()
+    for columna in MAXIMO:
+        if columna in df.columns:
+            fusionado[columna] = grupos[columna].max()
+    if "orcid" in df.columns:
+        fusionado["orcid"] = grupos["orcid"].first()
+    fusionado["perfiles"] = grupos.size()
+    fusionado["ids_fusionados"] = grupos["openalex_id"].agg(lambda ids: "|".join(ids.iloc[1:]))
+
+    fusionado = fusionado.reset_index(drop=True)
+    fusionado = fusionado.sort_values(["h_index", "openalex_id"], ascending=[False, True], kind="mergesort")
+    stats["grupos_fusionados"] = int((fusionado["perfiles"] > 1).sum())
+    return fusionado, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fusiona perfiles de OpenAlex divididos")
+    parser.add_argument("--entrada", type=Path, default=None,
+                        help="CSV de extraer_openalex (por defecto el investigadores_openalex_*.csv mas reciente)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("FUSION DE PERFILES DIVIDIDOS - OPENALEX")
+    print("=" * 60)
+
+    entrada = args.entrada
+    if entrada is None:
+        archivos = [p for p in OUTPUT_DIR.glob("investigadores_openalex_*.csv")
+                    if not p.stem.endswith("_fusionado")]
+        if not archivos:
+            print(f"No hay investigadores_openalex_*.csv en {OUTPUT_DIR}")
+            return None
+        entrada = max(archivos, key=lambda x: x.stat().st_mtime)
+
+    df = pd.read_csv(entrada, encoding="utf-8-sig", dtype={"orcid": str})
+    print(f"Entrada: {entrada.name} ({len(df)} perfiles)\n")
+
+    fusionado, stats = fusionar(df)
+
+    print(f"Comparaciones dentro de bloques: {stats['comparaciones']:,} "
+          f"(vs {len(df) * (len(df) - 1) // 2:,} pares posibles)")
+    print(f"Uniones por ORCID: {stats['uniones_orcid']}, por nombre e institucion: {stats['uniones_nombre']}")
+    if stats["bloques_omitidos"]:
+        print(f"Bloques de mas de {MAX_BLOQUE} perfiles omitidos: {stats['bloques_omitidos']}")
+    print(f"Grupos fusionados: {stats['grupos_fusionados']}; perfiles: {len(df)} -> {len(fusionado)}")
+
+    salida = entrada.with_name(f"{entrada.stem}_fusionado.csv")
+    fusionado.to_csv(salida, index=False, encoding="utf-8-sig")
+    print(f"Archivo: {salida}")
+
+    multiples = fusionado[fusionado["perfiles"] > 1]
+    if len(multiples):
+        print(f"\nEjemplos:")
+        for _, r in multiples.head(10).iterrows():
+            print(f"  {r['nombre'][:35]:35} h={r['h_index']:2} {r['perfiles']} perfiles  {r['ids_fusionados'][:40]}")
+
+    return fusionado
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 """
 Genera la página HTML del ranking desde el CSV procesado.
+
+Uso:
+    python src/generar_html.py             # Chile -> docs/index.html
+    python src/generar_html.py --pais AR   # data/output/paises/AR -> docs/paises/AR/index.html
 """
 
+import argparse
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
@@ -10,10 +15,45 @@ import json
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "output"
 DOCS_DIR = Path(__file__).parent.parent / "docs"
 
+# Nombres para los títulos en modo multi-país (si falta, se usa el código ISO)
+NOMBRES_PAIS = {
+    "AR": "Argentina",
+    "BR": "Brasil",
+    "CL": "Chile",
+    "CO": "Colombia",
+    "ES": "España",
+    "MX": "México",
+    "PE": "Perú",
+    "UY": "Uruguay",
+}
+
+
+def textos_pais(pais: str = None) -> dict:
+    """Textos de la página que dependen del país (sin país: los del ranking chileno)."""
+    if pais is None:
+        return {
+            "titulo": "Ranking Chileno de Ciencias Sociales",
+            "descripcion": "cientificos sociales chilenos",
+            "en_pais": "en Chile",
+            "instituciones": "instituciones chilenas",
+            "institucion": "institucion chilena",
+            "archivo_csv": "ranking_ciencias_sociales_chile.csv",
+        }
+    nombre = NOMBRES_PAIS.get(pais, pais)
+    return {
+        "titulo": f"Ranking de Ciencias Sociales - {nombre}",
+        "descripcion": f"cientificos sociales de {nombre}",
+        "en_pais": f"en {nombre}",
+        "instituciones": f"instituciones de {nombre}",
+        "institucion": f"institucion de {nombre}",
+        "archivo_csv": f"ranking_ciencias_sociales_{pais.lower()}.csv",
+    }
 
-def cargar_datos():
-    """Carga el CSV más reciente."""
-    archivos = list(OUTPUT_DIR.glob("ranking_final_*.csv"))
+
+def cargar_datos(pais: str = None):
+    """Carga el CSV más reciente (del país, si se indica)."""
+    directorio = OUTPUT_DIR / "paises" / pais if pais else OUTPUT_DIR
+    archivos = list(directorio.glob("ranking_final_*.csv"))
     if not archivos:
         raise FileNotFoundError("No se encontró archivo ranking_final_*.csv")
 
@@ -188,8 +228,9 @@ def generar_ranking_institucional(investigadores):
     return ranking
 
 
-def generar_html(investigadores):
+def generar_html(investigadores, pais: str = None):
     """Genera el HTML completo."""
+    textos = textos_pais(pais)
 
     # Estadísticas
     total = len(investigadores)
@@ -213,8 +254,8 @@ def generar_html(investigadores):
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Ranking Chileno de Ciencias Sociales</title>
-    <meta name="description" content="Ranking de impacto academico de cientificos sociales chilenos basado en OpenAlex">
+    <title>{textos["titulo"]}</title>
+    <meta name="description" content="Ranking de impacto academico de {textos["descripcion"]} basado en OpenAlex">
     <link href="https://fonts.googleapis.com/css2?family=Source+Sans+Pro:wght@400;600;700&family=Source+Serif+Pro:wght@600;700&display=swap" rel="stylesheet">
     <style>
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
@@ -427,12 +468,12 @@ def generar_html(investigadores):
 <body>
     <div class="container">
         <header>
-            <h1>Ranking Chileno de Ciencias Sociales</h1>
-            <p class="subtitle">Impacto academico de investigadores en ciencias sociales en Chile</p>
+            <h1>{textos["titulo"]}</h1>
+            <p class="subtitle">Impacto academico de investigadores en ciencias sociales {textos["en_pais"]}</p>
         </header>
 
         <div class="description">
-            <p>Este ranking mide el impacto academico de investigadores en ciencias sociales afiliados a instituciones chilenas, utilizando datos de <a href="https://openalex.org/" target="_blank">OpenAlex</a>.</p>
+            <p>Este ranking mide el impacto academico de investigadores en ciencias sociales afiliados a {textos["instituciones"]}, utilizando datos de <a href="https://openalex.org/" target="_blank">OpenAlex</a>.</p>
             <p>El proyecto se inspira en el <a href="https://github.com/bgonzalezbustamante/CPS-Ranking" target="_blank">CPS-Ranking</a> de Bastian Gonzalez-Bustamante, expandiendo la cobertura desde ciencia politica hacia todas las ciencias sociales: sociologia, economia, psicologia, educacion, comunicacion y mas.</p>
             <p class="meta">Actualizacion: {datetime.now().strftime("%B %Y")} | Fuente: OpenAlex API | H-index minimo: 1</p>
         </div>
@@ -541,7 +582,7 @@ def generar_html(investigadores):
             <div class="methodology">
                 <h2>Metodologia</h2>
                 <p><strong>Fuente:</strong> <a href="https://openalex.org/" target="_blank">OpenAlex</a> - Base de datos abierta con 240M+ trabajos academicos indexados.</p>
-                <p><strong>Criterios:</strong> Afiliacion actual en institucion chilena, dominio "Social Sciences", h-index >= 2.</p>
+                <p><strong>Criterios:</strong> Afiliacion actual en {textos["institucion"]}, dominio "Social Sciences", h-index >= 2.</p>
                 <p><strong>Disciplinas:</strong> Clasificacion automatica segun topics de OpenAlex.</p>
                 <p><strong>Limitaciones:</strong> OpenAlex puede no incluir todas las publicaciones. Clasificacion disciplinar aproximada.</p>
             </div>
@@ -696,7 +737,7 @@ def generar_html(investigadores):
             const blob = new Blob([csv], {{ type: 'text/csv;charset=utf-8;' }});
             const link = document.createElement('a');
             link.href = URL.createObjectURL(blob);
-            link.download = 'ranking_ciencias_sociales_chile.csv';
+            link.download = '{textos["archivo_csv"]}';
             link.click();
         }}
 
@@ -709,20 +750,28 @@ def generar_html(investigadores):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Genera la pagina HTML del ranking")
+    parser.add_argument("--pais", default=None,
+                        help="Codigo ISO de un pais procesado con procesar_ranking.py --pais")
+    args = parser.parse_args()
+    pais = args.pais.upper() if args.pais else None
+
     print("Generando HTML del ranking...")
 
     # Cargar datos
-    df = cargar_datos()
+    df = cargar_datos(pais)
     print(f"Cargados {len(df)} investigadores")
 
     # Generar array JS
     investigadores = generar_js_array(df)
 
     # Generar HTML
-    html = generar_html(investigadores)
+    html = generar_html(investigadores, pais)
 
     # Guardar
-    output_path = DOCS_DIR / "index.html"
+    docs_dir = DOCS_DIR / "paises" / pais if pais else DOCS_DIR
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    output_path = docs_dir / "index.html"
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(html)
 
@@ -0,0 +1,227 @@
+"""
+Genera el CSV de investigadores desde un snapshot local de OpenAlex, sin usar la API.
+
+El snapshot de OpenAlex (https://docs.openalex.org/download-all-data/openalex-snapshot)
+publica los autores como archivos JSONL comprimidos con gzip, particionados
+por fecha de actualización:
+
+    <directorio>/data/authors/updated_date=YYYY-MM-DD/part_000.gz
+
+Cada partición se procesa en un proceso distinto, línea a línea, aplicando
+los mismos criterios que extraer_openalex (Chile, h-index mínimo y
+es_ciencias_sociales vía procesar_autor). Un autor puede aparecer en más de
+una partición; solo se conserva si su versión más reciente (updated_date)
+cumple los criterios, aunque una versión anterior los cumpla. Para eso cada
+partición informa el ID y la fecha de todos sus registros (12 bytes por
+registro en arreglos numpy), no solo de los que pasan los filtros.
+
+Uso:
+    python src/ingestar_snapshot.py --directorio /ruta/openalex-snapshot
+    python src/ingestar_snapshot.py --directorio tests/snapshot --procesos 1   # fixture de prueba
+
+Genera:
+    data/raw/investigadores_openalex_YYYYMMDD.csv
+"""
+
+import argparse
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from extraer_openalex import OUTPUT_DIR, H_INDEX_MIN_DOWNLOAD, procesar_autor
+from modelos_openalex import Autor, VersionAutor, decodificar
+from sumidero_autores import id_numerico
+from taxonomia_openalex import get_taxonomia
+
+# Marca que deben contener las líneas candidatas (descarta sin decodificar)
+MARCA_PAIS = b'"CL"'
+
+
+def buscar_particiones(directorio: Path) -> list:
+    """Archivos .gz de autores bajo el directorio, de mayor a menor tamaño."""
+    directorio = Path(directorio)
+    base = directorio / "data" / "authors"
+    if not base.is_dir():
+        base = directorio
+    particiones = list(base.rglob("*.gz"))
+    # Las particiones grandes primero reparten mejor la carga entre procesos
+    return sorted(particiones, key=lambda p: p.stat().st_size, reverse=True)
+
+
+def fecha_entera(updated_date: str) -> int:
+    """'2026-01-10T03:12:45.123' -> 20260110 (0 si no hay fecha)."""
+    return int((updated_date or "")[:10].replace("-", "") or 0)
+
+
+def procesar_particion(path) -> tuple:
+    """
+    Procesa una partición del snapshot.
+
+    Returns:
+        (registros leídos, filas del ranking, ids, fechas): cada fila lleva
+        su updated_date en la clave '_actualizado'; ids (int64) y fechas
+        (int32, AAAAMMDD) cubren todos los registros de la partición, pasen
+        o no los filtros
+    """
+    leidos = 0
+    filas = []
+    ids = []
+    fechas = []
+    with gzip.open(path, "rb") as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            leidos += 1
+            if MARCA_PAIS not in linea:
+                version = decodificar(linea, VersionAutor)
+                if version.id:
+                    ids.append(id_numerico(version.id))
+                    fechas.append(fecha_entera(version.updated_date))
+                continue
+            author = decodificar(linea, Autor)
+            if not author.id:
+                continue
+            ids.append(id_numerico(author.id))
+            fechas.append(fecha_entera(author.updated_date))
+
+            # Snapshots antiguos traen una sola institución
+            if not author.last_known_institutions and author.last_known_institution:
+                author.last_known_institutions = [author.last_known_institution]
+
+            h_index = (author.summary_stats.h_index if author.summary_stats else None) or 0
+            if h_index <= H_INDEX_MIN_DOWNLOAD:
+                continue
+
+            fila = procesar_autor(author)
+            if fila is not None:
+                fila["_actualizado"] = author.updated_date or ""
+                filas.append(fila)
+    return leidos, filas, np.array(ids, dtype=np.int64), np.array(fechas, dtype=np.int32)
+
+
+def versiones_vigentes(autores: dict, ids: list, fechas: list) -> list:
+    """
+    Filas de `autores` que son la versión más reciente de su autor.
+
+    Args:
+        autores: {openalex_id: fila} con la versión más reciente que cumple los filtros
+        ids, fechas: Arreglos de procesar_particion de todas las particiones
+    """
+    if not autores:
+        return []
+    ids = np.concatenate(ids)
+    fechas = np.concatenate(fechas)
+    candidatos = np.array(sorted(id_numerico(i) for i in autores), dtype=np.int64)
+
+    # Fecha más reciente de cada candidato entre todos los registros
+    mascara = np.isin(ids, candidatos)
+    ultima = np.zeros(len(candidatos), dtype=np.int32)
+    np.maximum.at(ultima, np.searchsorted(candidatos, ids[mascara]), fechas[mascara])
+    ultima = dict(zip(candidatos.tolist(), ultima.tolist()))
+
+    return [fila for openalex_id, fila in autores.items()
+            if fecha_entera(fila["_actualizado"]) >= ultima[id_numerico(openalex_id)]]
+
+
+def ingestar(directorio: Path, procesos: int = None) -> pd.DataFrame:
+    """
+    Procesa todas las particiones en paralelo y devuelve el DataFrame del ranking.
+
+    Args:
+        directorio: Raíz del snapshot (o directorio con particiones .gz)
+        procesos: Procesos del pool (por defecto, uno por CPU; con 1 se
+                  procesa en el mismo proceso, sin pool)
+    """
+    particiones = buscar_particiones(directorio)
+    if not particiones:
+        print(f"No se encontraron particiones .gz en {directorio}")
+        return pd.DataFrame()
+
+    # Descargar la taxonomía una sola vez; los procesos la leen del disco
+    get_taxonomia()
+
+    procesos = procesos or os.cpu_count() or 1
+    print(f"Procesando {len(particiones)} particiones con {procesos} procesos...")
+
+    inicio = time.perf_counter()
+    leidos = 0
+    autores = {}
+    ids, fechas = [], []
+
+    def agregar(i, nombre, resultado):
+        nonlocal leidos
+        n, filas, ids_particion, fechas_particion = resultado
+        leidos += n
+        ids.append(ids_particion)
+        fechas.append(fechas_particion)
+        for fila in filas:
+            previo = autores.get(fila["openalex_id"])
+            if previo is None or fila["_actualizado"] > previo["_actualizado"]:
+                autores[fila["openalex_id"]] = fila
+
+        segundos = time.perf_counter() - inicio
+        print(f"  [{i}/{len(particiones)}] {nombre}: {n:,} registros "
+              f"({leidos / max(segundos, 1e-9):,.0f} registros/s acumulado)")
+
+    if procesos == 1:
+        for i, particion in enumerate(particiones, 1):
+            agregar(i, f"{particion.parent.name}/{particion.name}", procesar_particion(particion))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            futuros = {pool.submit(procesar_particion, p): p for p in particiones}
+            for i, futuro in enumerate(as_completed(futuros), 1):
+                agregar(i, f"{futuros[futuro].parent.name}/{futuros[futuro].name}", futuro.result())
+
+    vigentes = versiones_vigentes(autores, ids, fechas)
+
+    segundos = time.perf_counter() - inicio
+    print(f"\nLeidos: {leidos:,} registros en {segundos:.1f}s "
+          f"({leidos / max(segundos, 1e-9):,.0f} registros/s)")
+    print(f"Descartados por tener una version mas reciente que no cumple los filtros: "
+          f"{len(autores) - len(vigentes)}")
+    print(f"Ciencias Sociales Chile: {len(vigentes)}")
+
+    if not vigentes:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(vigentes).drop(columns=["_actualizado"])
+    # Mismo orden que extraer_openalex
+    return df.sort_values(["h_index", "openalex_id"], ascending=[False, True], kind="mergesort")
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description="Genera el CSV de investigadores desde un snapshot de OpenAlex")
+    parser.add_argument("--directorio", type=Path, required=True,
+                        help="Raiz del snapshot (contiene data/authors/) o directorio con particiones .gz")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Procesos en paralelo (por defecto, uno por CPU; 1 = sin pool)")
+    parser.add_argument("--salida", type=Path, default=None,
+                        help="CSV de salida (por defecto data/raw/investigadores_openalex_FECHA.csv)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("INGESTA SNAPSHOT OPENALEX - CIENCIAS SOCIALES CHILE")
+    print("=" * 60)
+    print(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
+
+    df = ingestar(args.directorio, args.procesos)
+    if df.empty:
+        print("No se encontraron autores.")
+        return None
+
+    output_file = args.salida or OUTPUT_DIR / f"investigadores_openalex_{datetime.now().strftime('%Y%m%d')}.csv"
+    df.to_csv(output_file, index=False, encoding="utf-8-sig")
+    print(f"Archivo: {output_file}")
+
+    return df
+
+
+if __name__ == "__main__":
+    main()
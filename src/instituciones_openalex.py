@@ -0,0 +1,145 @@
+"""
+Resolución de nombres de instituciones a IDs de OpenAlex y ROR.
+
+La lista de instituciones se lee de config/config.yaml (openalex: instituciones).
+Cada nombre se busca una sola vez en el endpoint /institutions (restringido
+al país) y el resultado se guarda en data/cache/instituciones_openalex.json;
+las ejecuciones siguientes leen los IDs desde ese archivo sin consultar la API.
+
+Uso:
+    python src/instituciones_openalex.py              # Resuelve y muestra la tabla
+    python src/instituciones_openalex.py --refrescar  # Vuelve a consultar todos los nombres
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import yaml
+
+from openalex_client import get_client
+
+# Configuración
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "config.yaml"
+INSTITUCIONES_PATH = Path(__file__).parent.parent / "data" / "cache" / "instituciones_openalex.json"
+
+# Lista usada si config.yaml no define openalex: instituciones
+INSTITUCIONES_DEFAULT = [
+    "Universidad de Chile",
+    "Pontificia Universidad Católica de Chile",
+    "Universidad Diego Portales",
+    "Universidad de Santiago",
+    "Universidad Adolfo Ibáñez",
+    "Universidad Alberto Hurtado",
+    "Universidad de Concepción",
+    "Universidad de Valparaíso",
+    "Universidad Austral",
+    "Universidad de Talca",
+    "Universidad Católica de Valparaíso",
+    "COES",
+    "FLACSO Chile",
+]
+
+
+def cargar_instituciones(config_path: Path = CONFIG_PATH) -> list:
+    """Nombres de instituciones de config.yaml (openalex: instituciones)."""
+    if Path(config_path).exists():
+        with open(config_path, encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        nombres = (config.get("openalex") or {}).get("instituciones")
+        if nombres:
+            return list(nombres)
+    return list(INSTITUCIONES_DEFAULT)
+
+
+def _leer_cache(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _escribir_cache(path: Path, datos: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def resolver_instituciones(nombres: list, country_code: str = "CL",
+                           refrescar: bool = False,
+                           path: Path = INSTITUCIONES_PATH) -> dict:
+    """
+    Resuelve nombres de instituciones a sus IDs de OpenAlex y ROR.
+
+    Solo se consultan los nombres que no están en la caché (o todos con
+    refrescar=True); las búsquedas pendientes se solapan entre sí. Los
+    nombres sin resultado se guardan como None para no repetir la búsqueda.
+
+    Args:
+        nombres: Nombres tal como aparecen en config.yaml
+        country_code: País al que se restringe la búsqueda
+        refrescar: Ignorar la caché y volver a consultar todos los nombres
+
+    Returns:
+        Diccionario {nombre: {"id", "ror", "display_name", "works_count"} o None}
+    """
+    path = Path(path)
+    cache = {} if refrescar else _leer_cache(path)
+    pendientes = [n for n in nombres if f"{country_code}:{n}" not in cache]
+
+    if pendientes:
+        print(f"Resolviendo {len(pendientes)} instituciones en OpenAlex...")
+        params = {
+            "filter": f"country_code:{country_code.lower()}",
+            "select": "id,ror,display_name,works_count",
+            "per_page": 1,
+        }
+        respuestas = get_client().map(
+            [("institutions", {**params, "search": nombre}) for nombre in pendientes]
+        )
+        for nombre, data in zip(pendientes, respuestas):
+            results = data.get("results", [])
+            if results:
+                inst = results[0]
+                cache[f"{country_code}:{nombre}"] = {
+                    "id": inst.get("id", "").replace("https://openalex.org/", ""),
+                    "ror": inst.get("ror") or "",
+                    "display_name": inst.get("display_name", ""),
+                    "works_count": inst.get("works_count", 0),
+                }
+            else:
+                print(f"  Sin resultado: {nombre}")
+                cache[f"{country_code}:{nombre}"] = None
+        _escribir_cache(path, cache)
+
+    return {n: cache[f"{country_code}:{n}"] for n in nombres}
+
+
+def ids_instituciones(nombres: list = None, country_code: str = "CL",
+                      refrescar: bool = False) -> list:
+    """IDs de OpenAlex (sin duplicados, en el orden de la lista) de las instituciones."""
+    resueltas = resolver_instituciones(nombres or cargar_instituciones(), country_code, refrescar)
+    ids = [inst["id"] for inst in resueltas.values() if inst]
+    return list(dict.fromkeys(ids))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resuelve instituciones a IDs de OpenAlex y ROR")
+    parser.add_argument("--refrescar", action="store_true",
+                        help="Volver a consultar todos los nombres en la API")
+    args = parser.parse_args()
+
+    resueltas = resolver_instituciones(cargar_instituciones(), refrescar=args.refrescar)
+    for nombre, inst in resueltas.items():
+        if inst:
+            print(f"  {nombre[:40]:40} {inst['id']:12} {inst['ror']:32} {inst['display_name']}")
+        else:
+            print(f"  {nombre[:40]:40} (sin resultado)")
+    print(f"\nCache: {INSTITUCIONES_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Limitador de tasa adaptativo y cuota diaria para la API de OpenAlex.
+
+Un único limitador por proceso (get_limitador) regula todas las requests:
+- Token bucket cuya tasa sube de a poco mientras la API responde bien y se
+  reduce a la mitad ante cada 429 (aumento aditivo, reducción multiplicativa)
+- Respeta el encabezado Retry-After: nadie envía requests hasta que vence
+- Cuenta las requests del día (UTC) contra la cuota diaria del polite pool,
+  guardando el contador en disco para que lo compartan varias ejecuciones
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+# Configuración
+TASA_INICIAL = 5.0  # Requests por segundo al comenzar
+TASA_MAX = 10.0  # Límite documentado de OpenAlex
+TASA_MIN = 0.5
+INCREMENTO = 0.5  # Requests/s que se suman por cada "ronda" de requests exitosas
+REDUCCION = 0.5  # Factor que se aplica a la tasa ante un 429
+RETRY_AFTER_DEFAULT = 5.0  # Segundos de pausa si un 429 no trae Retry-After
+
+CUOTA_DIARIA = 100000  # Requests por día (polite pool)
+AVISO_CUOTA = 0.9  # Fracción de la cuota a partir de la cual se avisa
+CUOTA_PATH = Path(__file__).parent.parent / "data" / "cache" / "cuota_openalex.json"
+GUARDAR_CADA = 50  # Requests entre escrituras del contador
+
+
+class CuotaAgotadaError(Exception):
+    """Se alcanzó la cuota diaria de requests a OpenAlex."""
+
+
+def segundos_retry_after(valor: str) -> float:
+    """Interpreta Retry-After (segundos o fecha HTTP). Devuelve segundos de espera."""
+    if not valor:
+        return RETRY_AFTER_DEFAULT
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        fecha = parsedate_to_datetime(valor)
+        return max(0.0, (fecha - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return RETRY_AFTER_DEFAULT
+
+
+class CuotaDiaria:
+    """Contador de requests del día (UTC), persistido en disco."""
+
+    def __init__(self, path: Path = CUOTA_PATH, limite: int = CUOTA_DIARIA):
+        self.path = Path(path)
+        self.limite = limite
+        self._pendientes = 0
+        self._avisado = False
+        self.fecha, self.usadas = self._leer()
+
+    @staticmethod
+    def _hoy() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _leer(self):
+        hoy = self._hoy()
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("fecha") == hoy:
+                    return hoy, data.get("usadas", 0)
+            except (OSError, ValueError):
+                pass
+        return hoy, 0
+
+    def registrar(self):
+        """Cuenta una request; lanza CuotaAgotadaError si ya no quedan."""
+        if self._hoy() != self.fecha:
+            self.guardar()
+            self.fecha, self.usadas = self._hoy(), 0
+            self._avisado = False
+
+        if self.usadas >= self.limite:
+            self.guardar()
+            raise CuotaAgotadaError(
+                f"Cuota diaria de OpenAlex agotada ({self.usadas}/{self.limite} requests)"
+            )
+
+        self.usadas += 1
+        self._pendientes += 1
+        if not self._avisado and self.usadas >= self.limite * AVISO_CUOTA:
+            print(f"  Aviso: {self.usadas}/{self.limite} requests de la cuota diaria usadas")
+            self._avisado = True
+        if self._pendientes >= GUARDAR_CADA:
+            self.guardar()
+
+    def guardar(self):
+        """Escribe el contador sumando lo registrado por otros procesos desde la última lectura."""
+        if not self._pendientes:
+            return
+        fecha, usadas_disco = self._leer()
+        if fecha == self.fecha:
+            self.usadas = max(self.usadas, usadas_disco + self._pendientes)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fecha": self.fecha, "usadas": self.usadas}, f)
+        os.replace(tmp, self.path)
+        self._pendientes = 0
+
+
+class LimitadorAdaptativo:
+    """Token bucket con tasa adaptativa, pausa por Retry-After y cuota diaria."""
+
+    def __init__(self, tasa: float = TASA_INICIAL, tasa_max: float = TASA_MAX,
+                 tasa_min: float = TASA_MIN, cuota: CuotaDiaria = None):
+        self.tasa = tasa
+        self.tasa_max = tasa_max
+        self.tasa_min = tasa_min
+        self.cuota = cuota if cuota is not None else CuotaDiaria()
+
+        self._tokens = 1.0
+        self._ultimo = time.monotonic()
+        self._pausa_hasta = 0.0
+        self._lock = threading.Lock()
+
+        self.throttles = 0
+
+    def _recargar(self, ahora: float):
+        self._tokens = min(max(1.0, self.tasa), self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def adquirir(self):
+        """Bloquea hasta que se pueda enviar una request y la cuenta en la cuota."""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                if ahora >= self._pausa_hasta:
+                    self._recargar(ahora)
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        self.cuota.registrar()
+                        return
+                    espera = (1.0 - self._tokens) / self.tasa
+                else:
+                    espera = self._pausa_hasta - ahora
+            time.sleep(espera)
+
+    def exito(self):
+        """Aumento aditivo: +INCREMENTO req/s por cada `tasa` requests exitosas."""
+        with self._lock:
+            self.tasa = min(self.tasa_max, self.tasa + INCREMENTO / self.tasa)
+
+    def throttle(self, retry_after: float = RETRY_AFTER_DEFAULT):
+        """Reducción multiplicativa y pausa global ante un 429."""
+        with self._lock:
+            self.throttles += 1
+            self.tasa = max(self.tasa_min, self.tasa * REDUCCION)
+            self._tokens = 0.0
+            self._pausa_hasta = max(self._pausa_hasta, time.monotonic() + retry_after)
+        print(f"  429 de OpenAlex: pausa {retry_after:.1f}s, tasa {self.tasa:.1f} req/s")
+
+    def reporte(self) -> str:
+        return (f"Limitador: {self.tasa:.1f} req/s, {self.throttles} respuestas 429, "
+                f"cuota {self.cuota.usadas}/{self.cuota.limite} hoy")
+
+
+_limitador = None
+_limitador_lock = threading.Lock()
+
+
+def get_limitador() -> LimitadorAdaptativo:
+    """Devuelve el limitador compartido del proceso."""
+    global _limitador
+    with _limitador_lock:
+        if _limitador is None:
+            _limitador = LimitadorAdaptativo()
+            atexit.register(_limitador.cuota.guardar)
+        return _limitador
@@ -0,0 +1,251 @@
+"""
+Modelos tipados de las respuestas de OpenAlex (solo los campos que se usan).
+
+Las páginas de autores y de works se decodifican directamente a objetos compactos con
+atributos (autor.summary_stats.h_index) en vez de dicts anidados. Con msgspec
+instalado, el JSON se decodifica en un solo paso a msgspec.Struct sin crear
+dicts intermedios y los campos no declarados se descartan durante el parseo;
+sin msgspec se usan dataclasses con __slots__ construidas desde json.loads,
+con la misma interfaz.
+
+Uso (benchmark sobre páginas guardadas en la caché de respuestas):
+    python src/modelos_openalex.py
+    python src/modelos_openalex.py --paginas 50
+"""
+
+import argparse
+import json
+import tracemalloc
+from dataclasses import field, fields, is_dataclass, make_dataclass
+from time import perf_counter
+from typing import List, Optional, Union, get_args, get_origin
+
+try:
+    import msgspec
+except ImportError:  # Dependencia opcional
+    msgspec = None
+
+
+def _modelo(nombre: str, campos: list, renombrar: dict = None):
+    """
+    Crea un modelo como msgspec.Struct o, sin msgspec, como dataclass con slots.
+
+    Args:
+        nombre: Nombre de la clase
+        campos: Lista de (atributo, tipo, default); default [] para listas
+        renombrar: {atributo: clave en el JSON} para claves que no son identificadores
+    """
+    if msgspec is not None:
+        return msgspec.defstruct(nombre, campos, rename=renombrar, module=__name__)
+
+    especificacion = [
+        (n, t, field(default_factory=list) if d == [] else field(default=d))
+        for n, t, d in campos
+    ]
+    clase = make_dataclass(nombre, especificacion, slots=True)
+    clase.__module__ = __name__
+    clase._renombrar = renombrar or {}
+    return clase
+
+
+Entidad = _modelo("Entidad", [
+    ("id", Optional[str], None),
+    ("display_name", Optional[str], None),
+])
+
+Topic = _modelo("Topic", [
+    ("id", Optional[str], None),
+    ("display_name", Optional[str], None),
+    ("subfield", Optional[Entidad], None),
+    ("field", Optional[Entidad], None),
+    ("domain", Optional[Entidad], None),
+])
+
+Institucion = _modelo("Institucion", [
+    ("id", Optional[str], None),
+    ("display_name", Optional[str], None),
+    ("country_code", Optional[str], None),
+    ("ror", Optional[str], None),
+])
+
+Concepto = _modelo("Concepto", [
+    ("id", Optional[str], None),
+    ("display_name", Optional[str], None),
+    ("score", Optional[float], None),
+])
+
+Resumen = _modelo("Resumen", [
+    ("h_index", Optional[int], None),
+    ("i10_index", Optional[int], None),
+    ("mean_citedness_2yr", Optional[float], None),
+], renombrar={"mean_citedness_2yr": "2yr_mean_citedness"})
+
+ConteoAnual = _modelo("ConteoAnual", [
+    ("year", Optional[int], None),
+    ("works_count", Optional[int], None),
+    ("cited_by_count", Optional[int], None),
+])
+
+Afiliacion = _modelo("Afiliacion", [
+    ("institution", Optional[Institucion], None),
+    ("years", List[int], []),
+])
+
+Autor = _modelo("Autor", [
+    ("id", Optional[str], None),
+    ("display_name", Optional[str], None),
+    ("orcid", Optional[str], None),
+    ("summary_stats", Optional[Resumen], None),
+    ("cited_by_count", Optional[int], None),
+    ("works_count", Optional[int], None),
+    ("last_known_institutions", List[Institucion], []),
+    # Snapshots antiguos traen una sola institución
+    ("last_known_institution", Optional[Institucion], None),
+    ("topics", List[Topic], []),
+    ("x_concepts", List[Concepto], []),
+    ("affiliations", List[Afiliacion], []),
+    ("counts_by_year", List[ConteoAnual], []),
+    ("works_api_url", Optional[str], None),
+    ("updated_date", Optional[str], None),
+])
+
+# Solo lo necesario para saber cuál es la versión más reciente de un autor (snapshot)
+VersionAutor = _modelo("VersionAutor", [
+    ("id", Optional[str], None),
+    ("updated_date", Optional[str], None),
+])
+
+Meta = _modelo("Meta", [
+    ("count", Optional[int], None),
+    ("next_cursor", Optional[str], None),
+])
+
+PaginaAutores = _modelo("PaginaAutores", [
+    ("meta", Optional[Meta], None),
+    ("results", List[Autor], []),
+])
+
+# Works (cosecha por publicaciones)
+AutorRef = _modelo("AutorRef", [
+    ("id", Optional[str], None),
+    ("display_name", Optional[str], None),
+    ("orcid", Optional[str], None),
+])
+
+Autoria = _modelo("Autoria", [
+    ("author", Optional[AutorRef], None),
+    ("institutions", List[Institucion], []),
+    ("countries", List[str], []),
+])
+
+Obra = _modelo("Obra", [
+    ("id", Optional[str], None),
+    ("publication_year", Optional[int], None),
+    ("authorships", List[Autoria], []),
+    ("cited_by_count", Optional[int], None),
+    ("updated_date", Optional[str], None),
+    ("referenced_works", List[str], []),
+    ("topics", List[Topic], []),
+])
+
+PaginaObras = _modelo("PaginaObras", [
+    ("meta", Optional[Meta], None),
+    ("results", List[Obra], []),
+])
+
+
+def _construir(tipo, valor):
+    """Convierte un valor de json.loads al tipo declarado (ruta sin msgspec)."""
+    if valor is None:
+        return None
+    origen = get_origin(tipo)
+    if origen is Union:
+        tipo = next(t for t in get_args(tipo) if t is not type(None))
+        return _construir(tipo, valor)
+    if origen is list:
+        (elemento,) = get_args(tipo)
+        return [_construir(elemento, v) for v in valor]
+    if is_dataclass(tipo):
+        kwargs = {}
+        for f in fields(tipo):
+            clave = tipo._renombrar.get(f.name, f.name)
+            if clave in valor:
+                kwargs[f.name] = _construir(f.type, valor[clave])
+        return tipo(**kwargs)
+    return valor
+
+
+_decodificadores = {}
+
+
+def decodificar(contenido: bytes, tipo=PaginaAutores):
+    """Decodifica el cuerpo de una respuesta (o una línea JSON) al modelo `tipo`."""
+    if msgspec is None:
+        return _construir(tipo, json.loads(contenido))
+    decodificador = _decodificadores.get(tipo)
+    if decodificador is None:
+        decodificador = _decodificadores[tipo] = msgspec.json.Decoder(tipo)
+    return decodificador.decode(contenido)
+
+
+def medir_decodificacion(paginas: list) -> dict:
+    """
+    Compara json.loads (dicts) con decodificar() (modelos) sobre las mismas páginas.
+
+    Mide el tiempo total de decodificación y la memoria retenida por todas
+    las páginas decodificadas (tracemalloc).
+    """
+    def medir(funcion):
+        tracemalloc.start()
+        inicio = perf_counter()
+        resultado = [funcion(p) for p in paginas]
+        segundos = perf_counter() - inicio
+        memoria = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del resultado
+        return segundos, memoria
+
+    # Una pasada previa para que ambas rutas midan en caliente
+    for p in paginas[:1]:
+        json.loads(p)
+        decodificar(p)
+
+    segundos_dict, memoria_dict = medir(json.loads)
+    segundos_modelo, memoria_modelo = medir(decodificar)
+
+    motor = "msgspec" if msgspec is not None else "dataclasses (sin msgspec)"
+    mb = sum(len(p) for p in paginas) / 1024 ** 2
+    print(f"{len(paginas)} paginas, {mb:.1f} MB de JSON; modelos con {motor}")
+    print(f"  json.loads (dicts):  {segundos_dict:.3f} s  {memoria_dict / 1024 ** 2:7.1f} MB retenidos")
+    print(f"  decodificar (tipos): {segundos_modelo:.3f} s  {memoria_modelo / 1024 ** 2:7.1f} MB retenidos")
+    if segundos_modelo and memoria_modelo:
+        print(f"  Velocidad: x{segundos_dict / segundos_modelo:.1f}; "
+              f"memoria: {memoria_modelo / memoria_dict:.0%} de la ruta con dicts")
+
+    return {
+        "segundos_dict": segundos_dict, "memoria_dict": memoria_dict,
+        "segundos_modelo": segundos_modelo, "memoria_modelo": memoria_modelo,
+    }
+
+
+def main():
+    from openalex_cache import RespuestaCache
+
+    parser = argparse.ArgumentParser(description="Compara la decodificacion con dicts y con modelos tipados")
+    parser.add_argument("--paginas", type=int, default=20,
+                        help="Paginas de autores a tomar de la cache de respuestas")
+    args = parser.parse_args()
+
+    cache = RespuestaCache()
+    paginas = cache.muestras("authors", args.paginas)
+    cache.close()
+
+    if not paginas:
+        print("La cache no tiene paginas de autores; ejecutar antes extraer_openalex.py")
+        return None
+
+    return medir_decodificacion(paginas)
+
+
+if __name__ == "__main__":
+    main()
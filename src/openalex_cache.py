@@ -0,0 +1,257 @@
+"""
+Caché persistente en disco para las respuestas de la API de OpenAlex.
+
+Cada respuesta se guarda comprimida (zlib) en una base SQLite, indexada por
+un hash de la URL y sus parámetros normalizados (ordenados y sin mailto).
+Las entradas expiran según el endpoint (TTL) y, cuando el tamaño total supera
+el máximo, se eliminan las menos usadas recientemente (LRU).
+
+Uso:
+    python src/openalex_cache.py              # Estadísticas de la caché
+    python src/openalex_cache.py --limpiar    # Elimina entradas expiradas
+    python src/openalex_cache.py --vaciar     # Elimina todo
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Configuración
+CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "openalex_cache.sqlite"
+
+# Tamaño máximo de la caché (bytes comprimidos)
+TAMANO_MAX = 2 * 1024 ** 3
+
+# Al desalojar se libera espacio hasta esta fracción del máximo
+FRACCION_DESALOJO = 0.9
+
+DIA = 24 * 3600
+
+# Vigencia de las respuestas por endpoint (segundos)
+TTL_POR_ENDPOINT = {
+    "authors": 1 * DIA,
+    "works": 7 * DIA,
+    "institutions": 30 * DIA,
+    "topics": 30 * DIA,
+    "subfields": 30 * DIA,
+    "fields": 30 * DIA,
+    "domains": 30 * DIA,
+}
+TTL_DEFAULT = 1 * DIA
+
+# Parámetros que no cambian la respuesta y se excluyen de la clave
+PARAMS_IGNORADOS = {"mailto", "api_key"}
+
+
+class SinCacheError(Exception):
+    """La respuesta no está en caché y el modo offline impide descargarla."""
+
+
+def normalizar(url: str, params: dict = None) -> tuple:
+    """
+    Devuelve (endpoint, clave canónica) para una URL y sus parámetros.
+
+    Los parámetros incluidos en la propia URL (ej: works_api_url) se combinan
+    con los explícitos, de modo que ambas formas generan la misma clave.
+    """
+    partes = urlsplit(url)
+    todos = dict(parse_qsl(partes.query))
+    todos.update({k: str(v) for k, v in (params or {}).items()})
+    todos = sorted((k, v) for k, v in todos.items() if k not in PARAMS_IGNORADOS)
+
+    endpoint = partes.path.strip("/").split("/")[0]
+    base = f"{partes.netloc}{partes.path}"
+    return endpoint, f"{base}?{urlencode(todos)}"
+
+
+class RespuestaCache:
+    """Caché de respuestas comprimidas con TTL por endpoint y desalojo LRU."""
+
+    def __init__(self, path: Path = CACHE_PATH, tamano_max: int = TAMANO_MAX,
+                 ttl: dict = None):
+        """
+        Inicializa la caché.
+
+        Args:
+            path: Archivo SQLite de la caché
+            tamano_max: Tamaño máximo en bytes (comprimidos)
+            ttl: Vigencia por endpoint en segundos (por defecto TTL_POR_ENDPOINT)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tamano_max = tamano_max
+        self.ttl = {**TTL_POR_ENDPOINT, **(ttl or {})}
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS respuestas (
+                clave TEXT PRIMARY KEY,
+                endpoint TEXT,
+                creado REAL,
+                accedido REAL,
+                tamano INTEGER,
+                datos BLOB
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accedido ON respuestas(accedido)")
+        self._conn.commit()
+        self._tamano = self._conn.execute(
+            "SELECT COALESCE(SUM(tamano), 0) FROM respuestas"
+        ).fetchone()[0]
+
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def _hash(clave: str) -> str:
+        return hashlib.sha256(clave.encode("utf-8")).hexdigest()
+
+    def obtener(self, url: str, params: dict = None, ignorar_ttl: bool = False):
+        """
+        Devuelve la respuesta guardada (bytes) o None si no existe o expiró.
+
+        Args:
+            ignorar_ttl: Entregar también entradas expiradas (modo offline)
+        """
+        endpoint, clave = normalizar(url, params)
+        h = self._hash(clave)
+        ahora = time.time()
+
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT creado, datos FROM respuestas WHERE clave = ?", (h,)
+            ).fetchone()
+            if fila is None:
+                self.fallos += 1
+                return None
+
+            creado, datos = fila
+            if not ignorar_ttl and ahora - creado > self.ttl.get(endpoint, TTL_DEFAULT):
+                self.fallos += 1
+                return None
+
+            self._conn.execute("UPDATE respuestas SET accedido = ? WHERE clave = ?", (ahora, h))
+            self._conn.commit()
+            self.aciertos += 1
+
+        return zlib.decompress(datos)
+
+    def guardar(self, url: str, params: dict, contenido: bytes):
+        """Guarda una respuesta (bytes del cuerpo) y desaloja si se supera el máximo."""
+        endpoint, clave = normalizar(url, params)
+        h = self._hash(clave)
+        datos = zlib.compress(contenido, 6)
+        ahora = time.time()
+
+        with self._lock:
+            anterior = self._conn.execute(
+                "SELECT tamano FROM respuestas WHERE clave = ?", (h,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respuestas VALUES (?, ?, ?, ?, ?, ?)",
+                (h, endpoint, ahora, ahora, len(datos), datos),
+            )
+            self._tamano += len(datos) - (anterior[0] if anterior else 0)
+
+            if self._tamano > self.tamano_max:
+                self._desalojar()
+            self._conn.commit()
+
+    def _desalojar(self):
+        """Elimina las entradas accedidas hace más tiempo (LRU) hasta liberar espacio."""
+        objetivo = self.tamano_max * FRACCION_DESALOJO
+        filas = self._conn.execute(
+            "SELECT clave, tamano FROM respuestas ORDER BY accedido ASC"
+        )
+        eliminar = []
+        for clave, tamano in filas:
+            if self._tamano <= objetivo:
+                break
+            eliminar.append((clave,))
+            self._tamano -= tamano
+        self._conn.executemany("DELETE FROM respuestas WHERE clave = ?", eliminar)
+
+    def limpiar_expirados(self) -> int:
+        """Elimina las entradas cuyo TTL venció. Devuelve cuántas se eliminaron."""
+        ahora = time.time()
+        eliminadas = 0
+        with self._lock:
+            endpoints = [e for (e,) in self._conn.execute("SELECT DISTINCT endpoint FROM respuestas")]
+            for endpoint in endpoints:
+                limite = ahora - self.ttl.get(endpoint, TTL_DEFAULT)
+                cur = self._conn.execute(
+                    "DELETE FROM respuestas WHERE endpoint = ? AND creado < ?", (endpoint, limite)
+                )
+                eliminadas += cur.rowcount
+            self._conn.commit()
+            self._tamano = self._conn.execute(
+                "SELECT COALESCE(SUM(tamano), 0) FROM respuestas"
+            ).fetchone()[0]
+        return eliminadas
+
+    def vaciar(self):
+        """Elimina todas las entradas."""
+        with self._lock:
+            self._conn.execute("DELETE FROM respuestas")
+            self._conn.commit()
+            self._tamano = 0
+
+    def estadisticas(self) -> dict:
+        """Entradas y tamaño por endpoint, más aciertos/fallos de esta sesión."""
+        with self._lock:
+            filas = self._conn.execute(
+                "SELECT endpoint, COUNT(*), SUM(tamano) FROM respuestas GROUP BY endpoint"
+            ).fetchall()
+        return {
+            "endpoints": {e: {"entradas": n, "bytes": b} for e, n, b in filas},
+            "bytes": self._tamano,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+        }
+
+    def muestras(self, endpoint: str, n: int = 20) -> list:
+        """Devuelve hasta n respuestas guardadas de un endpoint (bytes), para benchmarks."""
+        with self._lock:
+            filas = self._conn.execute(
+                "SELECT datos FROM respuestas WHERE endpoint = ? ORDER BY creado LIMIT ?",
+                (endpoint, n),
+            ).fetchall()
+        return [zlib.decompress(datos) for (datos,) in filas]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Administra la caché de respuestas de OpenAlex")
+    parser.add_argument("--limpiar", action="store_true", help="Eliminar entradas expiradas")
+    parser.add_argument("--vaciar", action="store_true", help="Eliminar todas las entradas")
+    args = parser.parse_args()
+
+    cache = RespuestaCache()
+
+    if args.vaciar:
+        cache.vaciar()
+        print("Cache vaciada")
+    elif args.limpiar:
+        print(f"Eliminadas {cache.limpiar_expirados()} entradas expiradas")
+
+    stats = cache.estadisticas()
+    print(f"Cache: {cache.path}")
+    print(f"Tamano: {stats['bytes'] / 1024 ** 2:.1f} MB de {cache.tamano_max / 1024 ** 2:.0f} MB")
+    for endpoint, datos in sorted(stats["endpoints"].items()):
+        print(f"  {endpoint:15} {datos['entradas']:8} entradas  {datos['bytes'] / 1024 ** 2:8.1f} MB")
+
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+Cliente compartido para la API de OpenAlex.
+
+Todos los extractores (extraer_openalex, openalex_scraper, ...) pasan por
+este módulo, que se encarga de:
+- Una sesión HTTP con pool de conexiones (keep-alive)
+- Un límite de requests simultáneas por host
+- Agregar el parámetro mailto (polite pool) a cada request
+- Regular la tasa con el limitador adaptativo compartido (429, Retry-After
+  y cuota diaria, ver limitador.py)
+- Guardar las respuestas en la caché en disco (openalex_cache) y, en modo
+  offline, servir solo desde ella
+- Exponer una interfaz asyncio para solapar requests, con envoltorios
+  síncronos para los scripts existentes
+
+Uso:
+    from openalex_client import get_client
+
+    client = get_client()
+    data = client.get("authors", {"filter": "last_known_institutions.country_code:cl"})
+    pagina = client.get_modelo("authors", params)   # PaginaAutores (modelos_openalex)
+    paginas = client.map([("authors", params_1), ("authors", params_2)])
+
+    # Desde un script con opciones --offline / --sin-cache
+    configurar_cliente(cache=not args.sin_cache, offline=args.offline)
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from limitador import LimitadorAdaptativo, get_limitador, segundos_retry_after
+from modelos_openalex import PaginaAutores, decodificar
+from openalex_cache import RespuestaCache, SinCacheError
+
+# Configuración
+API_BASE = "https://api.openalex.org"
+EMAIL = "ranking.ciencias.sociales@example.com"  # Cortesía para OpenAlex (polite pool)
+API_KEY = os.environ.get("OPENALEX_API_KEY")  # Opcional; requerida por filtros como from_updated_date
+
+MAX_CONCURRENCIA = 8  # Requests simultáneas por host
+TIMEOUT = 60  # Segundos por request
+PER_PAGE = 200  # Máximo permitido por la API
+MAX_REINTENTOS = 5  # Reintentos por request antes de fallar
+BACKOFF_BASE = 1.0  # Espera inicial entre reintentos (se duplica en cada intento)
+BACKOFF_MAX = 60.0  # Espera máxima entre reintentos
+CODIGOS_REINTENTABLES = {429, 500, 502, 503, 504}
+MAX_HILOS = 32  # Hilos disponibles para las corrutinas (la concurrencia real la acota el semáforo)
+
+
+class OpenAlexClient:
+    """Cliente HTTP para OpenAlex con pool de conexiones y concurrencia acotada."""
+
+    def __init__(self, email: str = EMAIL, max_concurrencia: int = MAX_CONCURRENCIA,
+                 timeout: int = TIMEOUT, cache: RespuestaCache = None,
+                 offline: bool = False, limitador: LimitadorAdaptativo = None):
+        """
+        Inicializa el cliente.
+
+        Args:
+            email: Correo para el polite pool de OpenAlex (None para omitirlo)
+            max_concurrencia: Máximo de requests simultáneas por host
+            timeout: Timeout de cada request en segundos
+            cache: Caché de respuestas en disco (None para desactivarla)
+            offline: Servir solo desde la caché, sin acceder a la red
+            limitador: Limitador de tasa (por defecto el compartido del proceso)
+        """
+        if offline and cache is None:
+            raise ValueError("El modo offline requiere una cache")
+
+        self.email = email
+        self.max_concurrencia = max_concurrencia
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+        self.limitador = limitador if limitador is not None else get_limitador()
+
+        # El pool debe tener al menos tantas conexiones como requests simultáneas
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrencia)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._semaforos = {}
+        self._lock = threading.Lock()
+
+        # Tamaño de las respuestas y tiempo de decodificación JSON
+        self.stats = {"llamadas": 0, "requests": 0, "bytes_red": 0, "bytes_cache": 0,
+                      "segundos_json": 0.0}
+
+    def _url(self, endpoint: str) -> str:
+        """Acepta un endpoint ("authors") o una URL completa (works_api_url)."""
+        if endpoint.startswith("http"):
+            return endpoint
+        return f"{API_BASE}/{endpoint.lstrip('/')}"
+
+    def _semaforo(self, url: str) -> threading.BoundedSemaphore:
+        """Semáforo por host; acota la concurrencia de hilos y corrutinas por igual."""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.max_concurrencia)
+            return self._semaforos[host]
+
+    def _params(self, params: dict = None) -> dict:
+        params = dict(params or {})
+        if self.email:
+            params.setdefault("mailto", self.email)
+        if API_KEY:
+            params.setdefault("api_key", API_KEY)
+        return params
+
+    def _contar(self, clave: str, valor):
+        with self._lock:
+            self.stats[clave] += valor
+
+    def get_bytes(self, endpoint: str, params: dict = None, usar_cache: bool = True) -> bytes:
+        """
+        Devuelve el cuerpo de la respuesta, desde la caché si está vigente.
+
+        Lanza requests.RequestException si la request falla tras los
+        reintentos (ver _descargar()) y SinCacheError
+        si el cliente está offline y la respuesta no está en caché.
+        """
+        url = self._url(endpoint)
+        usar_cache = usar_cache and self.cache is not None
+        self._contar("llamadas", 1)
+
+        if usar_cache:
+            contenido = self.cache.obtener(url, params, ignorar_ttl=self.offline)
+            if contenido is not None:
+                self._contar("bytes_cache", len(contenido))
+                return contenido
+            if self.offline:
+                raise SinCacheError(f"Sin cache para {url} {params or ''}")
+
+        response = self._descargar(url, params)
+
+        self._contar("requests", 1)
+        self._contar("bytes_red", len(response.content))
+        if usar_cache:
+            self.cache.guardar(url, params, response.content)
+        return response.content
+
+    def _descargar(self, url: str, params: dict = None) -> requests.Response:
+        """
+        Realiza la request con reintentos acotados y backoff exponencial.
+
+        Reintenta errores de conexión, timeouts y los códigos de
+        CODIGOS_REINTENTABLES; otros errores HTTP (400, 404...) fallan de
+        inmediato. Tras MAX_REINTENTOS lanza la última excepción. Un 429
+        reduce la tasa del limitador y pausa todas las requests según
+        Retry-After, en lugar del backoff.
+        """
+        for intento in range(MAX_REINTENTOS + 1):
+            try:
+                with self._semaforo(url):
+                    self.limitador.adquirir()
+                    response = self.session.get(url, params=self._params(params),
+                                                timeout=self.timeout)
+                if response.status_code == 429:
+                    self.limitador.throttle(segundos_retry_after(response.headers.get("Retry-After")))
+                response.raise_for_status()
+                self.limitador.exito()
+                return response
+
+            except requests.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                if (status is not None and status not in CODIGOS_REINTENTABLES) \
+                        or intento == MAX_REINTENTOS:
+                    raise
+                if status == 429:
+                    # La espera la impone el limitador en el próximo adquirir()
+                    continue
+                espera = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** intento) * random.uniform(0.5, 1.0)
+                print(f"  Reintento {intento + 1}/{MAX_REINTENTOS} en {espera:.1f}s: {e}")
+                sleep(espera)
+
+    def get(self, endpoint: str, params: dict = None, usar_cache: bool = True) -> dict:
+        """
+        Realiza una request GET y devuelve el JSON (ver get_bytes()).
+        """
+        contenido = self.get_bytes(endpoint, params, usar_cache=usar_cache)
+        inicio = perf_counter()
+        data = json.loads(contenido)
+        self._contar("segundos_json", perf_counter() - inicio)
+        return data
+
+    def get_modelo(self, endpoint: str, params: dict = None, tipo=PaginaAutores,
+                   usar_cache: bool = True):
+        """
+        Realiza una request GET y decodifica la respuesta al modelo `tipo`
+        (ver modelos_openalex), sin pasar por dicts.
+        """
+        contenido = self.get_bytes(endpoint, params, usar_cache=usar_cache)
+        inicio = perf_counter()
+        data = decodificar(contenido, tipo)
+        self._contar("segundos_json", perf_counter() - inicio)
+        return data
+
+    def reporte(self) -> str:
+        """Resumen de requests, bytes descargados y tiempo de decodificación."""
+        s = self.stats
+        texto = (f"API: {s['requests']} requests, {s['bytes_red'] / 1024 ** 2:.1f} MB descargados, "
+                 f"{s['bytes_cache'] / 1024 ** 2:.1f} MB desde cache, "
+                 f"{s['segundos_json']:.2f} s decodificando JSON")
+        if self.cache is not None:
+            texto += f"\nCache: {self.cache.aciertos} aciertos, {self.cache.fallos} fallos"
+        texto += f"\n{self.limitador.reporte()}"
+        return texto
+
+    def contar(self, endpoint: str, filtro: str) -> int:
+        """Devuelve meta.count de un filtro con una request de un solo resultado."""
+        data = self.get(endpoint, {"filter": filtro, "per_page": 1, "select": "id"})
+        return data.get("meta", {}).get("count", 0)
+
+    def paginar(self, endpoint: str, params: dict = None):
+        """
+        Recorre un cursor completo y entrega cada página (dict de la API).
+
+        Las páginas de un mismo cursor son necesariamente secuenciales; para
+        solapar varios cursores usar apaginar() desde varias corrutinas.
+        """
+        params = dict(params or {})
+        params.setdefault("per_page", PER_PAGE)
+        cursor = params.pop("cursor", "*")
+
+        while cursor:
+            data = self.get(endpoint, {**params, "cursor": cursor})
+            if not data.get("results"):
+                break
+            yield data
+            cursor = data.get("meta", {}).get("next_cursor")
+
+    # Interfaz asyncio: las requests corren en hilos y comparten el mismo pool
+
+    async def aget(self, endpoint: str, params: dict = None) -> dict:
+        """Versión asyncio de get()."""
+        return await asyncio.to_thread(self.get, endpoint, params)
+
+    async def aget_modelo(self, endpoint: str, params: dict = None, tipo=PaginaAutores):
+        """Versión asyncio de get_modelo()."""
+        return await asyncio.to_thread(self.get_modelo, endpoint, params, tipo)
+
+    async def acontar(self, endpoint: str, filtro: str) -> int:
+        """Versión asyncio de contar()."""
+        return await asyncio.to_thread(self.contar, endpoint, filtro)
+
+    async def apaginar(self, endpoint: str, params: dict = None, tipo=None):
+        """
+        Versión asyncio de paginar() (generador asíncrono de páginas).
+
+        Con tipo (ej: PaginaAutores) cada página se entrega decodificada a
+        ese modelo en vez de como dict.
+        """
+        params = dict(params or {})
+        params.setdefault("per_page", PER_PAGE)
+        cursor = params.pop("cursor", "*")
+
+        while cursor:
+            if tipo is None:
+                data = await self.aget(endpoint, {**params, "cursor": cursor})
+                results, cursor = data.get("results"), data.get("meta", {}).get("next_cursor")
+            else:
+                data = await self.aget_modelo(endpoint, {**params, "cursor": cursor}, tipo)
+                results, cursor = data.results, data.meta.next_cursor if data.meta else None
+            if not results:
+                break
+            yield data
+
+    async def agather(self, llamadas: list, return_exceptions: bool = False) -> list:
+        """Ejecuta varias llamadas (endpoint, params) de forma solapada."""
+        return await asyncio.gather(
+            *(self.aget(endpoint, params) for endpoint, params in llamadas),
+            return_exceptions=return_exceptions,
+        )
+
+    def map(self, llamadas: list, return_exceptions: bool = False) -> list:
+        """Envoltorio síncrono de agather(); mantiene el orden de las llamadas."""
+        return ejecutar(self.agather(llamadas, return_exceptions=return_exceptions))
+
+    def close(self):
+        """Cierra las conexiones del pool y la caché."""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def medir_proyeccion(client: OpenAlexClient, endpoint: str, params: dict,
+                     campos: list, paginas: int = 3) -> dict:
+    """
+    Compara tamaño y tiempo de decodificación de las mismas páginas con y sin select=.
+
+    Descarga siempre desde la red (sin caché) para medir el payload real.
+    """
+    resultado = {}
+    for nombre, select in (("completo", None), ("select", ",".join(campos))):
+        p = dict(params, per_page=PER_PAGE, cursor="*")
+        if select:
+            p["select"] = select
+        total_bytes = 0
+        segundos = 0.0
+        for _ in range(paginas):
+            contenido = client.get_bytes(endpoint, p, usar_cache=False)
+            inicio = perf_counter()
+            data = json.loads(contenido)
+            segundos += perf_counter() - inicio
+            total_bytes += len(contenido)
+            p["cursor"] = data.get("meta", {}).get("next_cursor")
+            if not p["cursor"]:
+                break
+        resultado[nombre] = {"bytes": total_bytes, "segundos_json": segundos}
+
+    completo, proyectado = resultado["completo"], resultado["select"]
+    print(f"Sin select: {completo['bytes'] / 1024:.0f} KB, {completo['segundos_json'] * 1000:.0f} ms JSON")
+    print(f"Con select: {proyectado['bytes'] / 1024:.0f} KB, {proyectado['segundos_json'] * 1000:.0f} ms JSON")
+    if proyectado["bytes"]:
+        print(f"Reduccion: {completo['bytes'] / proyectado['bytes']:.1f}x en bytes, "
+              f"{completo['segundos_json'] / max(proyectado['segundos_json'], 1e-9):.1f}x en decodificacion")
+    return resultado
+
+
+def ejecutar(corrutina):
+    """Ejecuta una corrutina desde código síncrono (scripts)."""
+    async def _con_hilos():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(MAX_HILOS))
+        return await corrutina
+
+    return asyncio.run(_con_hilos())
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configurar_cliente(cache: bool = True, offline: bool = False, **kwargs) -> OpenAlexClient:
+    """
+    Reemplaza el cliente compartido del proceso.
+
+    Args:
+        cache: Usar la caché de respuestas en disco
+        offline: Servir solo desde la caché (implica cache=True)
+        **kwargs: Otros argumentos de OpenAlexClient
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        respuestas = RespuestaCache() if (cache or offline) else None
+        _client = OpenAlexClient(cache=respuestas, offline=offline, **kwargs)
+        return _client
+
+
+def agregar_argumentos_cliente(parser):
+    """Agrega las opciones comunes del cliente (--offline, --sin-cache) a un parser."""
+    parser.add_argument("--offline", action="store_true",
+                        help="Servir solo desde la cache de respuestas, sin acceder a la API")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="No leer ni guardar respuestas en la cache en disco")
+
+
+def get_client() -> OpenAlexClient:
+    """Devuelve el cliente compartido del proceso (se crea al primer uso, con caché)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAlexClient(cache=RespuestaCache())
+        return _client
@@ -7,16 +7,21 @@ cobertura de América Latina. API gratuita sin autenticación.
 Documentación: https://docs.openalex.org/
 """
 
-import requests
+import argparse
+import asyncio
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from time import sleep
 from pathlib import Path
 import json
+from collections import Counter
 
-# Configuración
-BASE_URL = "https://api.openalex.org"
-EMAIL = "ranking.ciencias.sociales@example.com"  # Cortesía para OpenAlex
+from estado_cosecha import EstadoCosecha, clave_filtro
+from instituciones_openalex import ids_instituciones
+from modelos_openalex import PaginaAutores
+from sumidero_autores import SumideroJSONL
+from taxonomia_openalex import get_taxonomia, reportar_topics
+from openalex_client import get_client, ejecutar, configurar_cliente, agregar_argumentos_cliente
 
 # Topics de ciencias sociales en OpenAlex
 # Encontrados mediante búsqueda en la API
@@ -78,8 +83,22 @@ SOCIAL_SCIENCE_TOPICS = [
 ]
 
 
+# Campos de autor que lee parse_author (select= de la API)
+CAMPOS_AUTOR = [
+    "id", "orcid", "display_name", "last_known_institutions", "summary_stats",
+    "cited_by_count", "works_count", "topics", "works_api_url",
+]
+
+# Instituciones por cursor en la búsqueda por institución (filtro OR de IDs)
+INSTITUCIONES_POR_SHARD = 4
+
+# Topics por cursor en la cosecha completa por topics (--completo)
+TOPICS_POR_SHARD = 4
+
+
 def get_authors_by_topics(topics: list, country_code: str = "CL",
-                          per_page: int = 200, max_results: int = 2000) -> list:
+                          per_page: int = 200, max_results: int = 2000,
+                          sumidero=None, estado=None) -> list:
     """
     Obtiene autores de OpenAlex filtrados por topics y país.
 
@@ -88,170 +107,304 @@ def get_authors_by_topics(topics: list, country_code: str = "CL",
         country_code: Código ISO del país (CL = Chile)
         per_page: Resultados por página (max 200)
         max_results: Máximo de resultados a obtener
+        sumidero: SumideroJSONL opcional; si se entrega, cada página se
+                  escribe a disco y se devuelve el sumidero en vez de la lista
+        estado: EstadoCosecha opcional (requiere sumidero) para guardar el
+                cursor tras cada página y reanudar una descarga interrumpida
 
     Returns:
         Lista de diccionarios con datos de autores
     """
+    if estado is not None and sumidero is None:
+        raise ValueError("Los checkpoints requieren un sumidero en disco")
+
     all_authors = {}  # Usar dict para evitar duplicados por ID
-    topics_filter = "|".join(topics)
 
-    cursor = "*"
-    total_fetched = 0
+    # Descartar IDs inexistentes o repetidos antes de gastar requests en ellos
+    topics = reportar_topics(topics)
+    topics_filter = "|".join(topics)
+    filtro = f"last_known_institutions.country_code:{country_code},topics.id:{topics_filter}"
+
+    # Reanudar desde el último checkpoint (solo con sumidero en disco)
+    clave = f"topics_{clave_filtro(filtro)}"
+    previo = estado.leer(clave) if estado is not None else None
+    if previo:
+        cursor, total_fetched = previo["cursor"], previo["total_fetched"]
+        print(f"Reanudando desde {total_fetched} autores obtenidos")
+    else:
+        cursor, total_fetched = "*", 0
 
     print(f"Buscando autores en {len(topics)} topics de ciencias sociales...")
     print(f"País: {country_code}")
 
+    client = get_client()
+
+    # Los errores de red se reintentan en el cliente; si persisten se
+    # propagan en vez de truncar silenciosamente el resultado
     while cursor and total_fetched < max_results:
-        url = f"{BASE_URL}/authors"
         params = {
-            "filter": f"last_known_institutions.country_code:{country_code},topics.id:{topics_filter}",
+            "filter": filtro,
+            "select": ",".join(CAMPOS_AUTOR),
             "sort": "cited_by_count:desc",
             "per_page": per_page,
             "cursor": cursor,
-            "mailto": EMAIL
         }
 
-        try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+        data = client.get_modelo("authors", params, PaginaAutores)
 
-            results = data.get("results", [])
-            meta = data.get("meta", {})
+        results = data.results
 
-            if not results:
-                break
+        if not results:
+            break
 
+        if sumidero is not None:
+            sumidero.agregar([parse_author(a) for a in results if a.id])
+        else:
             for author in results:
-                author_id = author.get("id", "").replace("https://openalex.org/", "")
+                author_id = (author.id or "").replace("https://openalex.org/", "")
                 if author_id and author_id not in all_authors:
                     all_authors[author_id] = parse_author(author)
 
-            total_fetched += len(results)
-            cursor = meta.get("next_cursor")
+        total_fetched += len(results)
+        cursor = data.meta.next_cursor if data.meta else None
 
-            print(f"  Obtenidos: {total_fetched} (únicos: {len(all_authors)})")
+        if estado is not None:
+            estado.escribir(clave, {"cursor": cursor, "total_fetched": total_fetched})
 
-            # Pausa para no sobrecargar la API
-            sleep(0.1)
+        unicos = len(sumidero) if sumidero is not None else len(all_authors)
+        print(f"  Obtenidos: {total_fetched} (únicos: {unicos})")
 
-        except requests.exceptions.RequestException as e:
-            print(f"Error en request: {e}")
-            break
+    if sumidero is not None:
+        return sumidero
+    return list(all_authors.values())
+
+
+def get_authors_by_topics_completo(topics: list, country_code: str = "CL",
+                                   topics_por_shard: int = TOPICS_POR_SHARD,
+                                   per_page: int = 200,
+                                   sumidero=None, estado=None) -> list:
+    """
+    Cobertura completa por topics, sin tope de resultados.
+
+    El filtro OR de topics se reparte en shards de topics_por_shard topics,
+    cada uno con su propio cursor; los cursores se recorren en paralelo y
+    un conjunto de IDs compartido descarta a los autores que ya llegaron
+    por otro shard. Al final se informa, por shard, cuántos autores trajo y
+    cuántos de ellos aparecieron también en otros shards.
 
+    Args:
+        topics: Lista de IDs de topics
+        country_code: Código ISO del país
+        topics_por_shard: Topics por cursor
+        per_page: Resultados por página (max 200)
+        sumidero: SumideroJSONL opcional (ver get_authors_by_topics)
+        estado: EstadoCosecha opcional (requiere sumidero); un cursor por shard
+
+    Returns:
+        Lista de diccionarios con datos de autores (o el sumidero)
+    """
+    if estado is not None and sumidero is None:
+        raise ValueError("Los checkpoints requieren un sumidero en disco")
+
+    topics = reportar_topics(topics)
+    shards = [topics[i:i + topics_por_shard] for i in range(0, len(topics), topics_por_shard)]
+
+    all_authors = {}
+    ids_por_shard = [set() for _ in shards]
+
+    async def recorrer(i, shard):
+        filtro = f"last_known_institutions.country_code:{country_code},topics.id:{'|'.join(shard)}"
+        clave = f"topics_{clave_filtro(filtro)}"
+        previo = estado.leer(clave) if estado is not None else None
+        if previo and not previo["cursor"]:
+            return
+
+        params = {
+            "filter": filtro,
+            "select": ",".join(CAMPOS_AUTOR),
+            "per_page": per_page,
+            "cursor": previo["cursor"] if previo else "*",
+        }
+        async for data in client.apaginar("authors", params, PaginaAutores):
+            filas = []
+            for author in data.results:
+                author_id = (author.id or "").replace("https://openalex.org/", "")
+                if not author_id:
+                    continue
+                ids_por_shard[i].add(author_id)
+                if author_id not in all_authors:
+                    all_authors[author_id] = None
+                    filas.append(parse_author(author))
+
+            if sumidero is not None:
+                sumidero.agregar(filas)
+            else:
+                for fila in filas:
+                    all_authors[fila["openalex_id"]] = fila
+
+            if estado is not None:
+                cursor = data.meta.next_cursor if data.meta else None
+                estado.escribir(clave, {"cursor": cursor})
+
+        if estado is not None:
+            estado.escribir(clave, {"cursor": None})
+
+    async def recorrer_todos():
+        await asyncio.gather(*(recorrer(i, shard) for i, shard in enumerate(shards)))
+
+    client = get_client()
+    print(f"Buscando autores en {len(topics)} topics ({len(shards)} shards en paralelo)...")
+    print(f"País: {country_code}")
+    ejecutar(recorrer_todos())
+
+    # Solapamiento: autores de cada shard que también trajo otro shard
+    apariciones = Counter(a for ids in ids_por_shard for a in ids)
+    print(f"\n{'Shard':50} {'autores':>8} {'en otros':>9}")
+    for shard, ids in zip(shards, ids_por_shard):
+        repetidos = sum(1 for a in ids if apariciones[a] > 1)
+        print(f"  {'|'.join(shard)[:48]:48} {len(ids):8} {repetidos:9}")
+    total = sum(len(ids) for ids in ids_por_shard)
+    print(f"Únicos: {len(apariciones)} de {total} recibidos "
+          f"({total - len(apariciones)} repetidos entre shards)")
+
+    if sumidero is not None:
+        return sumidero
     return list(all_authors.values())
 
 
-def get_authors_by_institution_search(search_terms: list,
+def get_authors_by_institution_search(search_terms: list = None,
                                        per_page: int = 200,
-                                       max_per_term: int = 500) -> list:
+                                       max_per_term: int = 500,
+                                       shard_size: int = INSTITUCIONES_POR_SHARD,
+                                       refrescar: bool = False) -> list:
     """
     Búsqueda alternativa: buscar por institución chilena.
     Útil para encontrar autores que no tienen topics asignados.
-    """
-    all_authors = {}
 
-    chilean_institutions = [
-        "Universidad de Chile",
-        "Pontificia Universidad Católica de Chile",
-        "Universidad Diego Portales",
-        "Universidad de Santiago",
-        "Universidad Adolfo Ibáñez",
-        "Universidad Alberto Hurtado",
-        "Universidad de Concepción",
-        "Universidad de Valparaíso",
-        "Universidad Austral",
-        "Universidad de Talca",
-        "Universidad Católica de Valparaíso",
-        "COES",
-        "FLACSO Chile",
-    ]
+    Los nombres (search_terms, o la lista de config.yaml si está vacía) se
+    resuelven a IDs de OpenAlex una sola vez (ver instituciones_openalex) y
+    los autores se piden con un filtro OR exacto de last_known_institutions.id,
+    repartido en shards de shard_size instituciones recorridos en paralelo.
 
-    for inst in chilean_institutions:
-        print(f"Buscando en: {inst}...")
+    Args:
+        search_terms: Nombres de instituciones (vacío = config.yaml)
+        per_page: Resultados por página (max 200)
+        max_per_term: Máximo de autores por institución (los de más citas)
+        shard_size: Instituciones por cursor
+        refrescar: Volver a resolver los nombres en la API
+    """
+    all_authors = {}
 
+    ids = ids_instituciones(search_terms or None, country_code="CL", refrescar=refrescar)
+    shards = [ids[i:i + shard_size] for i in range(0, len(ids), shard_size)]
+
+    async def buscar_shard(shard):
+        """Recorre el cursor de un shard; los cursores de distintos shards se
+        solapan entre sí. El tope max_per_term se cuenta por institución, así
+        que una institución grande no deja sin cupo a las otras del shard.
+        Cuando una institución llena su cupo, el cursor se reinicia con las
+        instituciones pendientes, desde las citas del último autor visto."""
+        encontrados = {}
+        por_institucion = Counter()
+        pendientes = list(shard)
         cursor = "*"
-        fetched = 0
+        max_citas = None  # Citas del último autor visto (orden descendente)
 
-        while cursor and fetched < max_per_term:
-            url = f"{BASE_URL}/authors"
+        while cursor and pendientes:
+            filtro = f"last_known_institutions.id:{'|'.join(pendientes)}"
+            if max_citas is not None:
+                filtro += f",cited_by_count:<{max_citas + 1}"
             params = {
-                "filter": f"affiliations.institution.display_name.search:{inst}",
+                "filter": filtro,
+                "select": ",".join(CAMPOS_AUTOR),
                 "sort": "cited_by_count:desc",
                 "per_page": per_page,
                 "cursor": cursor,
-                "mailto": EMAIL
             }
 
-            try:
-                response = requests.get(url, params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-
-                results = data.get("results", [])
-                meta = data.get("meta", {})
-
-                if not results:
-                    break
-
-                for author in results:
-                    author_id = author.get("id", "").replace("https://openalex.org/", "")
-                    # Solo incluir si tiene afiliación actual en Chile
-                    last_inst = author.get("last_known_institutions", [])
-                    if last_inst:
-                        country = last_inst[0].get("country_code", "")
-                        if country == "CL" and author_id not in all_authors:
-                            all_authors[author_id] = parse_author(author)
-
-                fetched += len(results)
-                cursor = meta.get("next_cursor")
+            data = await client.aget_modelo("authors", params, PaginaAutores)
 
-                sleep(0.1)
+            results = data.results
 
-            except requests.exceptions.RequestException as e:
-                print(f"  Error: {e}")
+            if not results:
                 break
 
-        print(f"  Total acumulado: {len(all_authors)}")
+            for author in results:
+                author_id = (author.id or "").replace("https://openalex.org/", "")
+                if not author_id or author_id in encontrados:
+                    continue
+                instituciones = [(inst.id or "").replace("https://openalex.org/", "")
+                                 for inst in author.last_known_institutions]
+                instituciones = [i for i in instituciones if i in shard]
+                # Se guarda si alguna de sus instituciones del shard aún tiene cupo
+                if not instituciones or any(por_institucion[i] < max_per_term for i in instituciones):
+                    encontrados[author_id] = parse_author(author)
+                    por_institucion.update(instituciones)
+
+            cursor = data.meta.next_cursor if data.meta else None
+
+            llenas = [i for i in pendientes if por_institucion[i] >= max_per_term]
+            if llenas:
+                pendientes = [i for i in pendientes if i not in llenas]
+                cursor = "*"
+                max_citas = results[-1].cited_by_count or 0
+
+        print(f"  {'|'.join(shard)}: {len(encontrados)} autores")
+        return encontrados
+
+    async def buscar_todas():
+        return await asyncio.gather(*(buscar_shard(shard) for shard in shards))
+
+    client = get_client()
+    print(f"Buscando en {len(ids)} instituciones ({len(shards)} shards)...")
+
+    # Mezclar en el orden de los shards para que el resultado no dependa del orden de llegada
+    for encontrados in ejecutar(buscar_todas()):
+        for author_id, author in encontrados.items():
+            if author_id not in all_authors:
+                all_authors[author_id] = author
+
+    print(f"  Total acumulado: {len(all_authors)}")
 
     return list(all_authors.values())
 
 
-def parse_author(author: dict) -> dict:
+def parse_author(author) -> dict:
     """
-    Extrae campos relevantes de un autor de OpenAlex.
+    Extrae campos relevantes de un autor de OpenAlex (modelos_openalex.Autor).
     """
     # ID
-    openalex_id = author.get("id", "").replace("https://openalex.org/", "")
+    openalex_id = (author.id or "").replace("https://openalex.org/", "")
 
     # ORCID
-    orcid = author.get("orcid", "")
+    orcid = author.orcid or ""
     if orcid:
         orcid = orcid.replace("https://orcid.org/", "")
 
     # Nombre
-    name = author.get("display_name", "")
+    name = author.display_name or ""
 
     # Institución actual
-    last_inst = author.get("last_known_institutions", [])
+    last_inst = author.last_known_institutions
     if last_inst:
-        institution = last_inst[0].get("display_name", "")
-        institution_country = last_inst[0].get("country_code", "")
-        institution_ror = last_inst[0].get("ror", "")
+        institution = last_inst[0].display_name or ""
+        institution_country = last_inst[0].country_code or ""
+        institution_ror = last_inst[0].ror or ""
     else:
         institution = ""
         institution_country = ""
         institution_ror = ""
 
     # Métricas
-    h_index = author.get("summary_stats", {}).get("h_index", 0)
-    i10_index = author.get("summary_stats", {}).get("i10_index", 0)
-    citations = author.get("cited_by_count", 0)
-    works_count = author.get("works_count", 0)
+    summary = author.summary_stats
+    h_index = (summary.h_index if summary else None) or 0
+    i10_index = (summary.i10_index if summary else None) or 0
+    citations = author.cited_by_count or 0
+    works_count = author.works_count or 0
 
     # Topics principales (hasta 5)
-    topics = author.get("topics", [])[:5]
-    topics_names = [t.get("display_name", "") for t in topics]
+    topics = author.topics[:5]
+    topics_names = [t.display_name or "" for t in topics]
     topics_str = "; ".join(topics_names)
 
     # Dominio principal (field)
@@ -259,13 +412,13 @@ def parse_author(author: dict) -> dict:
     primary_domain = ""
     if topics:
         first_topic = topics[0]
-        field = first_topic.get("field", {})
-        domain = first_topic.get("domain", {})
-        primary_field = field.get("display_name", "") if field else ""
-        primary_domain = domain.get("display_name", "") if domain else ""
+        field = first_topic.field
+        domain = first_topic.domain
+        primary_field = (field.display_name or "") if field else ""
+        primary_domain = (domain.display_name or "") if domain else ""
 
     # Años activos
-    works_api_url = author.get("works_api_url", "")
+    works_api_url = author.works_api_url or ""
 
     return {
         "openalex_id": openalex_id,
@@ -328,6 +481,21 @@ def filter_social_sciences(authors: list, strict: bool = True) -> list:
         "Energy",
     ]
 
+    if not authors:
+        return []
+
+    # Con la taxonomía local: códigos enteros y máscaras booleanas para todos los autores a la vez
+    taxonomia = get_taxonomia()
+    if taxonomia is not None:
+        campos = np.array([taxonomia.codigo_campo.get(a.get("campo_principal", ""), 0) for a in authors])
+        dominios = np.array([taxonomia.codigo_dominio.get(a.get("dominio", ""), 0) for a in authors])
+        chile = np.array([a.get("pais_institucion", "") == "CL" for a in authors])
+
+        dominio_cs = taxonomia.mascara("domains", ["Social Sciences"])[dominios]
+        incluir = dominio_cs if strict else dominio_cs | taxonomia.mascara("fields", social_science_fields)[campos]
+        incluir &= chile & ~taxonomia.mascara("fields", exclude_fields)[campos]
+        return [a for a, ok in zip(authors, incluir.tolist()) if ok]
+
     filtered = []
     for author in authors:
         field = author.get("campo_principal", "")
@@ -354,43 +522,112 @@ def filter_social_sciences(authors: list, strict: bool = True) -> list:
     return filtered
 
 
-def enrich_with_first_publication_year(authors: list, sample_size: int = 50) -> list:
+def id_corto(openalex_id: str) -> str:
+    """'https://openalex.org/A5012345678' -> 'A5012345678'."""
+    return str(openalex_id).replace("https://openalex.org/", "")
+
+
+async def primer_anio_lote(ids: list) -> dict:
     """
-    Opcional: Obtiene el año de primera publicación para calcular años en academia.
-    Solo para una muestra (es lento).
+    Año de la primera publicación de un lote de autores (hasta ~100 IDs).
+
+    Pide los works del lote con un filtro OR de author.id, ordenados por año
+    ascendente. Cada autor que aparece en la página queda resuelto con el año
+    de su primer work; la siguiente request incluye solo a los pendientes y
+    parte desde el último año visto, así que cada ronda descarta los works de
+    los autores ya resueltos. Autores sin works quedan fuera del resultado.
     """
-    print(f"\nObteniendo año de primera publicación (muestra de {sample_size})...")
+    client = get_client()
+    pendientes = set(ids)
+    primeros = {}
+    desde = None
+
+    while pendientes:
+        filtro = f"author.id:{'|'.join(sorted(pendientes))}"
+        if desde is not None:
+            filtro += f",publication_year:>{desde - 1}"
+        data = await client.aget("works", {
+            "filter": filtro,
+            "sort": "publication_year:asc",
+            "select": "publication_year,authorships",
+            "per_page": 200,
+        })
+
+        results = data.get("results", [])
+        resueltos = 0
+        for work in results:
+            year = work.get("publication_year")
+            if year is None:
+                continue
+            for authorship in work.get("authorships", []):
+                author_id = id_corto((authorship.get("author") or {}).get("id", ""))
+                if author_id in pendientes:
+                    primeros[author_id] = year
+                    pendientes.discard(author_id)
+                    resueltos += 1
+            desde = year
+
+        # Página incompleta: los pendientes no tienen más works; sin avance: evitar ciclo
+        if len(results) < 200 or resueltos == 0:
+            break
 
-    for i, author in enumerate(authors[:sample_size]):
-        works_url = author.get("works_api_url", "")
-        if not works_url:
-            continue
+    return primeros
 
-        try:
-            # Obtener trabajo más antiguo
-            params = {
-                "sort": "publication_year:asc",
-                "per_page": 1,
-                "mailto": EMAIL
-            }
-            response = requests.get(works_url, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
 
-            results = data.get("results", [])
-            if results:
-                first_year = results[0].get("publication_year")
-                author["primer_anio"] = first_year
-                if first_year:
-                    author["anios_academia"] = 2025 - first_year
+def primer_anio_publicacion(ids: list, batch_size: int = 50) -> dict:
+    """
+    Año de primera publicación para muchos autores, en lotes solapados.
 
-            if (i + 1) % 10 == 0:
-                print(f"  Procesados: {i + 1}/{sample_size}")
+    Args:
+        ids: IDs de OpenAlex (con o sin prefijo https://openalex.org/)
+        batch_size: Autores por request (filtro OR, máximo 100)
 
-            sleep(0.2)
+    Returns:
+        Diccionario {id corto: año}
+    """
+    ids = list(dict.fromkeys(id_corto(i) for i in ids if i))
+    lotes = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
 
-        except Exception as e:
-            continue
+    async def todos():
+        return await asyncio.gather(*(primer_anio_lote(lote) for lote in lotes))
+
+    client = get_client()
+    llamadas = client.stats["llamadas"]
+    primeros = {}
+    for resultado in ejecutar(todos()):
+        primeros.update(resultado)
+
+    print(f"  Primer año: {len(primeros)}/{len(ids)} autores en "
+          f"{client.stats['llamadas'] - llamadas} requests ({len(lotes)} lotes)")
+    return primeros
+
+
+def enrich_with_first_publication_year(authors: list, sample_size: int = None,
+                                       batch_size: int = 50) -> list:
+    """
+    Agrega año de primera publicación, años en academia y cociente m (h / años).
+
+    Las consultas se hacen por lotes de autores (ver primer_anio_lote), por lo
+    que cubrir a todos los autores cuesta una fracción de una request por autor.
+
+    Args:
+        authors: Lista de autores (dicts con 'openalex_id' y 'h_index')
+        sample_size: Limitar a los primeros N autores (None = todos)
+        batch_size: Autores por request
+    """
+    muestra = authors if sample_size is None else authors[:sample_size]
+    print(f"\nObteniendo año de primera publicación ({len(muestra)} autores)...")
+
+    primeros = primer_anio_publicacion([a.get("openalex_id", "") for a in muestra], batch_size)
+    anio_actual = datetime.now().year
+
+    for author in muestra:
+        first_year = primeros.get(id_corto(author.get("openalex_id", "")))
+        author["primer_anio"] = first_year
+        if first_year:
+            anios = max(anio_actual - first_year, 1)
+            author["anios_academia"] = anios
+            author["m_quotient"] = round((author.get("h_index") or 0) / anios, 2)
 
     return authors
 
@@ -442,6 +679,20 @@ def main():
     """
     Ejecuta la extracción completa.
     """
+    parser = argparse.ArgumentParser(description="Extrae investigadores chilenos desde OpenAlex")
+    parser.add_argument("--completo", action="store_true",
+                        help="Cobertura completa por topics (cursores en paralelo por grupo de topics, sin tope de 2000)")
+    parser.add_argument("--enriquecer", action="store_true",
+                        help="Agregar primer año de publicación, años en academia y cociente m")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Escribir los autores por topics a disco página a página, con checkpoints del cursor")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reanudar una búsqueda por topics --streaming interrumpida desde su último checkpoint")
+    agregar_argumentos_cliente(parser)
+    args = parser.parse_args()
+
+    client = configurar_cliente(cache=not args.sin_cache, offline=args.offline)
+
     print("="*60)
     print("EXTRACTOR DE INVESTIGADORES CHILENOS - OPENALEX")
     print("="*60)
@@ -458,11 +709,40 @@ def main():
     print("MÉTODO 1: Búsqueda por topics de ciencias sociales")
     print("="*50)
 
-    authors_by_topics = get_authors_by_topics(
-        topics=SOCIAL_SCIENCE_TOPICS,
-        country_code="CL",
-        max_results=2000
-    )
+    sumidero = estado = None
+    if args.streaming or args.resume:
+        # El checkpoint recuerda el modo de la ejecución original
+        estado = EstadoCosecha("openalex_scraper")
+        ejecucion = estado.leer("ejecucion") if args.resume else None
+        if args.resume and ejecucion is None:
+            print("No hay una búsqueda interrumpida para reanudar; se inicia una nueva.")
+        if ejecucion is None:
+            estado.limpiar()
+            ejecucion = {"completo": args.completo}
+            estado.escribir("ejecucion", ejecucion)
+        else:
+            print("Reanudando búsqueda por topics interrumpida")
+        args.completo = ejecucion["completo"]
+        sumidero = SumideroJSONL(output_dir / "investigadores_openalex_topics.jsonl",
+                                 reanudar=args.resume)
+
+    if args.completo:
+        authors_by_topics = get_authors_by_topics_completo(
+            topics=SOCIAL_SCIENCE_TOPICS,
+            country_code="CL",
+            sumidero=sumidero,
+            estado=estado,
+        )
+    else:
+        authors_by_topics = get_authors_by_topics(
+            topics=SOCIAL_SCIENCE_TOPICS,
+            country_code="CL",
+            max_results=2000,
+            sumidero=sumidero,
+            estado=estado,
+        )
+    if sumidero is not None:
+        authors_by_topics = list(sumidero.filas())
     print(f"Encontrados por topics: {len(authors_by_topics)}")
 
     # Método 2: Búsqueda por instituciones chilenas (complementario)
@@ -471,7 +751,7 @@ def main():
     print("="*50)
 
     authors_by_inst = get_authors_by_institution_search(
-        search_terms=[],  # Usa lista interna
+        search_terms=[],  # Usa config.yaml (openalex: instituciones)
         max_per_term=300
     )
 
@@ -505,15 +785,22 @@ def main():
     final_authors = filter_social_sciences(combined_authors, strict=True)
     print(f"Total después de filtrar: {len(final_authors)}")
 
-    # Opcional: Enriquecer con año de primera publicación (lento)
-    # final_authors = enrich_with_first_publication_year(final_authors, sample_size=50)
+    # Opcional: Enriquecer con año de primera publicación y cociente m
+    if args.enriquecer:
+        final_authors = enrich_with_first_publication_year(final_authors)
 
     # Guardar resultados
     df = save_results(final_authors, output_dir)
 
+    # Resultado guardado: la búsqueda por topics ya no necesita reanudarse
+    if sumidero is not None:
+        sumidero.cerrar()
+        estado.limpiar()
+
     print("\n" + "="*60)
     print("EXTRACCIÓN COMPLETADA")
     print("="*60)
+    print(client.reporte())
 
     return df
 
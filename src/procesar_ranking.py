@@ -5,20 +5,34 @@ Procesa y limpia los datos de OpenAlex para generar el ranking final.
 2. Filtra por h-index mínimo
 3. Busca scholar_id de Google Scholar
 4. Genera archivo para la página web
+
+Uso:
+    python src/procesar_ranking.py             # Chile (data/raw, data/output)
+    python src/procesar_ranking.py --pais AR   # data/raw/paises/AR -> data/output/paises/AR
 """
 
+import argparse
 import pandas as pd
-import requests
 from pathlib import Path
 from datetime import datetime
 import json
 import re
-from time import sleep
 
 # Configuración
 H_INDEX_MINIMO = 1  # Solo investigadores con h-index >= 1
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "output"
 
+# Residencia estimada con el historial de afiliaciones (ver calcular_residencia)
+UMBRAL_RESIDENCIA = 0.3  # Bajo este puntaje el autor se considera no residente
+ANIOS_RESIDENCIA_PLENA = 5  # Años en el país con los que la permanencia vale 1
+VIDA_MEDIA_RESIDENCIA = 2  # Años tras los que la vigencia de la última afiliación en el país cae a la mitad
+PESOS_RESIDENCIA = {"fraccion": 0.4, "permanencia": 0.3, "vigencia": 0.3}
+
+# Overrides manuales del puntaje de residencia (solo Chile). EXCLUIR_NOMBRES
+# y EXCLUIR_AFILIACIONES se aplican siempre; INCLUIR_NOMBRES conserva a
+# residentes reales con puntaje bajo (historial de afiliaciones incompleto).
+INCLUIR_NOMBRES = []
+
 # Investigadores a excluir (errores de OpenAlex o no son chilenos)
 EXCLUIR_NOMBRES = [
     "Arend Lijphart",  # Politólogo holandés/estadounidense, no chileno
@@ -293,30 +307,90 @@ def cargar_datos(filepath: Path) -> pd.DataFrame:
     return df
 
 
-def limpiar_datos(df: pd.DataFrame) -> pd.DataFrame:
+def calcular_residencia(df: pd.DataFrame) -> pd.Series:
+    """
+    Puntaje de residencia en el país (0 a 1) de todos los autores a la vez.
+
+    Combina, con PESOS_RESIDENCIA, tres señales del historial de afiliaciones
+    (columnas de extraer_openalex.procesar_autor):
+    - fraccion: años con afiliación en el país / años con alguna afiliación
+    - permanencia: años en el país / ANIOS_RESIDENCIA_PLENA (tope 1)
+    - vigencia: 1 si el último año con afiliación es en el país; decae a la
+      mitad cada VIDA_MEDIA_RESIDENCIA años de diferencia. Se multiplica por
+      la permanencia, para que una afiliación reciente en el país no alcance
+      por sí sola UMBRAL_RESIDENCIA
+
+    NaN si el autor no tiene historial (CSV antiguos o sin affiliations).
     """
-    Limpia los datos eliminando errores y no chilenos.
+    anios = df["anios_afiliacion"].where(df["anios_afiliacion"] > 0)
+    en_pais = df["anios_pais"]
+
+    fraccion = en_pais / anios
+    permanencia = (en_pais / ANIOS_RESIDENCIA_PLENA).clip(upper=1)
+    distancia = (df["ultimo_anio_afiliacion"] - df["ultimo_anio_pais"]).clip(lower=0)
+    vigencia = (0.5 ** (distancia / VIDA_MEDIA_RESIDENCIA)).where(en_pais > 0, 0) * permanencia
+
+    puntaje = (PESOS_RESIDENCIA["fraccion"] * fraccion
+               + PESOS_RESIDENCIA["permanencia"] * permanencia
+               + PESOS_RESIDENCIA["vigencia"] * vigencia)
+    return puntaje.round(3)
+
+
+def limpiar_datos(df: pd.DataFrame, pais: str = "CL", filtrar_residencia: bool = False) -> pd.DataFrame:
+    """
+    Limpia los datos eliminando errores y autores de otros países.
+
+    Con las columnas del historial de afiliaciones se agrega `residencia`
+    (calcular_residencia) y, con filtrar_residencia=True, se eliminan los
+    autores bajo UMBRAL_RESIDENCIA salvo los de INCLUIR_NOMBRES. Las listas
+    manuales (EXCLUIR_*, INCLUIR_NOMBRES) solo se aplican a Chile.
     """
     n_inicial = len(df)
 
+    # Las listas manuales son de Chile; en otros países solo rige el puntaje
+    if pais == "CL":
+        excluir_nombres, excluir_afiliaciones, incluir_nombres = EXCLUIR_NOMBRES, EXCLUIR_AFILIACIONES, INCLUIR_NOMBRES
+    else:
+        excluir_nombres = excluir_afiliaciones = incluir_nombres = []
+
+    # 0. Puntaje de residencia (antes de las listas manuales, para medir cuáles ya cubre)
+    con_historial = "anios_pais" in df.columns
+    if con_historial:
+        df = df.assign(residencia=calcular_residencia(df))
+        no_residente = (df["residencia"] < UMBRAL_RESIDENCIA) & ~df["nombre"].isin(incluir_nombres)
+        resumen = (f"  Residencia < {UMBRAL_RESIDENCIA}: {int(no_residente.sum())} autores "
+                   f"(sin historial: {int(df['residencia'].isna().sum())})")
+        if excluir_nombres:
+            cubiertos = df.loc[no_residente & df["nombre"].isin(excluir_nombres), "nombre"].nunique()
+            presentes = df.loc[df["nombre"].isin(excluir_nombres), "nombre"].nunique()
+            resumen += f"; cubre {cubiertos} de {presentes} exclusiones manuales presentes"
+        print(resumen)
+    else:
+        print("  Sin historial de afiliaciones en el CSV: no se calcula residencia")
+
     # 1. Eliminar por nombre
-    df = df[~df["nombre"].isin(EXCLUIR_NOMBRES)]
+    df = df[~df["nombre"].isin(excluir_nombres)]
     print(f"  Después de excluir nombres: {len(df)}")
 
     # 2. Eliminar por afiliación
-    df = df[~df["institucion"].isin(EXCLUIR_AFILIACIONES)]
+    df = df[~df["institucion"].isin(excluir_afiliaciones)]
     print(f"  Después de excluir afiliaciones: {len(df)}")
 
     # 3. Eliminar campos no sociales (doble check)
     df = df[~df["campo_principal"].isin(CAMPOS_EXCLUIR)]
     print(f"  Después de excluir campos: {len(df)}")
 
-    # 4. Solo país Chile (compatible con ambos formatos)
+    # 4. Solo el país del ranking (compatible con ambos formatos)
     if "pais_institucion" in df.columns:
-        df = df[df["pais_institucion"] == "CL"]
+        df = df[df["pais_institucion"] == pais]
     elif "pais" in df.columns:
-        df = df[df["pais"] == "CL"]
-    print(f"  Después de filtrar país CL: {len(df)}")
+        df = df[df["pais"] == pais]
+    print(f"  Después de filtrar país {pais}: {len(df)}")
+
+    # 5. Probables no residentes según el historial de afiliaciones
+    if con_historial and filtrar_residencia:
+        df = df[~((df["residencia"] < UMBRAL_RESIDENCIA) & ~df["nombre"].isin(incluir_nombres))]
+        print(f"  Después de filtrar residencia: {len(df)}")
 
     print(f"Eliminados {n_inicial - len(df)} registros en limpieza")
     return df
@@ -520,7 +594,7 @@ def guardar_csv_final(df: pd.DataFrame, output_path: Path):
     columnas = [
         "ranking", "nombre", "institucion", "disciplina",
         "h_index", "citas", "trabajos",
-        "scholar_id", "openalex_id", "orcid", "topics"
+        "scholar_id", "openalex_id", "orcid", "topics", "residencia"
     ]
 
     # Solo columnas que existen
@@ -532,16 +606,31 @@ def guardar_csv_final(df: pd.DataFrame, output_path: Path):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Procesa el ranking a partir del CSV de OpenAlex")
+    parser.add_argument("--pais", default=None,
+                        help="Codigo ISO de un pais descargado con extraer_openalex.py --paises "
+                             "(lee data/raw/paises/XX y escribe en data/output/paises/XX)")
+    parser.add_argument("--filtrar-residencia", action="store_true",
+                        help="Eliminar a los probables no residentes (por defecto solo se agrega la columna residencia)")
+    args = parser.parse_args()
+
+    pais = args.pais.upper() if args.pais else "CL"
+
     print("="*60)
-    print("PROCESAMIENTO DE RANKING - CIENCIAS SOCIALES CHILE")
+    print(f"PROCESAMIENTO DE RANKING - CIENCIAS SOCIALES {pais if args.pais else 'CHILE'}")
     print("="*60)
     print(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
 
     # Buscar archivo más reciente de OpenAlex (en output/ o raw/)
-    archivos = list(OUTPUT_DIR.glob("investigadores_openalex_*.csv"))
     raw_dir = OUTPUT_DIR.parent / "raw"
-    if raw_dir.exists():
-        archivos.extend(list(raw_dir.glob("investigadores_openalex_*.csv")))
+    if args.pais:
+        output_dir = OUTPUT_DIR / "paises" / pais
+        archivos = list((raw_dir / "paises" / pais).glob("investigadores_openalex_*.csv"))
+    else:
+        output_dir = OUTPUT_DIR
+        archivos = list(OUTPUT_DIR.glob("investigadores_openalex_*.csv"))
+        if raw_dir.exists():
+            archivos.extend(list(raw_dir.glob("investigadores_openalex_*.csv")))
     if not archivos:
         print("ERROR: No se encontró archivo de OpenAlex")
         return
@@ -556,7 +645,7 @@ def main():
     print("\n" + "="*50)
     print("LIMPIEZA DE DATOS")
     print("="*50)
-    df = limpiar_datos(df)
+    df = limpiar_datos(df, pais, filtrar_residencia=args.filtrar_residencia)
 
     # Filtrar por h-index
     print("\n" + "="*50)
@@ -587,12 +676,14 @@ def main():
 
     fecha = datetime.now().strftime("%Y%m%d")
 
+    output_dir.mkdir(parents=True, exist_ok=True)
+
     # CSV final
-    csv_path = OUTPUT_DIR / f"ranking_final_{fecha}.csv"
+    csv_path = output_dir / f"ranking_final_{fecha}.csv"
     guardar_csv_final(df, csv_path)
 
     # JSON para web
-    json_path = OUTPUT_DIR / f"ranking_web_{fecha}.json"
+    json_path = output_dir / f"ranking_web_{fecha}.json"
     investigadores = generar_json_web(df, json_path)
 
     # Resumen
@@ -0,0 +1,225 @@
+"""
+Series anuales de publicaciones y citas (counts_by_year) de los autores del ranking.
+
+OpenAlex entrega en cada autor los works y citas de los últimos años
+(counts_by_year, hasta 10 años), que el CSV del ranking descarta. Este
+script los descarga para los autores del ranking en lotes de IDs y los
+guarda como dos matrices densas autor x año de enteros:
+
+    data/output/series_autores_YYYYMMDD.npz
+        ids     int64 [autores]          ID numérico de OpenAlex (ordenado)
+        anios   int16 [años]             Años de las columnas
+        obras   int32 [autores, años]    Works publicados en cada año
+        citas   int32 [autores, años]    Citas recibidas en cada año
+
+Las métricas por ventana (citas y works de los últimos 5 años, crecimiento,
+h-index reciente aproximado) se calculan sobre las matrices completas con
+operaciones de numpy, sin recorrer autores en Python.
+
+Uso:
+    python src/series_autores.py                    # ranking_final más reciente
+    python src/series_autores.py --ranking data/output/ranking_final_20260114.csv
+    python src/series_autores.py --desde-npz data/output/series_autores_20260114.npz
+
+Genera además:
+    data/output/metricas_series_YYYYMMDD.csv
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from extraer_openalex import LOTE_IDS, RANKING_DIR, ranking_mas_reciente
+from modelos_openalex import PaginaAutores
+from openalex_client import get_client, ejecutar, configurar_cliente, agregar_argumentos_cliente
+from sumidero_autores import id_numerico
+
+# Configuración
+OUTPUT_DIR = Path(__file__).parent.parent / "data" / "output"
+VENTANA = 5  # Años de las métricas recientes
+
+# Constante de Hirsch (citas ~ a * h^2, con a entre 3 y 5) para el h-index reciente aproximado
+A_HIRSCH = 4.0
+
+
+async def series_lote(ids: list) -> list:
+    """counts_by_year de un lote de hasta LOTE_IDS autores (filtro OR de ids.openalex)."""
+    params = {
+        "filter": f"ids.openalex:{'|'.join(ids)}",
+        "select": "id,counts_by_year",
+        "per_page": LOTE_IDS,
+    }
+    data = await get_client().aget_modelo("authors", params, PaginaAutores)
+    return data.results
+
+
+class SeriesAutores:
+    """Matrices autor x año de works y citas, con un índice de IDs ordenado."""
+
+    def __init__(self, ids: np.ndarray, anios: np.ndarray, obras: np.ndarray, citas: np.ndarray):
+        self.ids = ids
+        self.anios = anios
+        self.obras = obras
+        self.citas = citas
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def desde_autores(cls, autores: list) -> "SeriesAutores":
+        """Arma las matrices a partir de modelos Autor con counts_by_year."""
+        ids = np.array(sorted({id_numerico(a.id) for a in autores if a.id}), dtype=np.int64)
+
+        # Una entrada por (autor, año): se vuelcan a las matrices en una sola asignación
+        autor_col, anio_col, obras_col, citas_col = [], [], [], []
+        for a in autores:
+            if not a.id:
+                continue
+            autor = id_numerico(a.id)
+            for c in a.counts_by_year:
+                if c.year:
+                    autor_col.append(autor)
+                    anio_col.append(c.year)
+                    obras_col.append(c.works_count or 0)
+                    citas_col.append(c.cited_by_count or 0)
+
+        anio_col = np.array(anio_col, dtype=np.int16)
+        if len(anio_col):
+            anios = np.arange(anio_col.min(), anio_col.max() + 1, dtype=np.int16)
+        else:
+            anios = np.zeros(0, dtype=np.int16)
+
+        filas = np.searchsorted(ids, np.array(autor_col, dtype=np.int64))
+        columnas = anio_col - (anios[0] if len(anios) else 0)
+        obras = np.zeros((len(ids), len(anios)), dtype=np.int32)
+        citas = np.zeros((len(ids), len(anios)), dtype=np.int32)
+        obras[filas, columnas] = obras_col
+        citas[filas, columnas] = citas_col
+        return cls(ids, anios, obras, citas)
+
+    def guardar(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, ids=self.ids, anios=self.anios, obras=self.obras, citas=self.citas)
+
+    @classmethod
+    def cargar(cls, path: Path) -> "SeriesAutores":
+        with np.load(path) as datos:
+            return cls(datos["ids"], datos["anios"], datos["obras"], datos["citas"])
+
+    def filas(self, openalex_ids) -> np.ndarray:
+        """Posición de cada openalex_id en las matrices (-1 si no está)."""
+        buscados = np.array([id_numerico(i) for i in openalex_ids], dtype=np.int64)
+        if not len(self.ids):
+            return np.full(len(buscados), -1)
+        pos = np.minimum(np.searchsorted(self.ids, buscados), len(self.ids) - 1)
+        return np.where(self.ids[pos] == buscados, pos, -1)
+
+    def ventana(self, matriz: np.ndarray, anios: int = VENTANA, hasta: int = None) -> np.ndarray:
+        """Suma por autor de los `anios` años que terminan en `hasta` (inclusive)."""
+        hasta = hasta if hasta is not None else int(self.anios.max(initial=0))
+        columnas = (self.anios > hasta - anios) & (self.anios <= hasta)
+        return matriz[:, columnas].sum(axis=1, dtype=np.int64)
+
+    def metricas(self, anios: int = VENTANA, hasta: int = None) -> pd.DataFrame:
+        """
+        Métricas por ventana para todos los autores.
+
+        - citas_ventana / obras_ventana: totales de los últimos `anios` años
+        - crecimiento_citas: tasa anual compuesta entre la ventana anterior y
+          la reciente (NaN si la anterior no tiene citas)
+        - h_reciente: sqrt(citas de la ventana / A_HIRSCH), una aproximación
+          del h-index que alcanzaría el autor solo con esas citas
+        """
+        hasta = hasta if hasta is not None else int(self.anios.max(initial=0))
+        recientes = self.ventana(self.citas, anios, hasta)
+        previas = self.ventana(self.citas, anios, hasta - anios)
+
+        crecimiento = np.full(len(self.ids), np.nan)
+        con_previas = previas > 0
+        crecimiento[con_previas] = (recientes[con_previas] / previas[con_previas]) ** (1 / anios) - 1
+
+        return pd.DataFrame({
+            "openalex_id": [f"https://openalex.org/A{i}" for i in self.ids],
+            "citas_ventana": recientes,
+            "obras_ventana": self.ventana(self.obras, anios, hasta),
+            "crecimiento_citas": np.round(crecimiento, 3),
+            "h_reciente": np.floor(np.sqrt(recientes / A_HIRSCH)).astype(np.int32),
+            "anio_pico_citas": np.where(self.citas.any(axis=1), self.anios[self.citas.argmax(axis=1)], 0),
+        })
+
+
+def descargar_series(ids: list) -> SeriesAutores:
+    """Descarga counts_by_year de los autores, en lotes de LOTE_IDS en paralelo."""
+    lotes = [ids[i:i + LOTE_IDS] for i in range(0, len(ids), LOTE_IDS)]
+    print(f"Descargando series de {len(ids)} autores en {len(lotes)} requests...")
+
+    async def todos():
+        return await asyncio.gather(*(series_lote(lote) for lote in lotes))
+
+    autores = [a for results in ejecutar(todos()) for a in results]
+    return SeriesAutores.desde_autores(autores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Series anuales de works y citas de los autores del ranking")
+    parser.add_argument("--ranking", type=Path, default=None,
+                        help="ranking_final_*.csv de origen (por defecto el mas reciente)")
+    parser.add_argument("--desde-npz", type=Path, default=None,
+                        help="Recalcular las metricas desde un .npz ya descargado")
+    parser.add_argument("--ventana", type=int, default=VENTANA, help="Anios de las metricas recientes")
+    parser.add_argument("--hasta", type=int, default=None,
+                        help="Ultimo anio de la ventana (por defecto el ultimo con datos)")
+    agregar_argumentos_cliente(parser)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("SERIES ANUALES DE AUTORES - CIENCIAS SOCIALES CHILE")
+    print("=" * 60)
+
+    fecha = datetime.now().strftime("%Y%m%d")
+
+    if args.desde_npz:
+        series = SeriesAutores.cargar(args.desde_npz)
+        print(f"Series de {args.desde_npz.name}")
+    else:
+        client = configurar_cliente(cache=not args.sin_cache, offline=args.offline)
+        ranking = args.ranking or ranking_mas_reciente()
+        if ranking is None:
+            print(f"No hay ranking_final_*.csv en {RANKING_DIR}")
+            return None
+        ids = pd.read_csv(ranking, usecols=["openalex_id"], dtype=str)["openalex_id"].dropna()
+        ids = list(dict.fromkeys(i.replace("https://openalex.org/", "") for i in ids))
+        series = descargar_series(ids)
+        print(client.reporte())
+
+        npz_path = OUTPUT_DIR / f"series_autores_{fecha}.npz"
+        series.guardar(npz_path)
+        print(f"Archivo: {npz_path}")
+
+    if not len(series) or not len(series.anios):
+        print("Sin series para calcular metricas")
+        return None
+
+    print(f"{len(series)} autores x {len(series.anios)} anios ({series.anios[0]}-{series.anios[-1]}), "
+          f"{(series.obras.nbytes + series.citas.nbytes) / 1024 ** 2:.1f} MB en memoria")
+
+    df = series.metricas(args.ventana, args.hasta)
+    metricas_path = OUTPUT_DIR / f"metricas_series_{fecha}.csv"
+    df.to_csv(metricas_path, index=False, encoding="utf-8-sig")
+    print(f"Archivo: {metricas_path}")
+
+    print(f"\nTop 10 por citas de los ultimos {args.ventana} anios:")
+    for _, r in df.nlargest(10, "citas_ventana").iterrows():
+        print(f"  {r['openalex_id'].rsplit('/', 1)[-1]:14} citas={r['citas_ventana']:7,} "
+              f"works={r['obras_ventana']:4} h~{r['h_reciente']:3} crec={r['crecimiento_citas']:+.1%}")
+
+    return df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Escritura incremental (streaming) de autores descargados a un archivo JSONL.
+
+Cada página de autores procesados se agrega al archivo apenas llega, y los
+duplicados se descartan con un conjunto de IDs guardado en disco (SQLite),
+de modo que la memoria no crece con el tamaño de la población y una caída
+no pierde lo ya descargado. Al terminar, finalizar() genera el CSV ordenado
+mediante un ordenamiento externo por bloques.
+"""
+
+import csv
+import heapq
+import json
+import os
+import sqlite3
+import tempfile
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+
+# Filas por bloque del ordenamiento externo
+TAMANO_BLOQUE = 50000
+
+
+def id_numerico(openalex_id: str) -> int:
+    """Convierte 'https://openalex.org/A5012345678' (o 'A5012345678') en 5012345678."""
+    return int(str(openalex_id).rstrip("/").rsplit("/", 1)[-1][1:])
+
+
+def orden_ranking(fila: dict):
+    """Orden del CSV final: h-index descendente, luego openalex_id."""
+    return (-(fila.get("h_index") or 0), fila.get("openalex_id", ""))
+
+
+class SumideroJSONL:
+    """Archivo JSONL de filas con deduplicación por openalex_id en disco."""
+
+    def __init__(self, path: Path, reanudar: bool = False):
+        """
+        Abre el sumidero.
+
+        Args:
+            path: Archivo .jsonl de salida
+            reanudar: Conservar el contenido previo (y sus IDs) en vez de empezar de cero
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ids_path = self.path.with_suffix(".ids.sqlite")
+
+        if not reanudar:
+            for p in (self.path, self.ids_path):
+                if p.exists():
+                    p.unlink()
+
+        self._ids = sqlite3.connect(str(self.ids_path))
+        self._ids.execute("CREATE TABLE IF NOT EXISTS ids (id INTEGER PRIMARY KEY)")
+        self._ids.commit()
+        self.escritas = self._ids.execute("SELECT COUNT(*) FROM ids").fetchone()[0]
+
+        self._archivo = open(self.path, "a", encoding="utf-8")
+
+    def __len__(self):
+        return self.escritas
+
+    def agregar(self, filas: list) -> int:
+        """Agrega las filas no vistas antes. Devuelve cuántas se escribieron."""
+        nuevas = []
+        for fila in filas:
+            cur = self._ids.execute(
+                "INSERT OR IGNORE INTO ids VALUES (?)", (id_numerico(fila["openalex_id"]),)
+            )
+            if cur.rowcount:
+                nuevas.append(fila)
+
+        # Primero el archivo, después los IDs: si se cae entre medio, al
+        # reanudar la página se vuelve a escribir en vez de perderse (las
+        # filas repetidas se descartan en finalizar)
+        for fila in nuevas:
+            self._archivo.write(json.dumps(fila, ensure_ascii=False) + "\n")
+        self._archivo.flush()
+        self._ids.commit()
+
+        self.escritas += len(nuevas)
+        return len(nuevas)
+
+    def filas(self):
+        """Recorre las filas escritas (sin cargarlas todas en memoria)."""
+        self._archivo.flush()
+        with open(self.path, encoding="utf-8") as f:
+            for linea in f:
+                if linea.strip():
+                    yield json.loads(linea)
+
+    def cerrar(self):
+        if not self._archivo.closed:
+            self._archivo.close()
+        self._ids.close()
+
+    def finalizar(self, csv_path: Path, clave=orden_ranking, contar: tuple = (),
+                  n_primeras: int = 10) -> dict:
+        """
+        Genera el CSV final ordenado por `clave` con memoria acotada.
+
+        Ordena bloques de TAMANO_BLOQUE filas en archivos temporales y los
+        mezcla con heapq.merge. De cada openalex_id repetido (una página
+        reescrita tras una caída entre el archivo y el commit de IDs) se
+        conserva solo la última fila escrita; la línea de cada ID se guarda
+        en una tabla temporal de SQLite, no en memoria. Devuelve un resumen
+        con el total de filas, las primeras n_primeras filas y conteos por
+        las columnas `contar`.
+        """
+        # Columnas en orden de aparición (como lo haría pandas) y última línea de cada ID
+        columnas = {}
+        self._ids.execute("CREATE TEMP TABLE IF NOT EXISTS ultima (id INTEGER PRIMARY KEY, linea INTEGER)")
+        self._ids.execute("DELETE FROM ultima")
+        total = 0
+        for linea, fila in enumerate(self.filas()):
+            for c in fila:
+                columnas.setdefault(c, None)
+            self._ids.execute("INSERT OR REPLACE INTO ultima VALUES (?, ?)",
+                              (id_numerico(fila["openalex_id"]), linea))
+            total += 1
+
+        def vigentes():
+            for linea, fila in enumerate(self.filas()):
+                ultima = self._ids.execute("SELECT linea FROM ultima WHERE id = ?",
+                                           (id_numerico(fila["openalex_id"]),)).fetchone()
+                if ultima[0] == linea:
+                    yield fila
+
+        with tempfile.TemporaryDirectory(dir=self.path.parent) as tmp:
+            bloques = []
+            filas = vigentes()
+            while True:
+                bloque = sorted(islice(filas, TAMANO_BLOQUE), key=clave)
+                if not bloque:
+                    break
+                path = Path(tmp) / f"bloque_{len(bloques)}.jsonl"
+                with open(path, "w", encoding="utf-8") as f:
+                    for fila in bloque:
+                        f.write(json.dumps(fila, ensure_ascii=False) + "\n")
+                bloques.append(path)
+
+            archivos = [open(p, encoding="utf-8") for p in bloques]
+            try:
+                mezcla = heapq.merge(*((json.loads(l) for l in a) for a in archivos), key=clave)
+
+                resumen = {"filas": 0, "primeras": [], "conteos": {c: Counter() for c in contar}}
+                with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
+                    writer = csv.DictWriter(f, fieldnames=list(columnas), lineterminator=os.linesep)
+                    writer.writeheader()
+                    for fila in mezcla:
+                        writer.writerow(fila)
+                        resumen["filas"] += 1
+                        if len(resumen["primeras"]) < n_primeras:
+                            resumen["primeras"].append(fila)
+                        for c in contar:
+                            resumen["conteos"][c][fila.get(c)] += 1
+            finally:
+                for a in archivos:
+                    a.close()
+
+        resumen["repetidas"] = total - resumen["filas"]
+        return resumen
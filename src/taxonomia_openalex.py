@@ -0,0 +1,242 @@
+"""
+Taxonomía de OpenAlex (dominios, campos, subcampos y topics) en caché local.
+
+Se descarga una vez desde la API y se guarda en
+data/cache/taxonomia_openalex.json. Cada entidad se identifica por su código
+entero de OpenAlex (domains/2 -> 2, fields/33 -> 33, T10108 -> 10108) y las
+relaciones topic -> subcampo -> campo -> dominio quedan en arreglos numpy
+indexados por código, de modo que clasificar es indexar un arreglo en vez de
+comparar nombres.
+
+Uso:
+    python src/taxonomia_openalex.py              # Descarga (si falta) y resume
+    python src/taxonomia_openalex.py --refrescar  # Vuelve a descargar
+    python src/taxonomia_openalex.py --validar    # Valida SOCIAL_SCIENCE_TOPICS
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import requests
+
+from openalex_cache import SinCacheError
+from openalex_client import get_client
+
+# Configuración
+TAXONOMIA_PATH = Path(__file__).parent.parent / "data" / "cache" / "taxonomia_openalex.json"
+
+# Campos que se piden de cada nivel (select= de la API)
+SELECT_POR_NIVEL = {
+    "domains": "id,display_name",
+    "fields": "id,display_name,domain",
+    "subfields": "id,display_name,field,domain",
+    "topics": "id,display_name,subfield,field,domain",
+}
+
+
+def codigo_openalex(openalex_id) -> int:
+    """'https://openalex.org/T10108' o 'https://openalex.org/fields/33' -> entero; 0 si no hay."""
+    m = re.search(r"(\d+)/?$", str(openalex_id or ""))
+    return int(m.group(1)) if m else 0
+
+
+def descargar_taxonomia() -> dict:
+    """Descarga los cuatro niveles de la taxonomía desde la API."""
+    client = get_client()
+    datos = {"fecha": datetime.now().strftime("%Y-%m-%d")}
+
+    for nivel, select in SELECT_POR_NIVEL.items():
+        entidades = {}
+        for data in client.paginar(nivel, {"select": select}):
+            for e in data["results"]:
+                fila = [e.get("display_name", "")]
+                for padre in ("subfield", "field", "domain"):
+                    if padre in select:
+                        fila.append(codigo_openalex((e.get(padre) or {}).get("id")))
+                entidades[codigo_openalex(e["id"])] = fila
+        print(f"  {nivel}: {len(entidades)}")
+        datos[nivel] = entidades
+
+    return datos
+
+
+def guardar_taxonomia(datos: dict, path: Path = TAXONOMIA_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class Taxonomia:
+    """Taxonomía con relaciones en arreglos numpy indexados por código entero."""
+
+    def __init__(self, datos: dict):
+        self.fecha = datos.get("fecha", "")
+        self.nombres = {
+            nivel: {int(c): fila[0] for c, fila in datos.get(nivel, {}).items()}
+            for nivel in SELECT_POR_NIVEL
+        }
+
+        def arreglo(nivel, columna):
+            entidades = datos.get(nivel, {})
+            tamano = max((int(c) for c in entidades), default=0) + 1
+            valores = np.zeros(tamano, dtype=np.int32)  # 0 = desconocido
+            for c, fila in entidades.items():
+                valores[int(c)] = fila[columna]
+            return valores
+
+        # topics: [nombre, subcampo, campo, dominio]
+        self.topic_subfield = arreglo("topics", 1)
+        self.topic_field = arreglo("topics", 2)
+        self.topic_domain = arreglo("topics", 3)
+        # fields: [nombre, dominio]
+        self.field_domain = arreglo("fields", 1)
+
+        # Tamaño de las máscaras: cubre también códigos referenciados pero no listados
+        self._tamano = {
+            "fields": max(len(self.field_domain), int(self.topic_field.max(initial=0)) + 1),
+            "domains": max(max(self.nombres["domains"], default=0),
+                           int(self.topic_domain.max(initial=0)),
+                           int(self.field_domain.max(initial=0))) + 1,
+        }
+
+        self.codigo_campo = {n: c for c, n in self.nombres["fields"].items()}
+        self.codigo_dominio = {n: c for c, n in self.nombres["domains"].items()}
+
+    def __len__(self):
+        return len(self.nombres["topics"])
+
+    def conoce_topic(self, codigo: int) -> bool:
+        return 0 < codigo < len(self.topic_field) and self.topic_field[codigo] != 0
+
+    def mascara(self, nivel: str, nombres) -> np.ndarray:
+        """Arreglo booleano por código de `nivel` ("fields" o "domains"): True si su nombre está en `nombres`."""
+        nombres = set(nombres)
+        mascara = np.zeros(self._tamano[nivel], dtype=bool)
+        for codigo, nombre in self.nombres[nivel].items():
+            mascara[codigo] = nombre in nombres
+        return mascara
+
+    def mascara_topics(self, dominios=(), campos=()) -> np.ndarray:
+        """Arreglo booleano por código de topic: dominio en `dominios` o campo en `campos`."""
+        por_dominio = self.mascara("domains", dominios)
+        por_campo = self.mascara("fields", campos)
+        return por_dominio[self.topic_domain] | por_campo[self.topic_field]
+
+    def validar_topics(self, ids: list, dominio: str = None) -> dict:
+        """
+        Revisa una lista de IDs de topics contra la taxonomía.
+
+        Returns:
+            {"validos": IDs conocidos sin duplicados (en orden),
+             "desconocidos": IDs que no existen en OpenAlex,
+             "duplicados": IDs repetidos en la lista,
+             "fuera_de_dominio": IDs válidos cuyo dominio no es `dominio`}
+        """
+        repeticiones = Counter(ids)
+        validos, desconocidos, fuera = [], [], []
+        for topic_id in dict.fromkeys(ids):
+            codigo = codigo_openalex(topic_id)
+            if not self.conoce_topic(codigo):
+                desconocidos.append(topic_id)
+                continue
+            validos.append(topic_id)
+            if dominio and self.nombres["domains"].get(int(self.topic_domain[codigo])) != dominio:
+                fuera.append(topic_id)
+        return {
+            "validos": validos,
+            "desconocidos": desconocidos,
+            "duplicados": [t for t, n in repeticiones.items() if n > 1],
+            "fuera_de_dominio": fuera,
+        }
+
+    def describir_topic(self, topic_id) -> str:
+        codigo = codigo_openalex(topic_id)
+        if not self.conoce_topic(codigo):
+            return "(desconocido)"
+        return (f"{self.nombres['topics'][codigo]} "
+                f"[{self.nombres['fields'].get(int(self.topic_field[codigo]), '')} / "
+                f"{self.nombres['domains'].get(int(self.topic_domain[codigo]), '')}]")
+
+
+def cargar_taxonomia(refrescar: bool = False, path: Path = TAXONOMIA_PATH) -> Taxonomia:
+    """Lee la taxonomía del disco; la descarga si no existe o con refrescar=True."""
+    path = Path(path)
+    if refrescar or not path.exists():
+        print("Descargando taxonomia de OpenAlex...")
+        guardar_taxonomia(descargar_taxonomia(), path)
+    with open(path, encoding="utf-8") as f:
+        return Taxonomia(json.load(f))
+
+
+_taxonomia = None
+
+
+def get_taxonomia() -> Taxonomia:
+    """
+    Devuelve la taxonomía compartida del proceso, o None si no se pudo obtener
+    (sin red y sin copia local); en ese caso los clasificadores usan los nombres.
+    """
+    global _taxonomia
+    if _taxonomia is None:
+        try:
+            _taxonomia = cargar_taxonomia()
+        except (requests.RequestException, SinCacheError, OSError, ValueError) as e:
+            print(f"  Aviso: taxonomia de OpenAlex no disponible ({e}); se clasifica por nombre")
+            _taxonomia = False
+    return _taxonomia or None
+
+
+def reportar_topics(topics: list, dominio: str = "Social Sciences") -> list:
+    """
+    Valida una lista de topics antes de una cosecha e informa los problemas.
+
+    Devuelve los IDs válidos sin duplicados; si la taxonomía no está
+    disponible, devuelve la lista sin duplicados tal cual.
+    """
+    taxonomia = get_taxonomia()
+    if taxonomia is None:
+        return list(dict.fromkeys(topics))
+
+    resultado = taxonomia.validar_topics(topics, dominio)
+    for topic_id in resultado["desconocidos"]:
+        print(f"  Aviso: topic desconocido en OpenAlex, se omite: {topic_id}")
+    for topic_id in resultado["duplicados"]:
+        print(f"  Aviso: topic repetido en la lista: {topic_id}")
+    for topic_id in resultado["fuera_de_dominio"]:
+        print(f"  Aviso: topic fuera de {dominio}: {topic_id} {taxonomia.describir_topic(topic_id)}")
+    return resultado["validos"]
+
+
+def main():
+    from openalex_scraper import SOCIAL_SCIENCE_TOPICS
+
+    parser = argparse.ArgumentParser(description="Descarga y consulta la taxonomia de OpenAlex")
+    parser.add_argument("--refrescar", action="store_true", help="Volver a descargar la taxonomia")
+    parser.add_argument("--validar", action="store_true",
+                        help="Validar SOCIAL_SCIENCE_TOPICS de openalex_scraper.py")
+    args = parser.parse_args()
+
+    taxonomia = cargar_taxonomia(refrescar=args.refrescar)
+    print(f"Taxonomia del {taxonomia.fecha}: {len(taxonomia.nombres['domains'])} dominios, "
+          f"{len(taxonomia.nombres['fields'])} campos, {len(taxonomia.nombres['subfields'])} subcampos, "
+          f"{len(taxonomia)} topics")
+
+    if args.validar:
+        print(f"\nSOCIAL_SCIENCE_TOPICS ({len(SOCIAL_SCIENCE_TOPICS)} entradas):")
+        for topic_id in dict.fromkeys(SOCIAL_SCIENCE_TOPICS):
+            print(f"  {topic_id:8} {taxonomia.describir_topic(topic_id)}")
+        validos = reportar_topics(SOCIAL_SCIENCE_TOPICS)
+        print(f"\nValidos: {len(validos)} de {len(SOCIAL_SCIENCE_TOPICS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Prueba de ingestar_snapshot con las particiones de ejemplo de tests/snapshot.
+
+Las particiones tienen autores repetidos entre fechas: una versión antigua
+que cumple los filtros (Chile, ciencias sociales, h-index) y otra más
+reciente que ya no los cumple. Solo deben quedar los autores cuya versión
+más reciente los cumple. No usa la API (clasifica por nombre de topic).
+
+Uso:
+    python src/test_ingestar_snapshot.py
+    python -m pytest src/test_ingestar_snapshot.py
+"""
+
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import taxonomia_openalex
+from ingestar_snapshot import ingestar
+
+SNAPSHOT_DIR = Path(__file__).parent.parent / "tests" / "snapshot"
+
+# openalex_id esperado -> h-index de la versión vigente
+ESPERADOS = {
+    "https://openalex.org/A2": 9,  # Versión 2026 (la de 2025 tenía h=8)
+    "https://openalex.org/A6": 2,  # Formato antiguo (last_known_institution)
+}
+
+
+def test_versiones_vigentes():
+    """Solo quedan los autores cuya versión más reciente cumple los filtros."""
+    print("=" * 50)
+    print("TEST: Ingesta del snapshot de ejemplo")
+    print("=" * 50)
+
+    # Sin taxonomía: clasificar por nombre, sin acceder a la red
+    taxonomia_openalex._taxonomia = False
+
+    df = ingestar(SNAPSHOT_DIR, procesos=1)
+    obtenidos = dict(zip(df["openalex_id"], df["h_index"]))
+
+    # A1 y A7 se fueron a Argentina en 2026 (A7 sin "CL" en la línea),
+    # A3 es de Argentina, A4 de medicina y A5 tiene h-index 1
+    assert obtenidos == ESPERADOS, obtenidos
+    print("TEST PASADO")
+
+
+if __name__ == "__main__":
+    test_versiones_vigentes()